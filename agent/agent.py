@@ -0,0 +1,258 @@
+import os
+import time
+
+from collections import deque
+from typing import Optional
+
+from .snake import Snake
+from .grid import Grid
+
+from .search.exploration_dijkstra import Exploration
+from .search.eating import Eating
+from .search.death_circle import Survival
+from .search.incremental import IncrementalEating
+from .search.tail_chase import TailChase
+from .search.rollout import Rollout
+
+from .utils.utils import determine_direction, convert_sight
+from .utils.deadline import Deadline, StepScheduler
+from .utils.profiling import profiler
+
+from .consts import Mode
+
+
+class Agent:
+    """
+    The agent without its connection: built with the game info (size, map, fps), `act` answers a state with a key.
+
+    `act` plans synchronously, for engines calling the agent in the same process (tournaments, simulations).
+    The websocket client (student.py) plans on a worker thread instead, with `plan`, `prepare_fallbacks`
+    and `fallback_key` when the planner is late.
+    """
+
+    def __init__(self, info: dict, scheduler: Optional[StepScheduler] = None):
+        self.scheduler = scheduler or StepScheduler(info.get("fps", 10)) # Splits each step's time budget across the planners
+        self.planner = AgentPlanner(info["size"], info["map"], self.scheduler)
+
+    @property
+    def mode(self) -> Optional[Mode]:
+        return self.planner.snake.mode
+
+    def act(self, state: dict) -> str:
+        deadline = self.scheduler.start_step(state.get("ts"))
+        key = self.planner.plan([([state], deadline)])
+        self.planner.prepare_fallbacks() # Keeps the path to the tail up to date, the survival planner uses it
+        return key
+
+    def close(self):
+        self.planner.close()
+
+
+class AgentPlanner:
+    """Snake, grid and planners of one game. `plan` runs on the planning worker thread."""
+
+    def __init__(self, size: tuple[int, int], grid: list[list], scheduler: StepScheduler):
+        self.snake = Snake()
+        self.grid = Grid(size, grid, 5, 5)
+        self.scheduler = scheduler
+
+        self.exploration = Exploration()
+        self.eating = Eating()
+        self.tail_chase = TailChase() # Path to the tail, kept up to date after every plan
+        self.survival = Survival(tail_chase=self.tail_chase)
+        self.replanner = IncrementalEating()
+        self.rollout = Rollout(workers=int(os.environ.get("ROLLOUT_WORKERS", "0"))) # Last resort, playouts on a process pool if set
+
+        self.path = deque()
+
+        self.path_counter = 0
+        self.path_clear_threshold = 2 # Path clear if path counter is bigger or equal to path_clear_threshold
+
+        self.key = ""
+        self.plan_ms: float = None # Duration of the last `plan` call
+        self._expected_position = None # Head position the last key leads to
+        self._step: int = None # Step of the last planned state
+        self._fallbacks: tuple[int, dict[str, str]] = (None, {}) # (step, next step's key for each key sent on that step)
+
+    def plan(self, items: list[tuple[list[dict], Deadline]]) -> str:
+        """Update the snake and grid with every received state and return the key for the newest one."""
+        plan_start = time.perf_counter()
+        snake, grid, path = self.snake, self.grid, self.path
+        states = [state for batch, _ in items for state in batch]
+        deadline = items[-1][1]
+
+        try:
+            # Previous Assignments
+            prev_mode = snake.mode
+            prev_food_positions = grid.food.copy() # Shallow copy, elements inside are tuples (immutable)
+            prev_super_food_positions = grid.super_food.copy() # Shallow copy, elements inside are tuples (immutable)
+
+            phase = profiler.phase("update", skipped=len(states) - 1) if profiler.enabled else profiler.phase("update")
+            with phase:
+                for state in states[:-1]:
+                    update_skipped_grid(state, grid)
+                update_snake_grid(states[-1], snake, grid)
+
+            if snake.position != self._expected_position:
+                path.clear() # Last key wasn't the planned one (late planner or skipped states)
+
+            # Eating path is repaired every tick while the goal and the known foods stay the same
+            replan = (
+                self.replanner.goal is not None
+                and snake.mode == Mode.EATING
+                and prev_mode == snake.mode
+                and prev_food_positions == grid.food
+                and not (prev_super_food_positions != grid.super_food and snake.eat_super_food)
+            )
+            if replan:
+                with profiler.phase("replan"):
+                    path = self.replanner.get_path(snake, grid, self.scheduler.budget_for("eating", deadline)) or deque()
+            else:
+                self.replanner.clear()
+
+            # Path Clearence Conditions
+            # TODO --> Make this a function in the future if it gets bigger (it will)
+            if path and not replan:
+                if prev_mode != snake.mode:
+                    path.clear() # Clear path if mode switches
+                elif prev_food_positions != grid.food:
+                    path.clear() # Clear path if new food is found. Allows for path recalculation for closer foods
+                elif prev_super_food_positions != grid.super_food and snake.eat_super_food:
+                    path.clear() # Clear path if new super food is found and eat super food is True. Allows for path recalculation for closer super foods
+                elif self.path_counter >= self.path_clear_threshold:
+                    path.clear()
+                else:
+                    if grid.enemies.path_in_danger(path): # An enemy head can cut the path
+                        path.clear()
+
+            # Path Calculation
+            if not path: # List if empty
+                if snake.mode == Mode.EXPLORATION: 
+                    with profiler.phase("exploration"):
+                        path = self.exploration.get_path(snake, grid, True, deadline=self.scheduler.budget_for("exploration", deadline)) # Request a new path to follow
+                elif snake.mode == Mode.EATING:
+                    with profiler.phase("eating"):
+                        path = self.eating.get_path(snake, grid, self.scheduler.budget_for("eating", deadline)) # Request a new path to follow
+                    if path and path[-1] in grid.food:
+                        self.replanner.reset(path[-1]) # Keep repairing this path on the next ticks
+                    if not path:
+                        snake.mode = Mode.EXPLORATION # Default mode
+                        with profiler.phase("exploration"):
+                            path = self.exploration.get_path(snake, grid, True, deadline=self.scheduler.budget_for("exploration", deadline)) # Request a new path to follow
+                if not path: 
+                    snake.mode = Mode.SURVIVAL # Fallback mode
+                    with profiler.phase("survival"):
+                        path = self.survival.get_path(snake, grid, 2, self.scheduler.budget_for("survival", deadline))
+                if not path:
+                    with profiler.phase("rollout"):
+                        path = self.rollout.get_path(snake, grid, self.scheduler.budget_for("rollout", deadline)) # Best first move by simulation
+                    
+                self.path_counter = 0 # Path counter reset
+
+            self.key = "" # Keep the current direction if no path is found
+            self._expected_position = None
+            if path:
+                self._expected_position = path.popleft()
+                direction = determine_direction(snake.position, self._expected_position, grid.size)
+                self.key = snake.move(direction)
+            
+            self.path_counter = self.path_counter + 1
+
+        except ValueError:
+            if path:   
+               path.clear()
+        except Exception:
+            if path:
+               path.clear()
+
+        self.path = path if path is not None else deque()
+        self._step = states[-1].get("step")
+        self.plan_ms = (time.perf_counter() - plan_start) * 1000
+        return self.key
+
+    def close(self):
+        self.rollout.close()
+
+    def prepare_fallbacks(self):
+        """Refresh the path to the tail and the fallback keys of the last planned step, runs once its key is handed back."""
+        with profiler.phase("fallbacks"):
+            self.tail_chase.update(self.snake, self.grid)
+            self._fallbacks = (self._step, self.compute_fallback_keys())
+        profiler.flush_counters(step=self._step) # One counter event per planned step
+
+    def fallback_key(self, step: int, sent_key: str) -> str:
+        """Key for `step` when the planner is late, given the key sent on the previous step."""
+        fallback_step, fallback_keys = self._fallbacks
+        if step is None or fallback_step != step - 1:
+            return "" # Planner is more than a step behind, keep the current direction
+        return fallback_keys.get(sent_key, "")
+
+    def compute_fallback_keys(self) -> dict[str, str]:
+        """
+        Precompute the next step's key for every key that may be sent on this step (the planned one or a fallback):
+        follow the path if the planned key was sent, else keep chasing the tail, else move towards the largest free space.
+        """
+        snake, grid = self.snake, self.grid
+        if snake.position is None or snake.direction is None:
+            return {}
+
+        fallback_keys = {}
+        for head, direction in grid.get_neighbours(self.survival.actions, snake.position, snake.direction):
+            key = snake.move(direction)
+            if head == self._expected_position and self.path:
+                fallback_keys[key] = snake.move(determine_direction(head, self.path[0], grid.size))
+                continue
+            tail_path = self.tail_chase.path
+            if head == self.tail_chase.next_move() and len(tail_path) > 2:
+                fallback_keys[key] = snake.move(determine_direction(head, tail_path[1], grid.size))
+                continue
+            neighbours = grid.get_neighbours(self.survival.actions, head, direction)
+            if neighbours:
+                _, best_dir = max(neighbours, key=lambda n: grid.free_space.component_size(n[0]))
+                fallback_keys[key] = snake.move(best_dir)
+
+        fallback_keys[""] = fallback_keys.get(snake.move(snake.direction), "") # Empty key keeps the current direction
+        return fallback_keys
+
+
+def update_snake_grid(state: dict, snake: Snake, grid: Grid):
+    """Update the snake and grid objects based on the new game state."""
+    body = state["body"]
+    pos = tuple(body[0])
+    direction = determine_direction(body[1], body[0], grid.size)
+    sight = state["sight"]
+    with profiler.phase("convert_sight"):
+        sight = convert_sight(sight) 
+    range = state["range"]
+    traverse = state["traverse"]
+
+    step = state["step"]
+    
+    # Always update snake first
+    snake.update(pos, direction, body, sight, range)
+    grid.update(snake, traverse, step)
+    snake_mode(snake, grid.food, grid.super_food, traverse, range, step)
+
+
+def update_skipped_grid(state: dict, grid: Grid):
+    """Update the grid with a state that was skipped for a newer one, see `Grid.update_skipped`."""
+    grid.update_skipped(tuple(state["body"][0]), convert_sight(state["sight"]))
+
+
+def snake_mode(snake: Snake, grid_food: set[tuple[int, int]], grid_super_food: set[tuple[int, int]], traverse: bool, range: int, step: int):
+    # Super food consumption strategy based on sight and traverse
+    if step >= 2800:
+        snake.eat_super_food = bool(grid_super_food)
+    elif range >= 5 and traverse: 
+        snake.eat_super_food = False  
+    elif range == 3 and traverse or range >= 4:
+        snake.eat_super_food = len(grid_super_food) >= 4 # Eat super food if enough food have been accumulated
+    elif range < 3 or not traverse:
+        snake.eat_super_food = bool(grid_super_food)
+
+    if grid_food:
+        snake.mode = Mode.EATING  # Prioritize normal food if available
+    elif snake.eat_super_food:
+        snake.mode = Mode.EATING
+    else:
+        snake.mode = Mode.EXPLORATION  # Default to exploration mode
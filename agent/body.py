@@ -0,0 +1,49 @@
+from typing import Optional
+
+
+class Body:
+    """
+    Snake body of a search node, stored as a parent-pointer chain of heads over the body at the root of the search.
+
+    After k moves the body is [head_k, ..., head_1] + root[:len(root) - k], so a move is O(1) and nodes share
+    their common prefix. The list is only built by `materialize`, when a goal is tested.
+    """
+    __slots__ = ("head", "parent", "moves", "_root")
+
+    def __init__(self, head: tuple[int, int], parent: Optional["Body"], moves: int, root: list[tuple[int, int]]):
+        self.head = head
+        self.parent = parent
+        self.moves = moves # Moves since the root body
+        self._root = root
+
+    def __repr__(self):
+        return f"Body(head={self.head}, moves={self.moves}, length={len(self)})"
+
+    def __len__(self):
+        return len(self._root)
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __lt__(self, other: "Body") -> bool:
+        # Allows bodies inside heap tuples when every previous element ties
+        return self.moves < other.moves
+
+    @classmethod
+    def from_list(cls, body: list[tuple[int, int]]) -> "Body":
+        return cls(body[0], None, 0, body)
+
+    def move(self, next_pos: tuple[int, int]) -> "Body":
+        """Return the body after moving the head to `next_pos` (the tail follows)."""
+        return Body(next_pos, self, self.moves + 1, self._root)
+
+    def materialize(self) -> list[tuple[int, int]]:
+        """Build the list of body segments, head first."""
+        length = len(self._root)
+        segments = []
+        node = self
+        while node.parent is not None and len(segments) < length:
+            segments.append(node.head)
+            node = node.parent
+        segments.extend(self._root[:length - len(segments)])
+        return segments
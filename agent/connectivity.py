@@ -0,0 +1,189 @@
+from collections import deque
+from typing import Optional
+
+
+class FreeSpaceIndex:
+    """
+    Connected components of the passable cells of a Grid.
+
+    The index is built once with `rebuild` and then kept in sync with `apply_changes`, which receives the
+    cells whose tile changed during a `Grid.update`:
+        - A cell that becomes free joins (and merges) the components of its free neighbours.
+        - A cell that becomes blocked shrinks its component. When that cell could split the component
+          (it isn't locally simple, or several cells of the same component were blocked at once) only that
+          component is relabelled.
+    """
+
+    def __init__(self):
+        self._labels: dict[tuple[int, int], int] = {}  # Free cell -> component label
+        self._members: dict[int, set[tuple[int, int]]] = {}  # Component label -> free cells
+        self._next_label = 0
+        self._size: tuple[int, int] = None
+        self._traverse: bool = None
+
+    def __repr__(self):
+        return f"FreeSpaceIndex(components={len(self._members)}, free_cells={len(self._labels)})"
+
+    @property
+    def traverse(self) -> bool:
+        return self._traverse
+
+    def component_size(self, pos: tuple[int, int]) -> int:
+        """Return the number of free cells connected to `pos` (0 if `pos` is blocked)."""
+        label = self._labels.get(pos)
+        return len(self._members[label]) if label is not None else 0
+
+    def component_of(self, pos: tuple[int, int]) -> Optional[int]:
+        """Return the component label of `pos` (None if `pos` is blocked)."""
+        return self._labels.get(pos)
+
+    def label_size(self, label: int) -> int:
+        return len(self._members.get(label, ()))
+
+    def keeps_connected(self, cells) -> bool:
+        """
+        Check that blocking the free cells of `cells` can't split their components: blocked one by one in order,
+        each is locally simple once the previous ones are blocked. False doesn't mean they would split them.
+        """
+        blocked = set()
+        for cell in cells:
+            if cell not in self._labels or cell in blocked:
+                continue
+            if not self._is_locally_simple(cell, blocked):
+                return False
+            blocked.add(cell)
+        return True
+
+    def rebuild(self, grid):
+        """Label every free cell of the grid from scratch."""
+        self._labels.clear()
+        self._members.clear()
+        self._size = grid.size
+        self._traverse = grid.traverse
+
+        for x in range(grid.hor_tiles):
+            for y in range(grid.ver_tiles):
+                if (x, y) not in self._labels and not grid.is_blocked((x, y)):
+                    self._label_component(grid, (x, y), self._new_label())
+
+    def apply_changes(self, grid, cells: set[tuple[int, int]]):
+        """Update the components after the tiles in `cells` changed."""
+        if grid.traverse != self._traverse or grid.size != self._size:
+            self.rebuild(grid) # Passability of stones and borders changed
+            return
+
+        blocked = [cell for cell in cells if cell in self._labels and grid.is_blocked(cell)]
+        freed = [cell for cell in cells if cell not in self._labels and not grid.is_blocked(cell)]
+        if not blocked and not freed:
+            return
+
+        # Blocked cells --> Shrink their component, relabel it if it might have been split
+        blocked_per_label: dict[int, list[tuple[int, int]]] = {}
+        for cell in blocked:
+            blocked_per_label.setdefault(self._labels[cell], []).append(cell)
+
+        for label, label_cells in blocked_per_label.items():
+            members = self._members[label]
+            for cell in label_cells:
+                members.discard(cell)
+                del self._labels[cell]
+
+            may_split = len(label_cells) > 1 or not self._is_locally_simple(label_cells[0])
+            if may_split:
+                self._relabel(grid, label)
+            elif not members:
+                del self._members[label]
+
+        # Freed cells --> Merge the components of their free neighbours
+        for cell in freed:
+            labels = {self._labels[n] for n in self.neighbours(cell) if n in self._labels}
+            if cell in self._labels:
+                labels.add(self._labels[cell]) # Already reached while relabelling a split component
+            if not labels:
+                label = self._new_label()
+                self._members[label] = set()
+            else:
+                label = max(labels, key=lambda l: len(self._members[l])) # Keep the largest label
+                for other in labels - {label}:
+                    for member in self._members.pop(other):
+                        self._labels[member] = label
+                        self._members[label].add(member)
+            self._labels[cell] = label
+            self._members[label].add(cell)
+
+    def _new_label(self) -> int:
+        self._next_label += 1
+        return self._next_label
+
+    def neighbours(self, pos: tuple[int, int]) -> list[tuple[int, int]]:
+        """Return the 4 adjacent cells of `pos`, wrapping around the borders when traverse is on."""
+        x, y = pos
+        width, height = self._size
+        neighbours = []
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if self._traverse:
+                neighbours.append((nx % width, ny % height))
+            elif 0 <= nx < width and 0 <= ny < height:
+                neighbours.append((nx, ny))
+        return neighbours
+
+    def _is_locally_simple(self, pos: tuple[int, int], blocked=()) -> bool:
+        """
+        Check if the free orthogonal neighbours of `pos` are connected through the 8 cells around it, the cells
+        of `blocked` counting as blocked. If they are, blocking `pos` can't split its component (the converse doesn't hold).
+        """
+        x, y = pos
+        width, height = self._size
+        ring = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)) # Clockwise, orthogonal cells at even indexes
+
+        free = []
+        for dx, dy in ring:
+            nx, ny = x + dx, y + dy
+            if self._traverse:
+                nx, ny = nx % width, ny % height
+            elif not (0 <= nx < width and 0 <= ny < height):
+                free.append(False)
+                continue
+            free.append((nx, ny) in self._labels and (nx, ny) not in blocked)
+
+        if all(free):
+            return True
+
+        # Count the runs of consecutive free ring cells holding at least one orthogonal neighbour
+        start = free.index(False)
+        runs = 0
+        in_run = False
+        run_has_orthogonal = False
+        for offset in range(1, 9):
+            i = (start + offset) % 8
+            if free[i]:
+                in_run = True
+                run_has_orthogonal = run_has_orthogonal or i % 2 == 0
+            elif in_run:
+                runs += run_has_orthogonal
+                in_run = False
+                run_has_orthogonal = False
+        return runs <= 1
+
+    def _label_component(self, grid, start: tuple[int, int], label: int):
+        """Flood the free cells connected to `start` with `label`."""
+        members = self._members.setdefault(label, set())
+        queue = deque([start])
+        self._labels[start] = label
+        members.add(start)
+        while queue:
+            current = queue.popleft()
+            for neighbour in self.neighbours(current):
+                if neighbour not in self._labels and not grid.is_blocked(neighbour):
+                    self._labels[neighbour] = label
+                    members.add(neighbour)
+                    queue.append(neighbour)
+
+    def _relabel(self, grid, label: int):
+        """Split component `label` into its remaining connected parts."""
+        remaining = self._members.pop(label)
+        for cell in remaining:
+            del self._labels[cell]
+        for cell in remaining:
+            if cell not in self._labels:
+                self._label_component(grid, cell, self._new_label())
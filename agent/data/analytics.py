@@ -0,0 +1,456 @@
+"""
+Streaming analytics over recorded games (`server.py --record`) and agent telemetry (`TELEMETRY=... python student.py`).
+
+Every file is read line by line into per-step and per-game records, folded into an `Analytics`: histograms
+and counters whose size doesn't grow with the number of steps, plus one row per game and player. The
+analytics of a file are cached next to it (`<path>.stats.json`) and merged, so a report over thousands of
+games only reads the files added since the last one.
+
+    python -m agent.data.analytics games/*.jsonl telemetry.jsonl -o summary.json --plot report.png
+"""
+import os
+import sys
+import json
+import argparse
+
+from itertools import chain
+from collections import Counter
+from multiprocessing import Pool
+from typing import Iterator, Optional
+
+CACHE_SUFFIX = ".stats.json"
+CACHE_VERSION = 3 # 2: foods are +1 score changes only, 3: foods of recordings are their eat events
+PLAN_MS_RESOLUTION = 0.1 # Width of the plan time histogram buckets
+GAME_COLUMNS = ("game", "player", "source", "steps", "score", "length", "foods", "cause", "killer")
+
+
+class Histogram:
+    """Counts of discrete values (steps, or times rounded to a bucket), mergeable and percentile capable."""
+
+    def __init__(self, counts: Optional[dict] = None):
+        self.counts: Counter = Counter(counts or {})
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def add(self, value, count: int = 1):
+        self.counts[value] += count
+
+    def merge(self, other: "Histogram"):
+        self.counts.update(other.counts)
+
+    def mean(self) -> Optional[float]:
+        total = len(self)
+        return sum(value * count for value, count in self.counts.items()) / total if total else None
+
+    def percentile(self, fraction: float):
+        """Nearest rank percentile, None when empty."""
+        rank = int(fraction * len(self))
+        for value in sorted(self.counts):
+            rank -= self.counts[value]
+            if rank < 0:
+                return value
+        return max(self.counts, default=None)
+
+    def to_columns(self) -> dict[str, list]:
+        values = sorted(self.counts)
+        return {"value": values, "count": [self.counts[value] for value in values]}
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list]) -> "Histogram":
+        return cls(dict(zip(columns["value"], columns["count"])))
+
+
+class Analytics:
+    """
+    Incremental aggregates of the records of `records`:
+
+    - steps_per_food: steps between two foods (or from the start to the first one), from the eat events of the
+      recordings. Telemetry has none, a food is then a +1 score change: kills and super food points change the
+      score by other amounts (a +1 super food is miscounted, a food eaten on the step of a kill is missed)
+    - deaths / censored: lifetimes ending with a death, or still alive at the last step seen (survival curve)
+    - plan_ms, overruns: planner time of the frames and frames over their budget (late answers included)
+    - modes: frames, overruns and planner time per planner mode
+    - games: one row per game and player, see `GAME_COLUMNS`
+    """
+
+    def __init__(self):
+        self.steps_per_food = Histogram()
+        self.deaths = Histogram()
+        self.censored = Histogram()
+        self.causes: Counter = Counter()
+        self.plan_ms = Histogram()
+        self.frames = 0
+        self.late = 0
+        self.overruns = 0
+        self.modes: dict[str, dict] = {}
+        self.games: dict[str, list] = {column: [] for column in GAME_COLUMNS}
+        self._live: dict[tuple, list] = {} # (game, player): [last score, step of the last food, foods]
+
+    def add(self, record: dict):
+        if record["kind"] == "step":
+            self._add_step(record)
+        else:
+            self._add_game(record)
+
+    def _add_step(self, record: dict):
+        key = (record["game"], record["player"])
+        live = self._live.setdefault(key, [record["score"], 0, 0])
+        foods = record.get("foods")
+        if foods is None: # Telemetry, or a recording older than the eat events
+            foods = int(record["score"] is not None and live[0] is not None and record["score"] - live[0] == 1)
+        if foods:
+            self.steps_per_food.add(record["step"] - live[1])
+            live[1] = record["step"]
+            live[2] += foods
+        live[0] = record["score"]
+
+        if "plan_ms" not in record:
+            return # Recorded games have no planner timings
+        plan_ms, budget_ms = record["plan_ms"], record.get("budget_ms")
+        overrun = plan_ms is None or (budget_ms is not None and plan_ms > budget_ms)
+        self.frames += 1
+        self.late += plan_ms is None
+        self.overruns += overrun
+        if plan_ms is not None:
+            self.plan_ms.add(round(round(plan_ms / PLAN_MS_RESOLUTION) * PLAN_MS_RESOLUTION, 3))
+
+        mode = self.modes.setdefault(record.get("mode") or "unknown", {"frames": 0, "overruns": 0, "plan_ms": 0.0})
+        mode["frames"] += 1
+        mode["overruns"] += overrun
+        mode["plan_ms"] += plan_ms or 0.0
+
+    def _add_game(self, record: dict):
+        _, _, foods = self._live.pop((record["game"], record["player"]), (None, None, 0))
+        record = {**record, "foods": foods}
+        for column in GAME_COLUMNS:
+            self.games[column].append(record.get(column))
+
+        cause = record.get("cause")
+        if cause is None:
+            return # Unknown end (agent telemetry), left out of the survival curve
+        if cause == "alive":
+            self.censored.add(record["steps"])
+        else:
+            self.deaths.add(record["steps"])
+        self.causes[cause] += 1
+
+    def merge(self, other: "Analytics"):
+        self.steps_per_food.merge(other.steps_per_food)
+        self.deaths.merge(other.deaths)
+        self.censored.merge(other.censored)
+        self.causes.update(other.causes)
+        self.plan_ms.merge(other.plan_ms)
+        self.frames += other.frames
+        self.late += other.late
+        self.overruns += other.overruns
+        for name, mode in other.modes.items():
+            merged = self.modes.setdefault(name, {"frames": 0, "overruns": 0, "plan_ms": 0.0})
+            for field, value in mode.items():
+                merged[field] += value
+        for column in GAME_COLUMNS:
+            self.games[column].extend(other.games[column])
+
+    def survival(self) -> dict[str, list]:
+        """Kaplan-Meier survival curve: fraction of snakes still alive after each step with a death."""
+        at_risk = len(self.deaths) + len(self.censored)
+        survival = 1.0
+        curve = {"step": [], "alive": [], "at_risk": []}
+        for step in sorted(self.deaths.counts.keys() | self.censored.counts.keys()):
+            deaths = self.deaths.counts.get(step, 0)
+            if deaths:
+                survival *= 1 - deaths / at_risk
+                curve["step"].append(step)
+                curve["alive"].append(survival)
+                curve["at_risk"].append(at_risk)
+            at_risk -= deaths + self.censored.counts.get(step, 0)
+        return curve
+
+    def summary(self) -> dict:
+        scores = [score for score in self.games["score"] if score is not None]
+        return {
+            "games": len(set(self.games["game"])),
+            "lifetimes": len(self.games["game"]),
+            "mean_score": sum(scores) / len(scores) if scores else None,
+            "foods": len(self.steps_per_food),
+            "steps_per_food": {
+                "mean": self.steps_per_food.mean(),
+                "p50": self.steps_per_food.percentile(0.5),
+                "p90": self.steps_per_food.percentile(0.9),
+            },
+            "causes": dict(self.causes),
+            "frames": self.frames,
+            "late": self.late,
+            "overruns": self.overruns,
+            "overrun_rate": self.overruns / self.frames if self.frames else None,
+            "plan_ms": {
+                "p50": self.plan_ms.percentile(0.5),
+                "p95": self.plan_ms.percentile(0.95),
+                "p99": self.plan_ms.percentile(0.99),
+            },
+            "modes": {
+                name: {**mode, "plan_ms": mode["plan_ms"] / mode["frames"] if mode["frames"] else None}
+                for name, mode in self.modes.items()
+            },
+        }
+
+    def to_dict(self) -> dict:
+        """Columnar form: histograms as (value, count) columns, games as one list per column."""
+        return {
+            "version": CACHE_VERSION,
+            "summary": self.summary(),
+            "survival": self.survival(),
+            "games": self.games,
+            "steps_per_food": self.steps_per_food.to_columns(),
+            "deaths": self.deaths.to_columns(),
+            "censored": self.censored.to_columns(),
+            "causes": dict(self.causes),
+            "plan_ms": self.plan_ms.to_columns(),
+            "frames": self.frames,
+            "late": self.late,
+            "overruns": self.overruns,
+            "modes": self.modes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Analytics":
+        analytics = cls()
+        analytics.steps_per_food = Histogram.from_columns(data["steps_per_food"])
+        analytics.deaths = Histogram.from_columns(data["deaths"])
+        analytics.censored = Histogram.from_columns(data["censored"])
+        analytics.causes = Counter(data["causes"])
+        analytics.plan_ms = Histogram.from_columns(data["plan_ms"])
+        analytics.frames = data["frames"]
+        analytics.late = data["late"]
+        analytics.overruns = data["overruns"]
+        analytics.modes = data["modes"]
+        analytics.games = data["games"]
+        return analytics
+
+    def write(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, separators=(",", ":"))
+
+
+def read_lines(path: str) -> Iterator[dict]:
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def records(path: str) -> Iterator[dict]:
+    """Records of a recorded game or of an agent's telemetry, told apart by their first line."""
+    lines = read_lines(path)
+    first = next(lines, None)
+    if first is None:
+        return iter(())
+    if "map" in first:
+        return recording_records(path, lines)
+    return telemetry_records(path, chain([first], lines))
+
+
+def recording_records(path: str, lines: Iterator[dict]) -> Iterator[dict]:
+    """Step records of every snake of a recorded game, then a game record per snake when it dies or the game ends."""
+    game = os.path.basename(path)
+    last: dict[str, dict] = {} # Newest step record of every snake alive
+    step = 0
+    for message in lines:
+        if "snakes" not in message:
+            continue
+        step = message["step"]
+        causes = {death["name"]: death for death in message.get("deaths", [])}
+        eaten = Counter(food["name"] for food in message["eaten"] if food["food"] == "food") if "eaten" in message else None
+        alive = set()
+        for snake in message["snakes"]:
+            alive.add(snake["name"])
+            last[snake["name"]] = record = {
+                "kind": "step",
+                "game": game,
+                "player": snake["name"],
+                "step": step,
+                "score": snake["score"],
+                "length": len(snake["body"]),
+                "foods": eaten[snake["name"]] if eaten is not None else None,
+            }
+            yield record
+        for name in [name for name in last if name not in alive]:
+            death = causes.get(name, {})
+            yield game_record(last.pop(name), "recording", step, death.get("cause") or "unknown", death.get("killer"))
+    for record in last.values():
+        yield game_record(record, "recording", step, "alive")
+
+
+def telemetry_records(path: str, lines: Iterator[dict]) -> Iterator[dict]:
+    """Step records of an agent's telemetry (`agent.utils.telemetry.FrameTelemetry.dump`), one game per file."""
+    game = os.path.basename(path)
+    record = None
+    for line in lines:
+        record = {
+            "kind": "step",
+            "game": game,
+            "player": "agent",
+            "step": line["step"],
+            "score": line.get("score"),
+            "length": line.get("length"),
+            "mode": line.get("mode"),
+            "plan_ms": line.get("plan_ms"),
+            "budget_ms": line.get("budget_ms"),
+        }
+        yield record
+    if record is not None:
+        yield game_record(record, "telemetry", record["step"], None)
+
+
+def game_record(last: dict, source: str, steps: int, cause: Optional[str], killer: Optional[str] = None) -> dict:
+    return {
+        "kind": "game",
+        "game": last["game"],
+        "player": last["player"],
+        "source": source,
+        "steps": steps,
+        "score": last["score"],
+        "length": last["length"],
+        "cause": cause,
+        "killer": killer,
+    }
+
+
+def _signature(path: str) -> list[int]:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def analyze_file(path: str, cache: bool = True) -> Analytics:
+    """Analytics of one file, read from its cache while the file is unchanged."""
+    cache_path = path + CACHE_SUFFIX
+    if cache:
+        try:
+            with open(cache_path) as file:
+                data = json.load(file)
+            if data.get("signature") == _signature(path) and data.get("version") == CACHE_VERSION:
+                return Analytics.from_dict(data)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    analytics = Analytics()
+    for record in records(path):
+        analytics.add(record)
+    if cache:
+        try:
+            with open(cache_path, "w") as file:
+                json.dump({**analytics.to_dict(), "signature": _signature(path)}, file, separators=(",", ":"))
+        except OSError:
+            pass # Read only directory, analyzed again next time
+    return analytics
+
+
+def analyze(paths: list[str], workers: int = 1, cache: bool = True) -> Analytics:
+    """Merged analytics of many files, analyzed on `workers` processes."""
+    analytics = Analytics()
+    if workers > 1 and len(paths) > 1:
+        with Pool(workers) as pool:
+            for result in pool.imap(_analyze_cached if cache else _analyze_uncached, paths, chunksize=8):
+                analytics.merge(result)
+    else:
+        for path in paths:
+            analytics.merge(analyze_file(path, cache))
+    return analytics
+
+
+def _analyze_cached(path: str) -> Analytics:
+    return analyze_file(path, True)
+
+
+def _analyze_uncached(path: str) -> Analytics:
+    return analyze_file(path, False)
+
+
+def report(analytics: Analytics) -> str:
+    summary = analytics.summary()
+    lines = [f"{summary['games']} games, {summary['lifetimes']} snakes, mean score {_format(summary['mean_score'])}"]
+    spf = summary["steps_per_food"]
+    lines.append(f"steps per food: {summary['foods']} foods, mean {_format(spf['mean'])}, p50 {_format(spf['p50'])}, p90 {_format(spf['p90'])}")
+
+    survival = analytics.survival()
+    if survival["step"]:
+        checkpoints = []
+        for checkpoint in (500, 1000, 2000, 3000):
+            alive = 1.0
+            for step, fraction in zip(survival["step"], survival["alive"]):
+                if step > checkpoint:
+                    break
+                alive = fraction
+            checkpoints.append(f"{checkpoint}: {alive:.1%}")
+        lines.append("alive at step " + ", ".join(checkpoints))
+    if summary["causes"]:
+        lines.append("ends: " + ", ".join(f"{cause} {count}" for cause, count in sorted(summary["causes"].items(), key=lambda c: -c[1])))
+
+    if summary["frames"]:
+        plan = summary["plan_ms"]
+        lines.append(
+            f"frames {summary['frames']}, over budget {summary['overruns']} ({summary['overrun_rate']:.2%}, {summary['late']} late), "
+            f"plan ms p50 {_format(plan['p50'])} p95 {_format(plan['p95'])} p99 {_format(plan['p99'])}"
+        )
+        for name, mode in sorted(summary["modes"].items()):
+            lines.append(f"  {name:<12} frames {mode['frames']:>7} over budget {mode['overruns']:>5} mean plan ms {_format(mode['plan_ms'])}")
+    return "\n".join(lines)
+
+
+def _format(value) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def plot(analytics: Analytics, path: str):
+    """Steps per food, survival and plan time distributions in one image (needs matplotlib)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    figure, (spf_axes, survival_axes, plan_axes) = plt.subplots(1, 3, figsize=(15, 4))
+
+    columns = analytics.steps_per_food.to_columns()
+    spf_axes.bar(columns["value"], columns["count"], width=1)
+    spf_axes.set_title("Steps per food")
+    spf_axes.set_xlabel("Steps")
+
+    survival = analytics.survival()
+    survival_axes.step([0] + survival["step"], [1.0] + survival["alive"], where="post")
+    survival_axes.set_ylim(0, 1.05)
+    survival_axes.set_title("Survival")
+    survival_axes.set_xlabel("Step")
+
+    columns = analytics.plan_ms.to_columns()
+    plan_axes.bar(columns["value"], columns["count"], width=PLAN_MS_RESOLUTION)
+    plan_axes.set_title("Plan time")
+    plan_axes.set_xlabel("ms")
+
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Aggregate recorded games and agent telemetry.")
+    parser.add_argument("paths", nargs="+", help="Recordings (server.py --record) or telemetry files (TELEMETRY=...)")
+    parser.add_argument("-o", "--output", help="Write the columnar summary (JSON) to this file")
+    parser.add_argument("--plot", help="Save the distributions to this image (needs matplotlib)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-cache", action="store_true", help=f"Don't read or write the {CACHE_SUFFIX} files")
+    args = parser.parse_args(argv)
+
+    paths = [path for path in args.paths if not path.endswith((CACHE_SUFFIX, ".idx"))]
+    analytics = analyze(paths, args.workers, not args.no_cache)
+    print(report(analytics))
+
+    if args.output:
+        analytics.write(args.output)
+    if args.plot:
+        plot(analytics, args.plot)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
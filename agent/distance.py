@@ -0,0 +1,72 @@
+from collections import OrderedDict, deque
+from typing import Callable, Iterable
+
+
+class DistanceFields:
+    """
+    LRU cache of BFS distance fields over a Grid: `field[x][y]` is the number of moves from (x, y) to the closest
+    of the field's sources, `float('inf')` when unreachable.
+
+    Fields only go around stones, keyed by (sources, traverse). Stones never move, so they stay valid for the
+    whole game and are a tight admissible heuristic for any search on the grid.
+    """
+
+    def __init__(self, grid, capacity: int = 128):
+        self._grid = grid
+        self._capacity = capacity
+        self._fields: OrderedDict[tuple, list[list[float]]] = OrderedDict()
+
+    def __repr__(self):
+        return f"DistanceFields(fields={len(self._fields)}, capacity={self._capacity})"
+
+    def __len__(self):
+        return len(self._fields)
+
+    def nearest(self, sources: Iterable[tuple[int, int]]) -> list[list[float]]:
+        """Distances to the closest of `sources` around the stones (stones are passable with traverse), one multi-source BFS."""
+        grid = self._grid
+        sources = frozenset(sources)
+        traverse = grid.traverse
+        return self._get(
+            (sources, traverse),
+            lambda: self._bfs(sources, lambda pos: not traverse and pos in grid.stones),
+        )
+
+    def clear(self):
+        self._fields.clear()
+
+    def _get(self, key: tuple, build: Callable[[], list[list[float]]]) -> list[list[float]]:
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+
+        field = build()
+        self._fields[key] = field
+        while len(self._fields) > self._capacity:
+            self._fields.popitem(last=False) # Least recently used
+        return field
+
+    def _bfs(self, sources: Iterable[tuple[int, int]], is_blocked: Callable[[tuple[int, int]], bool]) -> list[list[float]]:
+        width, height = self._grid.size
+        traverse = self._grid.traverse
+        field = [[float('inf')] * height for _ in range(width)]
+
+        queue = deque()
+        for x, y in sources:
+            field[x][y] = 0
+            queue.append((x, y))
+
+        while queue:
+            x, y = queue.popleft()
+            distance = field[x][y] + 1
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if traverse:
+                    nx, ny = nx % width, ny % height
+                elif not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                if field[nx][ny] <= distance or is_blocked((nx, ny)):
+                    continue
+                field[nx][ny] = distance
+                queue.append((nx, ny))
+        return field
@@ -0,0 +1,182 @@
+from collections import deque
+from typing import Optional
+
+from .consts import Direction, Tiles
+from .utils.utils import determine_direction
+
+MOVES = {
+    Direction.NORTH: (0, -1),
+    Direction.SOUTH: (0, 1),
+    Direction.WEST: (-1, 0),
+    Direction.EAST: (1, 0),
+}
+
+
+class Enemy:
+    """An enemy snake seen on the last update: its visible cells, and its head and direction when they are known."""
+    __slots__ = ("id", "cells", "head", "direction", "seen")
+
+    def __init__(self, id: int, cells: set[tuple[int, int]]):
+        self.id = id
+        self.cells = cells
+        self.head: Optional[tuple[int, int]] = None
+        self.direction: Optional[Direction] = None
+        self.seen = 1 # Consecutive updates the enemy was seen
+
+    def __repr__(self):
+        return f"Enemy(id={self.id}, head={self.head}, direction={self.direction}, cells={len(self.cells)})"
+
+
+class EnemyTracker:
+    """
+    Follows the enemy snakes in sight across updates and predicts where their heads can be in the next moves.
+
+    Enemy cells are grouped in connected groups, one per snake, and each group is matched to the enemy it
+    overlaps the most on the previous update. The head of a matched enemy is its new cell next to the previous
+    head, which also gives its direction. Until then (an enemy just seen) both ends of the group are possible heads.
+
+    `danger` maps every cell a head can reach within `horizon` moves to the earliest move it can be there.
+    Cells are adjacent across the map's borders only when the grid has traverse on.
+    """
+
+    def __init__(self, horizon: int = 3):
+        self.horizon = horizon
+        self._enemies: dict[int, Enemy] = {}
+        self._next_id = 0
+        self._danger: dict[tuple[int, int], int] = {}
+        self._traverse = True # Of the grid on the last update
+
+    def __repr__(self):
+        return f"EnemyTracker(enemies={len(self._enemies)}, danger={len(self._danger)} cells)"
+
+    @property
+    def enemies(self) -> list[Enemy]:
+        return list(self._enemies.values())
+
+    @property
+    def danger(self) -> dict[tuple[int, int], int]:
+        return self._danger
+
+    def danger_time(self, pos: tuple[int, int]) -> Optional[int]:
+        """Return the earliest move an enemy head can reach `pos` (None if not within the horizon)."""
+        return self._danger.get(pos)
+
+    def path_in_danger(self, path) -> bool:
+        """Check if an enemy head can reach a cell of the path before (or when) the snake does."""
+        danger = self._danger
+        if not danger:
+            return False
+        for moves, pos in enumerate(path, start=1):
+            if moves > self.horizon:
+                break
+            time = danger.get(pos)
+            if time is not None and time <= moves:
+                return True
+        return False
+
+    def update(self, grid, cells: set[tuple[int, int]]):
+        """Match the enemy cells seen on this update to the tracked enemies and predict their next moves."""
+        previous = self._enemies
+        self._enemies = {}
+        self._traverse = grid.traverse
+
+        for group in self._groups(cells, grid.size):
+            match = max(previous.values(), key=lambda enemy: len(enemy.cells & group), default=None)
+            if match is None or not match.cells & group or match.id in self._enemies:
+                enemy = Enemy(self._next_id, group) # Enemy just seen (or a snake split from a known one)
+                self._next_id += 1
+            else:
+                enemy = match
+                self._follow(enemy, group, grid.size)
+            self._enemies[enemy.id] = enemy
+
+        self._danger = self._predict(grid)
+
+    def _follow(self, enemy: Enemy, group: set[tuple[int, int]], grid_size: tuple[int, int]):
+        """Update a matched enemy with its new cells, its head is the new end next to the previous head."""
+        new_cells = group - enemy.cells
+        enemy.cells = group
+        enemy.seen += 1
+
+        ends = self._ends(group, grid_size)
+        if enemy.head is not None:
+            candidates = [cell for cell in new_cells if cell in ends and cell in self._adjacent(enemy.head, grid_size)]
+            if len(candidates) == 1:
+                enemy.direction = determine_direction(enemy.head, candidates[0], grid_size)
+                enemy.head = candidates[0]
+                return
+            if enemy.head in group and enemy.head in ends:
+                return # Didn't move (or moved out of sight on the other end)
+        new_ends = [cell for cell in ends if cell in new_cells]
+        enemy.head = new_ends[0] if len(new_ends) == 1 else None
+        enemy.direction = None
+
+    def _predict(self, grid) -> dict[tuple[int, int], int]:
+        """Earliest move at which any enemy head can reach each cell, within the horizon."""
+        danger: dict[tuple[int, int], int] = {}
+        for enemy in self._enemies.values():
+            heads = [(enemy.head, enemy.direction)] if enemy.head is not None else [(end, None) for end in self._ends(enemy.cells, grid.size)]
+            for head, direction in heads:
+                self._spread(grid, head, direction, danger)
+        return danger
+
+    def _spread(self, grid, head: tuple[int, int], direction: Optional[Direction], danger: dict[tuple[int, int], int]):
+        """BFS from a head over the cells it can move into, without reversing on the first move."""
+        opposite = {
+            Direction.NORTH: Direction.SOUTH,
+            Direction.SOUTH: Direction.NORTH,
+            Direction.EAST: Direction.WEST,
+            Direction.WEST: Direction.EAST,
+        }.get(direction)
+
+        queue = deque([(head, 0)])
+        reached = {head}
+        while queue:
+            current_pos, moves = queue.popleft()
+            if moves == self.horizon:
+                continue
+            for move in Direction:
+                if moves == 0 and move == opposite:
+                    continue
+                next_pos = self._move(current_pos, move, grid.size)
+                if next_pos is None or next_pos in reached or grid.get_tile(next_pos) in (Tiles.SNAKE, Tiles.ENEMY):
+                    continue
+                reached.add(next_pos)
+                if moves + 1 < danger.get(next_pos, self.horizon + 1):
+                    danger[next_pos] = moves + 1
+                queue.append((next_pos, moves + 1))
+
+    def _groups(self, cells: set[tuple[int, int]], grid_size: tuple[int, int]) -> list[set[tuple[int, int]]]:
+        """Split the cells into 4-connected groups."""
+        groups = []
+        remaining = set(cells)
+        while remaining:
+            start = remaining.pop()
+            group = {start}
+            queue = deque([start])
+            while queue:
+                for neighbour in self._adjacent(queue.popleft(), grid_size):
+                    if neighbour in remaining:
+                        remaining.discard(neighbour)
+                        group.add(neighbour)
+                        queue.append(neighbour)
+            groups.append(group)
+        return groups
+
+    def _ends(self, group: set[tuple[int, int]], grid_size: tuple[int, int]) -> list[tuple[int, int]]:
+        """Cells of the group with at most one neighbour in it, the possible head and tail."""
+        ends = [cell for cell in group if sum(1 for neighbour in self._adjacent(cell, grid_size) if neighbour in group) <= 1]
+        return ends or list(group) # A coiled snake has no clear end
+
+    def _move(self, pos: tuple[int, int], move: Direction, grid_size: tuple[int, int]) -> Optional[tuple[int, int]]:
+        """Cell next to `pos` in direction `move`, None past a border without traverse."""
+        dx, dy = MOVES[move]
+        x, y = pos[0] + dx, pos[1] + dy
+        width, height = grid_size
+        if self._traverse:
+            return x % width, y % height
+        return (x, y) if 0 <= x < width and 0 <= y < height else None
+
+    def _adjacent(self, pos: tuple[int, int], grid_size: tuple[int, int]) -> list[tuple[int, int]]:
+        cells = (self._move(pos, move, grid_size) for move in MOVES)
+        return [cell for cell in cells if cell is not None]
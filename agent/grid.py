@@ -1,11 +1,19 @@
 import math
 import copy 
 
+import numpy as np
+
 from typing import Union, Optional
 
-from .utils.utils import compute_next_position, compute_position_from_vector
+from .utils.utils import compute_position_from_vector
 
 from .consts import Tiles, Direction
+from .connectivity import FreeSpaceIndex
+from .distance import DistanceFields
+from .enemies import EnemyTracker
+from .utils.profiling import profiler
+
+ENEMY_DANGER_COST = 500 # Cost of a cell an enemy head can reach in one move, divided by the move for later ones
 
 class Grid:
     def __init__(self, size: tuple[int, int], grid: list[list], age_update_rate: int = 1, slow_down_effect: int = 0):
@@ -20,14 +28,24 @@ class Grid:
 
         self._prev_enemy_body = set()
         self._enemies_exist = False # Enemy presence
+        self._enemies = EnemyTracker() # Enemy snakes followed across updates
         
         self._ate_food = False
         self._ate_super_food = 0  # Tracks remaining duration of the effect
+        self._free_at: dict[tuple[int, int], int] = {} # Body segment -> moves after which it can be entered
 
         self._age_update_rate = age_update_rate # Allows Tiles to age every <age_update_rate> steps
         self._slow_down_effect = slow_down_effect # Allows Tiles within sight to age slower
         self._age_growth_rate = 1.12 # age *=  age_growth_rate
 
+        self._changed_cells = set() # Cells whose tile changed during the last update
+        self._update_count = 0
+        self._last_step: Optional[int] = None
+        self._skipped_states = 0 # States applied by `update_skipped` since the last update
+        self._free_space = None # FreeSpaceIndex, built on first use
+        self._distances = None # DistanceFields, built on first use
+        self._age_density: dict[int, np.ndarray] = {} # Age density map of each radius, for the current update
+
     def __repr__(self):
         return f"Grid(size={self.size}, stones={len(self.stones)} stones, food={len(self.food)} items, super_food={len(self.super_food)} items)"
 
@@ -86,10 +104,70 @@ class Grid:
         #    raise ValueError(f"Invalid value for traverse: {traverse}. Expected a boolean.")
         self._traverse = traverse
 
+    @property
+    def changed_cells(self) -> set[tuple[int, int]]:
+        return self._changed_cells
+
+    @property
+    def update_count(self) -> int:
+        return self._update_count
+
+    @property
+    def free_space(self) -> FreeSpaceIndex:
+        """Connected components and cut cells of the passable cells, kept in sync by `update`."""
+        if self._free_space is None:
+            self._free_space = FreeSpaceIndex()
+            self._free_space.rebuild(self)
+        elif self._free_space.traverse != self.traverse:
+            self._free_space.rebuild(self)
+        return self._free_space
+
+    @property
+    def distances(self) -> DistanceFields:
+        """Cached BFS distance fields of the grid."""
+        if self._distances is None:
+            self._distances = DistanceFields(self)
+        return self._distances
+
+    def age_density(self, radius: int) -> np.ndarray:
+        """
+        Sum of the ages of the VISITED tiles within `radius` (euclidean, wrapping like `get_zone`) of every cell,
+        indexed [x, y]. Computed once per update and radius.
+        """
+        density = self._age_density.get(radius)
+        if density is None:
+            ages = np.array([
+                [tile[1] if isinstance(tile, tuple) and tile[0] == Tiles.VISITED else 0.0 for tile in column]
+                for column in self.grid
+            ])
+            density = np.zeros_like(ages)
+            for dx, dy in self._disc_offsets(radius):
+                density += np.roll(ages, (-dx, -dy), axis=(0, 1)) # density[x, y] += ages[x + dx, y + dy]
+            self._age_density[radius] = density
+        return density
+
+    @staticmethod
+    def _disc_offsets(radius: int) -> list[tuple[int, int]]:
+        return [
+            (dx, dy)
+            for dx in range(-radius, radius + 1)
+            for dy in range(-radius, radius + 1)
+            if math.hypot(dx, dy) <= radius
+        ]
+
+    @property
+    def free_at(self) -> dict[tuple[int, int], int]:
+        return self._free_at
+
     @property
     def prev_enemy_body(self) -> set:
         return self._prev_enemy_body
 
+    @property
+    def enemies(self) -> EnemyTracker:
+        """Enemy snakes in sight and the cells their heads can reach in the next moves."""
+        return self._enemies
+
     @property
     def enemies_exist(self) -> bool:
         return self._enemies_exist
@@ -167,12 +245,52 @@ class Grid:
         return self.grid[x][y]
     
 
+    def set_tile(self, pos: tuple[int, int], tile: Union[Tiles, tuple[Tiles, float, int]]):
+        """Set the tile at the given position and record the position as changed."""
+        x, y = pos
+        self.grid[x][y] = tile
+        self._changed_cells.add(pos)
+
+
     def update(self, snake, traverse: bool, step: int):    
+        if not self._skipped_states:
+            self._changed_cells = set() # Changes of skipped states are reported with this update
+        self._skipped_states = 0
+        self._update_count += 1
+        self._age_density = {}
         self.traverse = traverse
-        self._update_visited_tiles(snake.sight, step) 
-        eat_food, eat_super_food = self._update_food(snake.position, snake.sight)
-        self._update_enemy_snake_body(snake.position, snake.direction, snake.body, snake.sight)
-        self._update_snake_body(snake.position, snake.prev_body, snake.body, eat_food, eat_super_food)
+
+        steps = 1 if self._last_step is None else max(1, step - self._last_step) # Steps since the last update
+        self._last_step = step
+
+        with profiler.phase("grid.visited"):
+            self._update_visited_tiles(snake.sight, step, steps) 
+        with profiler.phase("grid.food"):
+            eat_food, eat_super_food = self._update_food(snake.position, snake.sight)
+        with profiler.phase("grid.enemies"):
+            self._update_enemy_snake_body(snake.position, snake.direction, snake.body, snake.sight)
+        with profiler.phase("grid.body"):
+            self._update_snake_body(snake.position, snake.prev_body, snake.body, eat_food, eat_super_food, steps)
+            self._update_free_at(snake.body)
+
+        if self._free_space is not None:
+            phase = profiler.phase("grid.free_space", changed=len(self._changed_cells)) if profiler.enabled else profiler.phase("grid.free_space")
+            with phase:
+                self._free_space.apply_changes(self, self._changed_cells)
+
+    def update_skipped(self, pos: tuple[int, int], sight: dict[int, dict[int, Tiles]]):
+        """
+        Apply a state that was skipped for a newer one. Only what the newer state can't tell is kept:
+        the tiles seen and the foods found or eaten on the way. Bodies and aging are left to `update`.
+        """
+        if not self._skipped_states:
+            self._changed_cells = set()
+        self._skipped_states += 1
+        self._age_density = {}
+
+        self._update_visited_tiles(sight, self._last_step or 0, 0)
+        _, eat_super_food = self._update_food(pos, sight)
+        if eat_super_food: self.ate_super_food = 3 # Body may shrink, redraw it on the next update
         
     def _update_food(self, pos: tuple[int, int], sight: dict[int, dict[int, Tiles]]) -> bool:
         """Update the food and super food positions on the grid."""
@@ -182,10 +300,10 @@ class Grid:
                 # Mark food and super_food 
                 if tile == Tiles.FOOD:
                     self._food.add((x, y))
-                    self.grid[x][y] = Tiles.FOOD  
+                    self.set_tile((x, y), Tiles.FOOD)
                 elif tile == Tiles.SUPER:
                     self._super_food.add((x, y)) 
-                    self.grid[x][y] = Tiles.SUPER
+                    self.set_tile((x, y), Tiles.SUPER)
                 elif tile in (Tiles.PASSAGE, Tiles.SNAKE): 
                     if (x, y) in self._food:
                         self._food.remove((x, y))
@@ -203,109 +321,119 @@ class Grid:
         return False, False
 
 
-    def _update_snake_body(self, pos: tuple[int, int], prev_body: list[tuple[int, int]], body: list[tuple[int, int]], eat_food: bool, eat_super_food: bool):
-        """Updates the snake's body on the grid based on its current position and previous body."""
+    def _update_snake_body(self, pos: tuple[int, int], prev_body: list[tuple[int, int]], body: list[tuple[int, int]], eat_food: bool, eat_super_food: bool, steps: int = 1):
+        """Updates the snake's body on the grid based on its current position and previous body (`steps` moves ago)."""
         if not prev_body: # Initial setup of the body 
             for segment in body:
-                x, y = segment
-                self.grid[x][y] = Tiles.SNAKE # Mark each body segment
+                self.set_tile(segment, Tiles.SNAKE) # Mark each body segment
             return
         
-        if self.ate_super_food > 0:  # If the super food effect is active
+        if self.ate_super_food > 0 or steps > 1:  # If the super food effect is active or states were skipped
             # Clear previous snake from grid 
             for segment in prev_body:
-                x, y = segment
-                self.grid[x][y] = (Tiles.VISITED, 1, 0) if (x, y) not in self.stones else Tiles.STONE
+                self.set_tile(segment, (Tiles.VISITED, 1, 0) if segment not in self.stones else Tiles.STONE)
             # Mark current snake in grid
             for segment in body:
-                x, y = segment
-                self.grid[x][y] = Tiles.SNAKE # Mark each body segment
+                self.set_tile(segment, Tiles.SNAKE) # Mark each body segment
 
-            self.ate_super_food -= 1  # Decrease the effect duration
+            self.ate_super_food = max(0, self.ate_super_food - steps)  # Decrease the effect duration
         else:
             # Mark Head
-            head_x, head_y = pos
-            self.grid[head_x][head_y] = Tiles.SNAKE 
+            self.set_tile(pos, Tiles.SNAKE)
 
             # Remove Tail
             prev_tail = prev_body[-1]
             if not self.ate_food:
-                prev_tail_x, prev_tail_y = prev_tail
-                self.grid[prev_tail_x][prev_tail_y] = (Tiles.VISITED, 1, 0) if (prev_tail_x, prev_tail_y) not in self.stones else Tiles.STONE
+                self.set_tile(prev_tail, (Tiles.VISITED, 1, 0) if prev_tail not in self.stones else Tiles.STONE)
 
         self.ate_food = True if eat_food == True else False
         if eat_super_food == True: self.ate_super_food = 3 
 
     
-    def _update_enemy_snake_body(self, pos: tuple[int, int], direction: Direction, body: list[list[int]], sight: dict[int, dict[int, Tiles]]):
-        """Updates the snake's enemy body on the grid based on snake's sight."""
-        
-        # Clear previous enemy body
-        for x, y in self.prev_enemy_body:
-            self.grid[x][y] = (Tiles.VISITED, 1, 0) if (x, y) not in self.stones else Tiles.STONE
-        
-        self.prev_enemy_body.clear()
+    def _update_free_at(self, body: list[tuple[int, int]]):
+        """
+        Moves after which each body segment can be entered: the segment `index` cells from the head leaves
+        after `len(body) - index` moves, and the head only enters a cell the move after it was left
+        (one move later while the snake grows).
+        """
+        growth = 1 if self.ate_food else 0
+        length = len(body)
+        self._free_at = {segment: length - index + growth for index, segment in enumerate(body)}
 
-        self.enemies_exist = False
-        # Mark the current enemy body
-        for x, y_tile in sight.items():
-            for y, tile in y_tile.items():
-                if tile == Tiles.SNAKE and (x, y) not in body:
-                    self.grid[x][y] = Tiles.ENEMY
-                    self.prev_enemy_body.add((x, y))
-                    self.enemies_exist = True
 
-        if not self.enemies_exist: return
-        
-        map_direction_vector = {
-            Direction.NORTH: (0, -1),
-            Direction.SOUTH: (0, 1),
-            Direction.WEST: (-1, 0),
-            Direction.EAST: (1, 0)
+    def _update_enemy_snake_body(self, pos: tuple[int, int], direction: Direction, body: list[list[int]], sight: dict[int, dict[int, Tiles]]):
+        """
+        Updates the snake's enemy body on the grid based on snake's sight, and the cells enemy heads can move into next.
+        Only the cells that changed are written: marked cells left by the enemies get their tile back, new ones are marked.
+        """
+        previous = self._prev_enemy_body
+        enemy_cells = {
+            (x, y) for x, y_tile in sight.items() for y, tile in y_tile.items()
+            if tile == Tiles.SNAKE and (x, y) not in body
         }
 
-        # Detect enemy heads
-        enemy_heads = set()
-        for segment in self.prev_enemy_body:
-            # Check all neighboring tiles
-            neighbors = [
-                compute_next_position(segment, dir, self.size, grid_traverse=True)
-                for dir, _ in map_direction_vector.items()
-            ]
-
-            # Count the number of neighbors that are enemy body parts
-            enemy_neighbors = sum(1 for neighbor in neighbors if self.get_tile(neighbor) == Tiles.ENEMY)
-
-            # If a segment has fewer than two enemy neighbors, it's likely the head
-            if enemy_neighbors < 3:
-                enemy_heads.add(segment)
-
-        # Mark surrounding positions of enemy heads
-        for head in enemy_heads:
-            for dir in map_direction_vector.keys():
-                surrounding_pos = compute_next_position(head, dir, self.size, grid_traverse=True)
-                if self.get_tile(surrounding_pos) not in (Tiles.SNAKE, Tiles.ENEMY):
-                    x, y = surrounding_pos
-                    self.grid[x][y] = Tiles.ENEMY_SUPPOSITION
-                    self.prev_enemy_body.add(surrounding_pos)
-
-        #print(f"Enemy head {enemy_heads}")
+        # Enemy bodies first, the tracker predicts the heads' moves around them
+        for cell in previous - enemy_cells:
+            if self.get_tile(cell) == Tiles.ENEMY:
+                self.set_tile(cell, self._unmarked_tile(cell))
+        for cell in enemy_cells:
+            if self.get_tile(cell) != Tiles.ENEMY:
+                self.set_tile(cell, Tiles.ENEMY)
+        self.enemies_exist = bool(enemy_cells)
+
+        self._enemies.update(self, enemy_cells)
+
+        # Mark the cells a tracked head can move into on the next step
+        supposed = {
+            cell for cell, moves in self._enemies.danger.items()
+            if moves == 1 and self.get_tile(cell) not in (Tiles.SNAKE, Tiles.ENEMY)
+        }
+        for cell in previous - enemy_cells - supposed:
+            if self.get_tile(cell) == Tiles.ENEMY_SUPPOSITION:
+                self.set_tile(cell, self._unmarked_tile(cell))
+        for cell in supposed:
+            if self.get_tile(cell) != Tiles.ENEMY_SUPPOSITION:
+                self.set_tile(cell, Tiles.ENEMY_SUPPOSITION)
+
+        self._prev_enemy_body = enemy_cells | supposed
+
+    def _unmarked_tile(self, cell: tuple[int, int]) -> Union[Tiles, tuple[Tiles, float, int]]:
+        """Tile of a cell once no enemy (or enemy supposition) is on it."""
+        if cell in self.stones:
+            return Tiles.STONE
+        if cell in self._food:
+            return Tiles.FOOD
+        if cell in self._super_food:
+            return Tiles.SUPER
+        return (Tiles.VISITED, 1, 0)
+
+    def danger_cost(self, pos: tuple[int, int], moves: int) -> int:
+        """
+        Extra cost of entering `pos` after `moves` moves when an enemy head can be there by then, lower for later
+        predictions. Cells a head reaches in one move are ENEMY_SUPPOSITION tiles, priced by the planners' cost tables.
+        """
+        time = self._enemies.danger_time(pos)
+        if time is None or time < 2 or time > moves:
+            return 0
+        return ENEMY_DANGER_COST // time
 
         
     def update_snake_body(self, prev_body: set[tuple[int, int]], body: list[tuple[int, int]]):
         """Update snake body should only be used for deepcopies of grid"""
         # Clear snake
         for segment in prev_body:
-            x, y = segment
-            self.grid[x][y] = (Tiles.VISITED, 1, 0)
+            self.set_tile(segment, (Tiles.VISITED, 1, 0))
 
         # Mark snake body 
         for segment in body:
-            x, y = segment
-            self.grid[x][y] = Tiles.SNAKE
+            self.set_tile(segment, Tiles.SNAKE)
+
+        if self._free_space is not None:
+            self._free_space.apply_changes(self, self._changed_cells)
+        self._changed_cells = set()
             
 
-    def _update_visited_tiles(self, sight: dict[int, dict[int, Tiles]], step: int):    
+    def _update_visited_tiles(self, sight: dict[int, dict[int, Tiles]], step: int, steps: int = 1):    
         """
         Updates the aging of VISITED tiles on the grid and converts PASSAGE tiles within sight to VISITED.
 
@@ -330,6 +458,9 @@ class Grid:
             
         step : int
             The current game step, used to determine if aging should occur based on `age_update_rate`.
+
+        steps : int
+            Steps since the previous update, tiles age once per `age_update_rate` multiple crossed (0 never ages).
         
         Note:
         -----------
@@ -337,23 +468,25 @@ class Grid:
         - Slow down effect is temporary
         """
         # Step 1: Increase the age of all visited tiles by 1 every `self.age_update_rate` steps
-        if step % self.age_update_rate == 0: 
+        agings = step // self.age_update_rate - (step - steps) // self.age_update_rate
+        if agings > 0: 
             for x in range(self.hor_tiles):
                 for y in range(self.ver_tiles):
                     tile_value = self.grid[x][y]
                     if isinstance(tile_value, tuple) and tile_value[0] == Tiles.VISITED:
                         age, slow_down_effect = tile_value[1], tile_value[2]
-                        if slow_down_effect > 0:
-                            self.grid[x][y] = (Tiles.VISITED, age, slow_down_effect - 1)
-                        else:
-                            age *= self._age_growth_rate
-                            self.grid[x][y] = (Tiles.VISITED, age, 0)
+                        for _ in range(agings):
+                            if slow_down_effect > 0:
+                                slow_down_effect -= 1
+                            else:
+                                age *= self._age_growth_rate
+                        self.grid[x][y] = (Tiles.VISITED, age, slow_down_effect)
         
         # Step 2: Mark all PASSAGE tiles within sight as VISITED with age 1 and a fixed slow-down effect
         for x, y_tile in sight.items():
             for y, tile in y_tile.items():
                 if tile == Tiles.PASSAGE:
-                    self.grid[x][y] = (Tiles.VISITED, 1, self.slow_down_effect)
+                    self.set_tile((x, y), (Tiles.VISITED, 1, self.slow_down_effect))
             
       
     def get_zone(self, pos: tuple[int, int], size: int) -> dict[int, dict[int, Tiles]]:
@@ -370,7 +503,11 @@ class Grid:
         return zone
 
 
-    def is_blocked(self, position):
+    def is_blocked(self, position, depth: Optional[int] = None):
+        """
+        Check if a position can't be entered. With `depth` (moves made once the position is entered) the
+        snake's own body segments are free once the tail has retracted past them, see `free_at`.
+        """
         x, y = position
         
         # Out of bounds
@@ -383,7 +520,9 @@ class Grid:
             return False
         if tile_type == Tiles.STONE:
             return not self.traverse
-        if tile_type == Tiles.SNAKE or tile_type == Tiles.ENEMY:
+        if tile_type == Tiles.SNAKE:
+            return depth is None or depth <= self._free_at.get(position, depth)
+        if tile_type == Tiles.ENEMY:
             return True
         if tile_type == Tiles.ENEMY_SUPPOSITION:
             return False
@@ -393,7 +532,7 @@ class Grid:
         raise ValueError(f"Unknown tile type: {tile_type}")
         
 
-    def calculate_pos(self, current: tuple[int, int], direction: Direction) -> tuple[int, int]:
+    def calculate_pos(self, current: tuple[int, int], direction: Direction, depth: Optional[int] = None) -> tuple[int, int]:
         cur_x, cur_y = current
         dx, dy = {
             Direction.NORTH: (0, -1),
@@ -413,7 +552,7 @@ class Grid:
         new_pos = (new_x, new_y)
 
         # Ensure the position is not blocked
-        return new_pos if not self.is_blocked(new_pos) else current
+        return new_pos if not self.is_blocked(new_pos, depth) else current
     
 
     def get_neighbours(
@@ -421,8 +560,9 @@ class Grid:
             actions: list[Direction], 
             current_pos: tuple[int, int], 
             current_direction: Direction, 
+            depth: Optional[int] = None,
             ) -> list[tuple[tuple[int, int], Direction]]:
-        """Return neighbors of the current position, avoiding reverse direction."""
+        """Return neighbors of the current position, avoiding reverse direction (`depth`: moves made once a neighbour is entered, see `is_blocked`)."""
         map_opposite_direction = {
             Direction.NORTH: Direction.SOUTH,
             Direction.SOUTH: Direction.NORTH,
@@ -437,7 +577,7 @@ class Grid:
             if action == map_opposite_direction.get(current_direction):
                 continue
             
-            new_position = self.calculate_pos(current_pos, action)
+            new_position = self.calculate_pos(current_pos, action, depth)
             
             if current_pos != new_position:
                 neighbours.add((new_position, action))
@@ -1,9 +1,14 @@
+import itertools
+
 from typing import Optional
 
 from .consts import Direction
 
 from collections import deque
 from .grid import Grid
+from .utils.profiling import profiler
+
+CHECK_COUNTERS = {result: f"free_space_check.{result}" for result in (True, False, None)} # Built once, the check is a hot path
 
 
 class Safety:
@@ -27,7 +32,7 @@ class Safety:
 
             # Exit early if threshold is exceeded
             if reachable_cells >= threshold:
-                return reachable_cells
+                break
 
             # Retrieve neighbors
             neighbors = grid.get_neighbours(self.actions, current_pos, current_dir)
@@ -35,4 +40,51 @@ class Safety:
                 if neighbor_pos not in visited:
                     queue.append((neighbor_pos, neighbor_dir))
                     
-        return reachable_cells
\ No newline at end of file
+        profiler.count("flood_fill.calls")
+        profiler.count("flood_fill.cells", reachable_cells)
+        return reachable_cells
+
+
+    def free_space_check(self, grid: Grid, path: deque[tuple[int, int]], body: list[tuple[int, int]], threshold: int) -> Optional[bool]:
+        """
+        Answer "will following `path` box the snake in?" from the grid's free space index, without a flood fill.
+
+        Returns:
+            True if the goal keeps at least `threshold` free cells: its component minus the path cells, which
+            can't split it (`FreeSpaceIndex.keeps_connected` on the whole path, not one cell at a time).
+            False if even the goal component, plus every cell the tail vacates and the components touching them, is below `threshold`.
+            None if the index can't tell, the caller should run `flood_fill` on the hypothetical grid.
+        """
+        if not path:
+            return None
+        
+        with profiler.phase("free_space_check"):
+            result = self._free_space_check(grid, path, body, threshold)
+        profiler.count(CHECK_COUNTERS[result]) # How often the flood fill is avoided
+        return result
+
+    def _free_space_check(self, grid: Grid, path: deque[tuple[int, int]], body: list[tuple[int, int]], threshold: int) -> Optional[bool]:
+        index = grid.free_space
+        goal = path[-1]
+        goal_label = index.component_of(goal)
+        if goal_label is None:
+            return None # Goal is not a free cell of the current grid
+
+        # Lower bound --> The path cells before the goal are lost (the flood fill starts on the goal), the vacated tail cells are ignored
+        lost = [cell for cell in dict.fromkeys(itertools.islice(path, len(path) - 1)) if index.component_of(cell) == goal_label]
+        if index.component_size(goal) - len(lost) >= threshold and index.keeps_connected(lost):
+            return True
+
+        # Upper bound --> Goal component plus the vacated tail cells and the components around them
+        vacated = body[-len(path):]
+        labels = {goal_label}
+        for segment in vacated:
+            for neighbour in index.neighbours(segment):
+                label = index.component_of(neighbour)
+                if label is not None:
+                    labels.add(label)
+        upper_bound = len(vacated) + sum(index.label_size(label) for label in labels)
+        if upper_bound < threshold:
+            return False
+
+        return None
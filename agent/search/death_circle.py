@@ -1,4 +1,3 @@
-import time
 import copy
 
 from collections import deque
@@ -10,15 +9,19 @@ from ..snake import Snake
 from ..grid import Grid
 from ..safety import Safety
 
-from ..utils.utils import compute_body
+from ..body import Body
+from .tail_chase import TailChase
+from ..utils.deadline import Deadline
+from ..utils.profiling import profiler
 
 
 class Survival:
-    def __init__(self, actions: Optional[list[Direction]] = None):
+    def __init__(self, actions: Optional[list[Direction]] = None, tail_chase: Optional[TailChase] = None):
         self.actions = actions or [Direction.WEST, Direction.EAST, Direction.NORTH, Direction.SOUTH]
         self.safety = Safety()
+        self.tail_chase = tail_chase or TailChase(self.actions) # Last resort when no depth-2 goal is found
 
-    def get_path(self, snake: Snake, grid: Grid, goal_depth: int) -> Optional[deque[tuple[int, int]]]:
+    def get_path(self, snake: Snake, grid: Grid, goal_depth: int, deadline: Optional[Deadline] = None) -> Optional[deque[tuple[int, int]]]:
         """
         Find the path to the best goal based on reachable tiles at depth 2.
         
@@ -26,13 +29,18 @@ class Survival:
             snake (Snake): The snake object containing its current position, direction, and body.
             grid (Grid): The game grid object, providing access to tiles and utility methods.
             goal_depth (int): The maximum depth till the search is broken 
+            deadline (Deadline | None): Time budget of the search, the goals found so far are used when it expires
         Returns:
-            deque[tuple[int, int]] | None: A deque representing the path to the selected goal tile, or `None` if no valid goal is found.
+            deque[tuple[int, int]] | None: A deque representing the path to the selected goal tile, the path to the tail if no valid goal is found, or `None` if neither exists.
         """
 
         flood_fill_threshold = snake.size * (1.4 if snake.size >= 80 else 1.8) + 10
 
-        path = self.compute_goal_path(snake, grid, goal_depth, flood_fill_threshold)
+        path = self.compute_goal_path(snake, grid, goal_depth, flood_fill_threshold, deadline)
+        if path is not None:
+            return path
+
+        path = self.tail_chase.get_path(snake, grid) # Follow the tail, it keeps moving out of the way
         if path is not None:
             return path
 
@@ -45,12 +53,13 @@ class Survival:
         grid: Grid,
         goal_depth: int,  
         flood_fill_threshold: int, 
+        deadline: Optional[Deadline] = None,
     ) -> Optional[deque[tuple[int, int]]]:
         """Perform BFS to explore all possible paths up to a depth of 2 and find the best goal."""
         grid_copy = copy.deepcopy(grid)
         prev_body = set(snake.body) # Save every snake position represented in the grid
         
-        queue = deque([(snake.position, snake.direction, snake.body, 0)])  # (position, direction, body, depth)
+        queue = deque([(snake.position, snake.direction, Body.from_list(snake.body), 0)])  # (position, direction, body, depth)
         came_from = {}  # Tracks the path to reconstruct
         goals = set()  # Goals hold (goal_pos, reachable_tiles)
 
@@ -59,27 +68,34 @@ class Survival:
         while queue:
             current_pos, current_dir, current_body, current_depth = queue.popleft()
 
-            # Stop exploring further if depth exceeds 2
-            if current_depth > goal_depth:
+            # Stop exploring further if depth exceeds 2 or out of time
+            if current_depth > goal_depth or (deadline and deadline.expired()):
                 break
 
             # At depth 2, calculate reachable tiles
             if current_depth == goal_depth:
-                grid_copy.update_snake_body(prev_body, current_body) # Update grid with new body
+                path = self.reconstruct_path(came_from, current_pos)
+                if self.safety.free_space_check(grid, path, snake.body, flood_fill_threshold):
+                    goals.add((current_pos, flood_fill_threshold)) # Enough space left, no need to flood fill
+                    continue
+                body_segments = current_body.materialize() # Only built for tested goals
+                grid_copy.update_snake_body(prev_body, body_segments) # Update grid with new body
                 prev_body.clear()               # Clear the old body
-                prev_body.update(current_body)  # Add the new body
+                prev_body.update(body_segments)  # Add the new body
                 reachable_cells = self.safety.flood_fill(grid, current_pos, current_dir, flood_fill_threshold)
                 goals.add((current_pos, reachable_cells))
                 continue
 
             # Explore neighbors
-            neighbors = grid.get_neighbours(self.actions, current_pos, current_dir)
+            neighbors = grid.get_neighbours(self.actions, current_pos, current_dir, depth=current_depth + 1)
             for neighbor_pos, neighbor_dir in neighbors:
                 if neighbor_pos not in visited:
                     visited.add(neighbor_pos)
-                    queue.append((neighbor_pos, neighbor_dir, compute_body(neighbor_pos, current_body), current_depth + 1))
+                    queue.append((neighbor_pos, neighbor_dir, current_body.move(neighbor_pos), current_depth + 1))
                     came_from[neighbor_pos] = current_pos
 
+        profiler.count("survival.nodes", len(visited))
+
         # Select the best goal based on reachable tiles
         if goals:
             best_goal = max(goals, key=lambda g: g[1])[0]  # Select the goal with the maximum reachable tiles
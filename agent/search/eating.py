@@ -1,4 +1,4 @@
-import time
+import math
 import copy
 import heapq
 
@@ -11,7 +11,9 @@ from ..snake import Snake
 from ..grid import Grid
 from ..safety import Safety
 
-from ..utils.utils import compute_body, get_start_time
+from ..body import Body
+from ..utils.deadline import Deadline
+from ..utils.profiling import profiler
 
 
 class Eating:
@@ -40,9 +42,19 @@ class Eating:
         self.default_cost = 5
         self.safety = Safety()
 
+        self.epsilons = (2.0, 1.5, 1.0) # Heuristic weights of the anytime passes
+        self.budget_ms = 85 # Default time budget
 
-    def get_path(self, snake: Snake, grid: Grid) -> Optional[deque[tuple[int, int]]]:
-        """Find the lowest cost path using A* from the snake's current position to the closest reachable food"""
+
+    def get_path(self, snake: Snake, grid: Grid, deadline: Optional[Deadline] = None) -> Optional[deque[tuple[int, int]]]:
+        """
+        Find the lowest cost path from the snake's current position to the closest reachable and safe food.
+
+        Anytime search: weighted A* passes with decreasing epsilon (`self.epsilons`), each one a single pass over every food.
+        The first pass is greedy and fast, it always runs to the end so there is an answer (the deadline is only
+        checked by the next ones, which improve the path while it allows it). Returns the best path found.
+        """
+        deadline = deadline or Deadline(self.budget_ms)
                 
         # Super food cost
         self.goal_tile_costs["food"][Tiles.SUPER] = 0 if snake.eat_super_food else 100
@@ -50,96 +62,139 @@ class Eating:
         # Flood Fill threshold
         flood_fill_threshold = snake.size * (1.4 if snake.size >= 80 else 1.8)
 
-        goals_queue = self.sort_goals(snake.position, grid.food, grid.super_food, grid.size, grid.traverse, snake.eat_super_food)
-        if not goals_queue and snake.eat_super_food: 
+        goals = self.get_goals(grid.food, grid.super_food, snake.eat_super_food)
+        if not goals and snake.eat_super_food: 
             raise ValueError(f"No food found in grid.food: {grid.food}. No food found in grid.super_food: {grid.super_food}")
-        elif not goals_queue: 
+        elif not goals: 
             raise ValueError(f"No food found in grid.food: {grid.food}.")
             
-        for goal in goals_queue:
-            goal_type = "food" if goal in grid.food else "super_food"
-            if grid.get_tile(goal) == Tiles.ENEMY_SUPPOSITION: # Avoid making a danger move
-                continue
-            path = self.compute_goal_path(snake, grid, goal, goal_type, flood_fill_threshold)
-            if path is not None:
-                return path
+        goals = {goal for goal in goals if grid.get_tile(goal) != Tiles.ENEMY_SUPPOSITION} # Avoid making a danger move
+        if not goals:
+            return None
 
-        return None
+        grid_copy = copy.deepcopy(grid) # Shared by every pass
+        prev_body = set(snake.body) # Save every snake position represented in the grid
 
+        best_path, best_cost = None, float('inf')
+        for index, epsilon in enumerate(self.epsilons):
+            if index and deadline.expired():
+                break
+            pass_deadline = deadline if index else Deadline(math.inf) # The greedy pass isn't cut short
+            result = self.compute_goals_path(snake, grid, grid_copy, prev_body, goals, flood_fill_threshold, epsilon, pass_deadline)
+            if result is None:
+                break # No safe goal left or out of time
+            path, cost = result
+            if cost < best_cost:
+                best_path, best_cost = path, cost
 
-    def compute_goal_path(self, snake: Snake, grid: Grid, goal: tuple[int, int], goal_type: str, flood_fill_threshold: int) -> Optional[deque[tuple[int, int]]]:
-        grid_copy = copy.deepcopy(grid)
-        prev_body = set(snake.body) # Save every snake position represented in the grid
+        return best_path
+
+
+    def compute_goals_path(
+            self, 
+            snake: Snake, 
+            grid: Grid, 
+            grid_copy: Grid, 
+            prev_body: set[tuple[int, int]], 
+            goals: set[tuple[int, int]], 
+            flood_fill_threshold: int, 
+            epsilon: float, 
+            deadline: Deadline) -> Optional[tuple[deque[tuple[int, int]], float]]:
+        """
+        Weighted A* (f = g + epsilon * h) towards every goal at once, guided by the distance to the closest remaining goal. 
+        Goals are tested as they are settled: the first safe one is returned with its cost, an unsafe one is dropped 
+        from `goals` (for the next passes too) and the search goes on.
+        """
+        cost_type = "food" if goals & grid.food else "super_food" # Single cost table for the whole search
         
         open_list = []
-        heapq.heappush(open_list, (0, snake.position, snake.direction, snake.body))  # (f_cost, position, direction, body)
+        goal_distances = grid.distances.nearest(goals) # Heuristic: moves to the closest goal around the stones
+        start_x, start_y = snake.position
+        start_f_cost = epsilon * goal_distances[start_x][start_y]
+        heapq.heappush(open_list, (start_f_cost, 0, snake.position, snake.direction, Body.from_list(snake.body)))  # (f_cost, g_cost, position, direction, body)
         visited = set() # Visited positions
 
         came_from = {}
         g_costs = {snake.position: 0} # Stores the cost from start to each position
-        f_costs = {snake.position: self.heuristic(snake.position, goal, grid.size, grid.traverse)} # g_score + heuristic
 
         while open_list:
-            if (time.time() - get_start_time()) * 1000 > 85: 
-                print("Exit due to computational time")
-                break # Exit cycle if the computation time exceeds 85ms 
+            if deadline.expired(): 
+                profiler.count("eating.timeouts")
+                break # Exit cycle if the computation exceeds the deadline
 
-            current_cost, current_pos, current_direction, current_body = heapq.heappop(open_list) # Pop node with the lowest f_score from heap
+            _, current_cost, current_pos, current_direction, current_body = heapq.heappop(open_list) # Pop node with the lowest f_score from heap
             
             if current_pos in visited:
                 continue # Position has already been visited
                 
-            # Check if the current position is a passage tile 
-            if self.is_valid_goal(grid_copy, current_pos, current_direction, goal, goal_type, prev_body, current_body, flood_fill_threshold):
-                return self.reconstruct_path(came_from, current_pos)
+            # Goal Test
+            if current_pos in goals:
+                goal_type = "food" if current_pos in grid.food else "super_food"
+                path = self.reconstruct_path(came_from, current_pos)
+                if self.is_valid_goal(grid, grid_copy, path, current_direction, goal_type, prev_body, current_body, snake.body, flood_fill_threshold):
+                    profiler.count("eating.nodes", len(visited))
+                    return path, current_cost
+                goals.discard(current_pos) # Unsafe goal, keep searching for the others
+                if not goals:
+                    break
+                goal_distances = grid.distances.nearest(goals)
             
             visited.add(current_pos) # Add current position to visited 
             
             # Explore neighbours
-            neighbours = grid.get_neighbours(self.actions, current_pos, current_direction)
+            neighbours = grid.get_neighbours(self.actions, current_pos, current_direction, depth=current_body.moves + 1)
 
             for neighbour_pos, neighbour_dir in neighbours:
                 tile_value = grid.get_tile(neighbour_pos)
-                tile_cost = self.get_tile_cost(tile_value, goal_type)  # Get the correct cost based on the tile type and age
-                new_cost = current_cost + tile_cost
+                tile_cost = self.get_tile_cost(tile_value, cost_type)  # Get the correct cost based on the tile type and age
+                new_cost = current_cost + tile_cost + grid.danger_cost(neighbour_pos, current_body.moves + 1) # Enemy heads that can get there first
                 
-                # Update g_score, f_score, and add to open list if it has not been processed or has a better score
+                # Update g_score and add to open list if it has not been processed or has a better score
                 if neighbour_pos not in g_costs or new_cost < g_costs.get(neighbour_pos, float('inf')):
                     came_from[neighbour_pos] = current_pos
                     g_costs[neighbour_pos] = new_cost
-                    f_cost = new_cost + self.heuristic(neighbour_pos, goal, grid.size, grid.traverse)
-                    f_costs[neighbour_pos] = f_cost
-                    heapq.heappush(open_list, (f_cost, neighbour_pos, neighbour_dir, compute_body(neighbour_pos, current_body)))
+                    f_cost = new_cost + epsilon * goal_distances[neighbour_pos[0]][neighbour_pos[1]]
+                    heapq.heappush(open_list, (f_cost, new_cost, neighbour_pos, neighbour_dir, current_body.move(neighbour_pos)))
 
-        return None # No path to goal found
+        profiler.count("eating.nodes", len(visited))
+        return None # No path to a safe goal found
 
     
     def is_valid_goal(
             self, 
             grid: Grid, 
-            current_pos: tuple[int, int], 
+            grid_copy: Grid, 
+            path: deque[tuple[int, int]], 
             current_dir: Direction, 
-            goal: tuple[int, int], 
             goal_type: str,
             prev_body: set[tuple[int, int]], 
-            current_body: list[tuple[int, int]],
+            current_body: Body,
+            body: list[tuple[int, int]],
             flood_fill_threshold: int) -> bool:
         """Check if the goal when using flood fill suprasses X amount of available cells to visit --> Avoids Box in situations"""
-        if current_pos == goal:
-            grid.update_snake_body(prev_body, current_body) # Update grid with new body
-            prev_body.clear()               # Clear the old body
-            prev_body.update(current_body)  # Add the new body
-
-            previous_traverse = grid.traverse  # Save the current traverse state 
-            if goal_type == "super_food":
-                grid.traverse = False  # Update grid traversal to False since eating a super food can change the traverse state of the grid
-            
-            reachable_cells = self.safety.flood_fill(grid, current_pos, current_dir, flood_fill_threshold)
-            
-            if goal_type == "super_food":
-                grid.traverse = previous_traverse  # Restore grid traversal state
+        current_pos = path[-1] if path else current_body.head
+
+        # A super food is checked with traverse off (eating it may toggle traverse), the index only matches that when traverse is already off
+        if goal_type == "food" or not grid.traverse:
+            free_space = self.safety.free_space_check(grid, path, body, flood_fill_threshold)
+            if free_space is not None:
+                return free_space
+
+        body_segments = current_body.materialize() # Only built for tested goals
+        grid_copy.update_snake_body(prev_body, body_segments) # Update grid with new body
+        prev_body.clear()               # Clear the old body
+        prev_body.update(body_segments)  # Add the new body
+
+        previous_traverse = grid_copy.traverse  # Save the current traverse state 
+        if goal_type == "super_food":
+            grid_copy.traverse = False  # Update grid traversal to False since eating a super food can change the traverse state of the grid
+        
+        reachable_cells = self.safety.flood_fill(grid_copy, current_pos, current_dir, flood_fill_threshold)
+        
+        if goal_type == "super_food":
+            grid_copy.traverse = previous_traverse  # Restore grid traversal state
 
-            return reachable_cells >= flood_fill_threshold
+        return reachable_cells >= flood_fill_threshold
 
     def reconstruct_path(self, came_from: dict[tuple[int, int], tuple[int, int]], current: tuple[int, int]) -> deque[tuple[int, int]]:
         """Reconstruct the path from start to target using came_from dictionary."""
@@ -149,60 +204,15 @@ class Eating:
             current = came_from[current]
         return path  # Return deque directly
     
-    def sort_goals(
+    def get_goals(
         self,
-        cur_pos: tuple[int, int],
         food_positions: set[tuple[int, int]],
         super_food_positions: set[tuple[int, int]],
-        grid_size: tuple[int, int],
-        grid_traverse: bool,
         eat_super_food: bool
-    ) -> Optional[list[tuple[int, int]]]:
-        """Find the closest foods positions to the start position, using a min-heap to optimize selection."""
-        
-        if not food_positions and not (eat_super_food and super_food_positions):
-            return None  # No food available to target
-
-        target_positions = food_positions | super_food_positions if eat_super_food else food_positions
-
-        # Priority heap for goals
-        heap = [
-            (self.heuristic(cur_pos, pos, grid_size, grid_traverse), pos)
-            for pos in target_positions
-        ]
-        heapq.heapify(heap)  
-        
-        # Extract the closest 3 goals (if there are that many) from the heap
-        closest_goals = []
-        for _ in range(min(3, len(heap))):
-            closest_goals.append(heapq.heappop(heap)[1])  # Pop and collect the positions
-
-        return closest_goals
+    ) -> set[tuple[int, int]]:
+        """Return every known food position the snake is allowed to eat."""
+        return food_positions | super_food_positions if eat_super_food else set(food_positions)
 
-    def heuristic(self, pos: tuple[int, int], goal: tuple[int, int], grid_size: tuple[int, int], grid_traverse: bool) -> int:
-        """Heuristic function that calculates Manhattan distance with wrap-around consideration."""
-        pos_x, pos_y = pos
-        goal_x, goal_y = goal
-        grid_width, grid_height = grid_size
-
-        # Calculate the direct distance along each axis
-        dx = abs(pos_x - goal_x)
-        dy = abs(pos_y - goal_y)
-
-        if not grid_traverse:
-            return dx + dy
-
-        # Calculate wrap-around distances along each axis
-        wrap_dx = grid_width - dx
-        wrap_dy = grid_height - dy
-
-        # Use the shorter distance for each axis
-        shortest_dx = min(dx, wrap_dx)
-        shortest_dy = min(dy, wrap_dy)
-
-        # Manhattan distance considering wrap-around
-        return shortest_dx + shortest_dy
-    
     def get_tile_cost(self, tile_value: Union[Tiles, tuple[Tiles, float, int]], goal_type: str) -> int:
         """Return the cost associated with a tile."""
         costs = self.goal_tile_costs[goal_type]
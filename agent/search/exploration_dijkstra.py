@@ -1,4 +1,3 @@
-import time
 import copy
 import heapq
 
@@ -11,7 +10,9 @@ from ..snake import Snake
 from ..grid import Grid
 from ..safety import Safety
 
-from ..utils.utils import compute_body, get_start_time
+from ..body import Body
+from ..utils.deadline import Deadline
+from ..utils.profiling import profiler
 
 class Exploration:
     def __init__(
@@ -28,9 +29,11 @@ class Exploration:
         }
         self.default_cost = 5
         self.safety = Safety()
+        self.budget_ms = 80 # Default time budget
+        self.goal_limit = 15 # Goals collected before choosing the best one (depth search)
 
         
-    def get_path(self, snake: Snake, grid: Grid, depth: bool = False, goal_age: Optional[int] = 5, flood_fill: bool = True) -> Optional[deque[tuple[int, int]]]: 
+    def get_path(self, snake: Snake, grid: Grid, depth: bool = False, goal_age: Optional[int] = 5, flood_fill: bool = True, deadline: Optional[Deadline] = None) -> Optional[deque[tuple[int, int]]]: 
         """
         Find the least costing path from the snake's current position to the best goal tile, considering `Tiles.VISITED` tiles with an age of at least 2. Uses a variant of Dijkstra's algorithm to find paths in a grid.
 
@@ -45,6 +48,8 @@ class Exploration:
             flood_fill (bool):
                 - If 'True' the search will only consider a goal if the agent is able to access at least 'flood_fill_threshold' tiles
                 - If 'False' the search will not consider the tiles the agent is able to access after it reaches the chosen goal 
+            deadline (Deadline | None):
+                - Time budget of the search. When it expires the best goal found so far is used (`self.budget_ms` if not specified)
         Returns:
             deque[tuple[int, int]] | None: A deque representing the path to the selected goal tile, or `None` if no path to any valid goal is found.
                 - The path will contain grid positions leading to the best `Tiles.VISITED` tile.
@@ -62,19 +67,19 @@ class Exploration:
         else:
             flood_fill_threshold = None
 
-        path = self.compute_goal_path(snake, grid, depth, flood_fill_threshold)
+        path = self.compute_goal_path(snake, grid, depth, flood_fill_threshold, deadline or Deadline(self.budget_ms))
         if path is not None:
             return path
 
         return None
 
 
-    def compute_goal_path(self, snake: Snake, grid: Grid, depth: bool, flood_fill_threshold: Optional[int]) -> Optional[deque[tuple[int, int]]]:
+    def compute_goal_path(self, snake: Snake, grid: Grid, depth: bool, flood_fill_threshold: Optional[int], deadline: Deadline) -> Optional[deque[tuple[int, int]]]:
         grid_copy = copy.deepcopy(grid)
         prev_body = set(snake.body) # Save every snake position represented in the grid
 
         open_list = []
-        heapq.heappush(open_list, (0, snake.position, snake.direction, snake.body, 0)) # Queue holds (cost, position, direction, body, depth)
+        heapq.heappush(open_list, (0, snake.position, snake.direction, Body.from_list(snake.body), 0)) # Queue holds (cost, position, direction, body, depth)
         visited = set([snake.position])  # Visited positions
         
         came_from = {}  # Tracks the path
@@ -82,43 +87,48 @@ class Exploration:
         
         goals = set() # Goals hold (goal_pos, cost)
         first_goal_depth = 0  # Tracks the depth of the first goal found
+        expanded = 0 # Nodes popped, reported to the profiler
         
         while open_list:
-            if flood_fill_threshold and (time.time() - get_start_time()) * 1000 > 80: 
-                print("Exit due to computational time")
-                break # Exit cycle if the computation time exceeds 80ms  
+            if flood_fill_threshold and deadline.expired(): 
+                profiler.count("exploration.timeouts")
+                break # Exit cycle if the computation exceeds the deadline, best goal so far is used
             
             current_cost, current_pos, current_dir, current_body, current_depth = heapq.heappop(open_list)
+            expanded += 1
             
             # Early exit if the current node depth exceeds the first goal depth
-            if goals and depth and (current_depth > first_goal_depth + 1 or len(goals) >= 5):
+            if goals and depth and (current_depth > first_goal_depth + 1 or len(goals) >= self.goal_limit):
+                profiler.count("exploration.nodes", expanded)
                 best_goal = self.select_best_goal(goals, grid, snake.range)
                 return self.reconstruct_path(came_from, best_goal)
                 
             # Goal Test
             tile_value = grid.get_tile(current_pos)
-            if self.is_valid_goal(grid_copy, tile_value, current_pos, current_dir, prev_body, current_body, flood_fill_threshold):
+            if self.is_valid_goal(grid, grid_copy, tile_value, came_from, current_pos, current_dir, prev_body, current_body, snake.body, flood_fill_threshold):
                 if depth:
                     if not goals:
                         first_goal_depth = current_depth
                     goals.add((current_pos, current_cost))
                 else:
+                    profiler.count("exploration.nodes", expanded)
                     return self.reconstruct_path(came_from, current_pos)
 
             # Explore neighbours
-            neighbours = grid.get_neighbours(self.actions, current_pos, current_dir)
+            neighbours = grid.get_neighbours(self.actions, current_pos, current_dir, depth=current_depth + 1)
 
             for neighbour_pos, neighbour_dir in neighbours:
                 tile_value = grid.get_tile(neighbour_pos)
-                neighbour_cost = self.get_tile_cost(tile_value)
+                neighbour_cost = self.get_tile_cost(tile_value) + grid.danger_cost(neighbour_pos, current_depth + 1) # Enemy heads that can get there first
                 new_cost = current_cost + neighbour_cost
 
                 if neighbour_pos not in visited or new_cost < costs.get(neighbour_pos, float('inf')): # If cheaper path
                     visited.add(neighbour_pos)
                     costs[neighbour_pos] = new_cost
-                    heapq.heappush(open_list, (new_cost, neighbour_pos, neighbour_dir, compute_body(neighbour_pos, current_body), current_depth + 1))
+                    heapq.heappush(open_list, (new_cost, neighbour_pos, neighbour_dir, current_body.move(neighbour_pos), current_depth + 1))
                     came_from[neighbour_pos] = current_pos
 
+        profiler.count("exploration.nodes", expanded)
         if goals and depth:
             best_goal = self.select_best_goal(goals, grid, snake.range)
             return self.reconstruct_path(came_from, best_goal)
@@ -129,20 +139,28 @@ class Exploration:
     def is_valid_goal(
             self, 
             grid: Grid, 
+            grid_copy: Grid, 
             tile_value: Union[Tiles, tuple[Tiles, int]], 
+            came_from: dict[tuple[int, int], tuple[int, int]], 
             current_pos: tuple[int, int], 
             current_dir: Direction, 
             prev_body: set[tuple[int, int]], 
-            current_body: list[tuple[int, int]], 
+            current_body: Body, 
+            body: list[tuple[int, int]], 
             flood_fill_threshold: Optional[int]) -> bool:
         """Check if the tile is a valid goal (Tiles.VISITED with age >= 2)."""
         """Check if the goal when using flood fill suprasses X amount of available cells to visit --> Avoids Box in situations"""
         if isinstance(tile_value, tuple) and tile_value[0] == Tiles.VISITED and tile_value[1] >= self.goal_age:
             if flood_fill_threshold is None: return True
-            grid.update_snake_body(prev_body, current_body) # Update grid with new body
+            path = self.reconstruct_path(came_from, current_pos)
+            free_space = self.safety.free_space_check(grid, path, body, flood_fill_threshold)
+            if free_space is not None:
+                return free_space
+            body_segments = current_body.materialize() # Only built for tested goals
+            grid_copy.update_snake_body(prev_body, body_segments) # Update grid with new body
             prev_body.clear()               # Clear the old body
-            prev_body.update(current_body)  # Add the new body
-            reachable_cells = self.safety.flood_fill(grid, current_pos, current_dir, flood_fill_threshold)
+            prev_body.update(body_segments)  # Add the new body
+            reachable_cells = self.safety.flood_fill(grid_copy, current_pos, current_dir, flood_fill_threshold)
             return reachable_cells >= flood_fill_threshold
         return False
 
@@ -154,17 +172,13 @@ class Exploration:
 
 
     def select_best_goal(self, goals: set[tuple[int, int]], grid: Grid, size: int) -> tuple[int, int]:
-        """Select the goal with the maximum number of Tiles.PASSAGE in zone."""
+        """Select the goal with the oldest tiles in zone (sum of the ages within `size`), discounted by its cost."""
         best_goal = None
         min_goal_value = float('inf')
+        age_density = grid.age_density(size) # Sum of the ages in zone of every cell
         
         for goal_pos, goal_cost in goals:
-            zone = grid.get_zone(goal_pos, size)
-            sum_ages = sum(
-                tile[1] for row in zone.values() for tile in row.values() 
-                if isinstance(tile, tuple) and tile[0] == Tiles.VISITED
-            )
-            goal_value = goal_cost - sum_ages  # Lower value corresponds to a better exploration
+            goal_value = goal_cost - age_density[goal_pos]  # Lower value corresponds to a better exploration
         
             if goal_value < min_goal_value:
                 min_goal_value = goal_value
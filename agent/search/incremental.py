@@ -0,0 +1,250 @@
+import copy
+import heapq
+
+from collections import deque
+from typing import Optional
+
+from ..consts import Direction, Tiles
+
+from ..snake import Snake
+from ..grid import Grid
+from ..safety import Safety
+from ..body import Body
+
+from ..utils.utils import determine_direction
+from ..utils.deadline import Deadline
+
+
+class IncrementalEating:
+    """
+    D* Lite path from the snake's head to a fixed food, kept across ticks.
+
+    The search runs backwards from the food, so the moving head only shifts the priority keys (`km`).
+    Every tick the cells reported by `Grid.changed_cells` are repaired instead of replanning from scratch.
+    The planner resets itself whenever it missed a grid update or the traverse state changed.
+
+    Costs follow `Eating`'s food costs, floored at 1 so the Manhattan heuristic stays consistent.
+    """
+
+    def __init__(self):
+        self.tile_costs = {
+            Tiles.STONE: 1,
+            Tiles.VISITED: 1,
+            Tiles.ENEMY_SUPPOSITION: 500,
+            Tiles.FOOD: 1,
+            Tiles.SUPER: 100,
+        }
+        self.default_cost = 5
+        self.safety = Safety()
+
+        self._goal: tuple[int, int] = None
+        self.clear()
+
+    @property
+    def goal(self) -> Optional[tuple[int, int]]:
+        return self._goal
+
+    def clear(self):
+        """Forget the goal and the search tree."""
+        self._goal = None
+        self._reset_search()
+
+    def reset(self, goal: tuple[int, int]):
+        """Track a new goal, the search tree is built on the next `get_path` call."""
+        self._goal = goal
+        self._reset_search()
+
+    def _reset_search(self):
+        self._g: dict[tuple[int, int], float] = {}
+        self._rhs: dict[tuple[int, int], float] = {}
+        self._open: list = [] # Heap of (key, cell), stale entries are skipped
+        self._open_keys: dict[tuple[int, int], tuple[float, float]] = {}
+        self._km = 0
+        self._last_start: tuple[int, int] = None
+        self._last_update: int = None
+        self._traverse: bool = None
+        self._super_cost: int = None
+
+    def get_path(self, snake: Snake, grid: Grid, deadline: Optional[Deadline] = None) -> Optional[deque[tuple[int, int]]]:
+        """
+        Repair the search tree with the last grid changes and return the path to the goal (None if unreachable or unsafe).
+        If the deadline expires the repair is left in the open list and resumed on the next call.
+        """
+        if self._goal is None or self._goal not in grid.food:
+            self.clear()
+            return None
+
+        super_cost = 1 if snake.eat_super_food else 100
+        start = snake.position
+
+        if (
+            self._last_start is None
+            or self._traverse != grid.traverse
+            or self._super_cost != super_cost
+            or self._last_update != grid.update_count - 1
+        ):
+            self._initialize(grid, start, super_cost)
+        else:
+            self._km += self.heuristic(self._last_start, start, grid.size, grid.traverse)
+            self._last_start = start
+            for cell in grid.changed_cells:
+                for neighbour in self.adjacent(cell, grid):
+                    self._update_vertex(neighbour, start, grid) # Cost of every edge entering the cell changed
+        self._last_update = grid.update_count
+
+        if not self._compute_shortest_path(start, grid, deadline):
+            return None
+
+        path = self._extract_path(start, snake.direction, grid)
+        if path is None or not self.is_safe(snake, grid, path):
+            return None
+        return path
+
+    def _initialize(self, grid: Grid, start: tuple[int, int], super_cost: int):
+        self._reset_search()
+        self._traverse = grid.traverse
+        self._super_cost = super_cost
+        self.tile_costs[Tiles.SUPER] = super_cost
+        self._last_start = start
+        self._rhs[self._goal] = 0
+        self._push(self._goal, self._key(self._goal, start, grid))
+
+    def _key(self, cell: tuple[int, int], start: tuple[int, int], grid: Grid) -> tuple[float, float]:
+        best = min(self._g.get(cell, float('inf')), self._rhs.get(cell, float('inf')))
+        return (best + self.heuristic(start, cell, grid.size, grid.traverse) + self._km, best)
+
+    def _push(self, cell: tuple[int, int], key: tuple[float, float]):
+        self._open_keys[cell] = key
+        heapq.heappush(self._open, (key, cell))
+
+    def _top(self) -> Optional[tuple[tuple[float, float], tuple[int, int]]]:
+        """Return the lowest valid open entry, dropping stale ones."""
+        while self._open:
+            key, cell = self._open[0]
+            if self._open_keys.get(cell) == key:
+                return key, cell
+            heapq.heappop(self._open)
+        return None
+
+    def _update_vertex(self, cell: tuple[int, int], start: tuple[int, int], grid: Grid):
+        if cell != self._goal:
+            self._rhs[cell] = min(
+                (self.edge_cost(neighbour, grid) + self._g.get(neighbour, float('inf')) for neighbour in self.adjacent(cell, grid)),
+                default=float('inf'),
+            )
+        self._open_keys.pop(cell, None)
+        if self._g.get(cell, float('inf')) != self._rhs.get(cell, float('inf')):
+            self._push(cell, self._key(cell, start, grid))
+
+    def _compute_shortest_path(self, start: tuple[int, int], grid: Grid, deadline: Optional[Deadline]) -> bool:
+        """Process the open list until the head is consistent, return False if the deadline expired first."""
+        inf = float('inf')
+        while True:
+            if deadline and deadline.expired():
+                return False
+            top = self._top()
+            if top is None:
+                break
+            key_old, cell = top
+            if key_old >= self._key(start, start, grid) and self._rhs.get(start, inf) == self._g.get(start, inf):
+                break
+
+            key_new = self._key(cell, start, grid)
+            if key_old < key_new:
+                self._push(cell, key_new) # Key increased since it was queued
+                continue
+
+            heapq.heappop(self._open)
+            del self._open_keys[cell]
+            if self._g.get(cell, inf) > self._rhs.get(cell, inf):
+                self._g[cell] = self._rhs[cell] # Locally overconsistent
+                for neighbour in self.adjacent(cell, grid):
+                    self._update_vertex(neighbour, start, grid)
+            else:
+                self._g[cell] = inf # Locally underconsistent
+                self._update_vertex(cell, start, grid)
+                for neighbour in self.adjacent(cell, grid):
+                    self._update_vertex(neighbour, start, grid)
+        return True
+
+    def _extract_path(self, start: tuple[int, int], direction: Direction, grid: Grid) -> Optional[deque[tuple[int, int]]]:
+        """Follow the cheapest successors from the head to the goal."""
+        if self._g.get(start, float('inf')) == float('inf'):
+            return None
+
+        path = deque()
+        current = start
+        visited = {start}
+        while current != self._goal:
+            if len(path) > grid.hor_tiles * grid.ver_tiles:
+                return None
+            candidates = [
+                (self.edge_cost(neighbour, grid) + self._g.get(neighbour, float('inf')), neighbour)
+                for neighbour in self.adjacent(current, grid)
+                if neighbour not in visited
+            ]
+            if not candidates:
+                return None
+            cost, current = min(candidates)
+            if cost == float('inf'):
+                return None
+            visited.add(current)
+            path.append(current)
+
+        if direction is not None and determine_direction(start, path[0], grid.size) == self.opposite(direction):
+            return None # Can't reverse into the neck
+        return path
+
+    def is_safe(self, snake: Snake, grid: Grid, path: deque[tuple[int, int]]) -> bool:
+        """Check if the snake keeps enough free cells after following the path --> Avoids Box in situations"""
+        flood_fill_threshold = snake.size * (1.4 if snake.size >= 80 else 1.8)
+
+        free_space = self.safety.free_space_check(grid, path, snake.body, flood_fill_threshold)
+        if free_space is not None:
+            return free_space
+
+        body = Body.from_list(snake.body)
+        for pos in path:
+            body = body.move(pos)
+        grid_copy = copy.deepcopy(grid)
+        grid_copy.update_snake_body(set(snake.body), body.materialize())
+
+        last_pos = path[-2] if len(path) > 1 else snake.position
+        last_dir = determine_direction(last_pos, path[-1], grid.size)
+        return self.safety.flood_fill(grid_copy, path[-1], last_dir, flood_fill_threshold) >= flood_fill_threshold
+
+    def edge_cost(self, cell: tuple[int, int], grid: Grid) -> float:
+        """Return the cost of moving into `cell`."""
+        if grid.is_blocked(cell):
+            return float('inf')
+        tile_value = grid.get_tile(cell)
+        if isinstance(tile_value, tuple) and tile_value[0] == Tiles.VISITED:
+            return self.tile_costs[Tiles.VISITED]
+        return self.tile_costs.get(tile_value, self.default_cost)
+
+    def adjacent(self, pos: tuple[int, int], grid: Grid) -> list[tuple[int, int]]:
+        """Return the cells next to `pos`, blocked or not."""
+        x, y = pos
+        cells = []
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if grid.traverse:
+                cells.append((nx % grid.hor_tiles, ny % grid.ver_tiles))
+            elif 0 <= nx < grid.hor_tiles and 0 <= ny < grid.ver_tiles:
+                cells.append((nx, ny))
+        return cells
+
+    def opposite(self, direction: Direction) -> Direction:
+        return {
+            Direction.NORTH: Direction.SOUTH,
+            Direction.SOUTH: Direction.NORTH,
+            Direction.EAST: Direction.WEST,
+            Direction.WEST: Direction.EAST,
+        }[direction]
+
+    def heuristic(self, pos: tuple[int, int], goal: tuple[int, int], grid_size: tuple[int, int], grid_traverse: bool) -> int:
+        """Manhattan distance with wrap-around consideration."""
+        dx = abs(pos[0] - goal[0])
+        dy = abs(pos[1] - goal[1])
+        if not grid_traverse:
+            return dx + dy
+        return min(dx, grid_size[0] - dx) + min(dy, grid_size[1] - dy)
@@ -0,0 +1,299 @@
+import math
+import time
+import random
+import multiprocessing
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional
+
+from ..consts import Direction, SuperFood, Tiles
+
+from ..snake import Snake
+from ..grid import Grid
+
+from ..utils.deadline import Deadline
+
+
+MOVES = {
+    Direction.NORTH: (0, -1),
+    Direction.SOUTH: (0, 1),
+    Direction.WEST: (-1, 0),
+    Direction.EAST: (1, 0),
+}
+
+OPPOSITE = {
+    Direction.NORTH: Direction.SOUTH,
+    Direction.SOUTH: Direction.NORTH,
+    Direction.EAST: Direction.WEST,
+    Direction.WEST: Direction.EAST,
+}
+
+
+class SimState:
+    """
+    Compact model of our snake on the known map, stepped like the server does (`game.Snake.move` and
+    `game.Game.collision`). Super food outcomes are sampled like the server: a uniform `SuperFood` kind,
+    then a uniform amount. Foods that would spawn and enemy moves beyond the danger map are not modelled.
+    """
+    __slots__ = (
+        "size", "stones", "enemies", "danger", "food", "super_food",
+        "body", "occupied", "direction", "to_grow", "traverse", "range", "score", "alive", "moves",
+    )
+
+    def __init__(self, size, stones, enemies, danger, food, super_food, body, direction, to_grow, traverse, range):
+        self.size = size
+        self.stones = stones # Static sets are shared between copies
+        self.enemies = enemies
+        self.danger = danger # Cell -> earliest move an enemy head can be there
+        self.food = food # Replaced (not mutated) when eaten
+        self.super_food = super_food
+        self.body = deque(body) # Head first
+        self.occupied = set(body)
+        self.direction = direction
+        self.to_grow = to_grow
+        self.traverse = traverse
+        self.range = range
+        self.score = 0
+        self.alive = True
+        self.moves = 0
+
+    @classmethod
+    def from_grid(cls, snake: Snake, grid: Grid) -> "SimState":
+        enemies = frozenset(pos for pos in grid.prev_enemy_body if grid.get_tile(pos) == Tiles.ENEMY)
+        return cls(
+            grid.size, frozenset(grid.stones), enemies, dict(grid.enemies.danger),
+            frozenset(grid.food), frozenset(grid.super_food),
+            snake.body, snake.direction, 1 if grid.ate_food else 0, grid.traverse, snake.range,
+        )
+
+    def copy(self) -> "SimState":
+        copied = SimState.__new__(SimState)
+        for slot in SimState.__slots__:
+            setattr(copied, slot, getattr(self, slot))
+        copied.body = deque(self.body)
+        copied.occupied = set(self.occupied)
+        return copied
+
+    def next_position(self, direction: Direction) -> Optional[tuple[int, int]]:
+        """Return the head after moving in `direction`, None when it leaves the map without traverse."""
+        dx, dy = MOVES[direction]
+        x, y = self.body[0][0] + dx, self.body[0][1] + dy
+        width, height = self.size
+        if self.traverse:
+            return x % width, y % height
+        if 0 <= x < width and 0 <= y < height:
+            return x, y
+        return None
+
+    def is_safe(self, pos: Optional[tuple[int, int]]) -> bool:
+        """Check if the head can enter `pos` on the next move."""
+        if pos is None or pos in self.occupied or pos in self.enemies:
+            return False
+        if not self.traverse and pos in self.stones:
+            return False
+        danger = self.danger.get(pos)
+        return danger is None or danger > self.moves + 1
+
+    def safe_moves(self) -> list[tuple[Direction, tuple[int, int]]]:
+        moves = []
+        for direction in MOVES:
+            if direction == OPPOSITE.get(self.direction):
+                continue
+            pos = self.next_position(direction)
+            if self.is_safe(pos):
+                moves.append((direction, pos))
+        return moves
+
+    def step(self, direction: Direction, rng: random.Random):
+        """Move the snake one step, eating and sampling super food outcomes."""
+        pos = self.next_position(direction)
+        self.moves += 1
+        if not self.is_safe(pos):
+            self.alive = False
+            return
+
+        self.body.appendleft(pos)
+        self.occupied.add(pos)
+        if self.to_grow > 0:
+            self.to_grow -= 1
+        elif self.to_grow < 0 and len(self.body) > 3:
+            self.to_grow += 1
+            for _ in range(2):
+                self.occupied.discard(self.body.pop())
+        else:
+            self.occupied.discard(self.body.pop())
+        self.direction = direction
+
+        if pos in self.food:
+            self.food = self.food - {pos}
+            self.score += 1
+            self.grow(1)
+        elif pos in self.super_food:
+            self.super_food = self.super_food - {pos}
+            self.eat_super_food(rng)
+
+    def grow(self, amount: int):
+        self.to_grow = max(-len(self.body) + 1, self.to_grow + amount)
+
+    def eat_super_food(self, rng: random.Random):
+        kind = rng.choice([SuperFood.POINTS, SuperFood.LENGTH, SuperFood.RANGE, SuperFood.TRAVERSE])
+        if kind == SuperFood.POINTS:
+            self.score += rng.randint(-5, 10)
+        elif kind == SuperFood.LENGTH:
+            self.grow(rng.randint(-2, 2))
+        elif kind == SuperFood.RANGE:
+            self.range = min(max(self.range + rng.randint(-2, 2), 2), 6)
+        elif kind == SuperFood.TRAVERSE:
+            self.traverse = not self.traverse
+
+    def food_distance(self, pos: tuple[int, int]) -> int:
+        """Manhattan distance (wrapping with traverse) from `pos` to the closest food, 0 if none is known."""
+        width, height = self.size
+        best = None
+        for x, y in self.food:
+            dx, dy = abs(pos[0] - x), abs(pos[1] - y)
+            if self.traverse:
+                dx, dy = min(dx, width - dx), min(dy, height - dy)
+            best = dx + dy if best is None else min(best, dx + dy)
+        return best or 0
+
+
+class Rollout:
+    """
+    Monte Carlo planner: every safe first move is scored by random playouts of `horizon` moves on a `SimState`,
+    and first moves are picked with UCB1 until the deadline expires. The playout policy heads for the closest
+    food half of the time and moves randomly otherwise.
+
+    With `workers > 0` the playouts run in batches on a process pool, the batches finished before the deadline count.
+    The pool is started (spawn, not forked from the planning thread) and warmed up when the planner is built,
+    so no step pays for the workers' startup. Batches stop at the step's deadline on their own: a running batch
+    can't be cancelled, it would keep its worker busy into the next step.
+    """
+
+    def __init__(
+            self,
+            horizon: int = 20,
+            exploration: float = 2.0,
+            death_penalty: float = 10.0,
+            workers: int = 0,
+            batch_size: int = 32,
+            seed: Optional[int] = None,
+        ):
+        self.horizon = horizon
+        self.exploration = exploration # UCB1 exploration constant
+        self.death_penalty = death_penalty
+        self.workers = workers
+        self.batch_size = batch_size
+        self.budget_ms = 50 # Default time budget
+        self._rng = random.Random(seed)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            wait([self._executor.submit(warm_up) for _ in range(workers)]) # Start every worker now, not in a step
+
+        self.rollouts = 0 # Playouts run by the last `get_path` call
+
+    def get_path(self, snake: Snake, grid: Grid, deadline: Optional[Deadline] = None) -> Optional[deque[tuple[int, int]]]:
+        """Return the best first move as a one-cell path (None if every move is fatal)."""
+        deadline = deadline or Deadline(self.budget_ms)
+        state = SimState.from_grid(snake, grid)
+        moves = state.safe_moves()
+        if not moves:
+            return None
+        if len(moves) == 1:
+            return deque([moves[0][1]])
+
+        if self.workers > 0:
+            totals, counts = self._run_parallel(state, moves, deadline)
+        else:
+            totals, counts = self._run_serial(state, moves, deadline)
+        self.rollouts = sum(counts.values())
+
+        best = max(moves, key=lambda move: totals[move[0]] / counts[move[0]] if counts[move[0]] else -math.inf)
+        return deque([best[1]])
+
+    def close(self):
+        """Shut the process pool down, if any."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _run_serial(self, state: SimState, moves: list, deadline: Deadline) -> tuple[dict, dict]:
+        totals = {direction: 0.0 for direction, _ in moves}
+        counts = {direction: 0 for direction, _ in moves}
+        while not deadline.expired():
+            direction = self._select(totals, counts)
+            totals[direction] += playout(state, direction, self.horizon, self.death_penalty, self._rng)
+            counts[direction] += 1
+        return totals, counts
+
+    def _run_parallel(self, state: SimState, moves: list, deadline: Deadline) -> tuple[dict, dict]:
+        end = time.time() + deadline.remaining_ms() / 1000 # Wall clock, shared with the workers
+        totals = {direction: 0.0 for direction, _ in moves}
+        counts = {direction: 0 for direction, _ in moves}
+        pending = {}
+        while not deadline.expired():
+            while len(pending) < self.workers * 2: # Keep every worker busy
+                direction = moves[len(pending) % len(moves)][0] if not any(counts.values()) else self._select(totals, counts)
+                future = self._executor.submit(
+                    run_playouts, state, direction, self.batch_size, self.horizon, self.death_penalty, self._rng.getrandbits(32), end,
+                )
+                pending[future] = direction
+            done, _ = wait(pending, timeout=deadline.remaining_ms() / 1000, return_when=FIRST_COMPLETED)
+            for future in done:
+                direction = pending.pop(future)
+                total, count = future.result()
+                totals[direction] += total
+                counts[direction] += count
+        for future in pending:
+            future.cancel() # Queued batches are dropped, running ones stop at `end`
+        return totals, counts
+
+    def _select(self, totals: dict, counts: dict) -> Direction:
+        """UCB1 over the first moves, untried moves first."""
+        total_count = sum(counts.values())
+        best, best_score = None, -math.inf
+        for direction, count in counts.items():
+            if count == 0:
+                return direction
+            score = totals[direction] / count + self.exploration * math.sqrt(math.log(total_count) / count)
+            if score > best_score:
+                best, best_score = direction, score
+        return best
+
+
+def playout(state: SimState, first_move: Direction, horizon: int, death_penalty: float, rng: random.Random) -> float:
+    """Play `first_move` then up to `horizon` moves of the playout policy, return the value of the final state."""
+    sim = state.copy()
+    sim.step(first_move, rng)
+    while sim.alive and sim.moves < horizon:
+        moves = sim.safe_moves()
+        if not moves:
+            sim.alive = False
+            break
+        if rng.random() < 0.5 and sim.food:
+            direction = min(moves, key=lambda move: sim.food_distance(move[1]))[0]
+        else:
+            direction = rng.choice(moves)[0]
+        sim.step(direction, rng)
+
+    if not sim.alive:
+        return sim.score - death_penalty
+    return sim.score - 0.01 * sim.food_distance(sim.body[0]) # Closer to food is slightly better
+
+
+def run_playouts(state: SimState, first_move: Direction, count: int, horizon: int, death_penalty: float, seed: int, end: float) -> tuple[float, int]:
+    """Batch of up to `count` playouts for the process pool, stopped at `end` (`time.time()`), returns (sum of values, playouts run)."""
+    rng = random.Random(seed)
+    total, played = 0.0, 0
+    while played < count and time.time() < end:
+        total += playout(state, first_move, horizon, death_penalty, rng)
+        played += 1
+    return total, played
+
+
+def warm_up():
+    """No-op task holding its worker briefly, so that every worker of the pool takes one."""
+    time.sleep(0.05)
+
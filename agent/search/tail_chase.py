@@ -0,0 +1,117 @@
+from collections import deque
+from typing import Optional
+
+from ..consts import Direction
+
+from ..snake import Snake
+from ..grid import Grid
+
+
+class TailChase:
+    """
+    Keeps a path from the snake's head to its own tail, the move of last resort: the tail moves away as the
+    head follows it, so the path stays free unless another snake cuts it.
+
+    The path is refreshed once per grid update (`update`). When the snake followed the path's first move
+    the rest of it is reused, extended to the new tail and checked cell by cell; a BFS is only run when the
+    snake moved elsewhere or the path got blocked. `next_move` is then an O(1) lookup.
+    """
+
+    def __init__(self, actions: Optional[list[Direction]] = None):
+        self.actions = actions or [Direction.WEST, Direction.EAST, Direction.NORTH, Direction.SOUTH]
+        self._path: deque[tuple[int, int]] = deque()
+        self._last_update: int = None
+
+    @property
+    def path(self) -> deque[tuple[int, int]]:
+        return self._path
+
+    def next_move(self) -> Optional[tuple[int, int]]:
+        """Return the next cell towards the tail (None if the tail can't be reached)."""
+        return self._path[0] if self._path else None
+
+    def get_path(self, snake: Snake, grid: Grid) -> Optional[deque[tuple[int, int]]]:
+        """Return a copy of the path to the tail for the current grid update (None if the tail can't be reached)."""
+        self.update(snake, grid)
+        return deque(self._path) if self._path else None
+
+    def update(self, snake: Snake, grid: Grid):
+        """Refresh the path after a grid update, does nothing if it is already up to date."""
+        if self._last_update == grid.update_count:
+            return
+        self._last_update = grid.update_count
+
+        if snake.body is None or len(snake.body) < 2:
+            self._path = deque()
+            return
+
+        path = self._path
+        if path and path[0] == snake.position:
+            path.popleft() # The snake followed the path
+            if path and path[-1] != snake.body[-1]:
+                path.append(snake.body[-1]) # The tail moved one cell further
+            if self.is_valid(snake, grid, path):
+                return
+
+        self._path = self.search(snake, grid) or deque()
+
+    def is_valid(self, snake: Snake, grid: Grid, path: deque[tuple[int, int]]) -> bool:
+        """Check that the path leads from the head to the tail through free cells, long enough for the tail to move away."""
+        if len(path) < self.min_length(grid) or path[-1] != snake.body[-1]:
+            return False
+
+        previous = snake.position
+        for index, pos in enumerate(path):
+            if pos not in self.adjacent(previous, grid):
+                return False
+            if index < len(path) - 1 and grid.is_blocked(pos):
+                return False
+            previous = pos
+        return True
+
+    def search(self, snake: Snake, grid: Grid) -> Optional[deque[tuple[int, int]]]:
+        """BFS for the shortest path to the tail of at least `min_length` moves."""
+        head, tail = snake.position, snake.body[-1]
+        min_length = self.min_length(grid)
+
+        # The path goes through free cells, so the head and the tail must touch a common free component
+        free_space = grid.free_space
+        tail_components = {free_space.component_of(pos) for pos in self.adjacent(tail, grid)} - {None}
+        if not any(free_space.component_of(pos) in tail_components for pos in self.adjacent(head, grid)):
+            return None
+
+        came_from = {head: None}
+        queue = deque([(head, 0)])
+        while queue:
+            current_pos, depth = queue.popleft()
+            for neighbour_pos in self.adjacent(current_pos, grid):
+                if neighbour_pos == tail and depth + 1 >= min_length:
+                    return self.reconstruct_path(came_from, current_pos, tail)
+                if neighbour_pos in came_from or grid.is_blocked(neighbour_pos):
+                    continue # The neck is part of the body, so the snake never reverses
+                came_from[neighbour_pos] = current_pos
+                queue.append((neighbour_pos, depth + 1))
+        return None
+
+    def min_length(self, grid: Grid) -> int:
+        """The head can't enter the tail's cell on the next move, nor on the one after if the snake is growing."""
+        return 3 if grid.ate_food else 2
+
+    def adjacent(self, pos: tuple[int, int], grid: Grid) -> list[tuple[int, int]]:
+        """Return the cells next to `pos`, blocked or not."""
+        x, y = pos
+        cells = []
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if grid.traverse:
+                cells.append((nx % grid.hor_tiles, ny % grid.ver_tiles))
+            elif 0 <= nx < grid.hor_tiles and 0 <= ny < grid.ver_tiles:
+                cells.append((nx, ny))
+        return cells
+
+    def reconstruct_path(self, came_from: dict[tuple[int, int], tuple[int, int]], current: tuple[int, int], tail: tuple[int, int]) -> deque[tuple[int, int]]:
+        """Reconstruct the path from the head to `current`, then to the tail."""
+        path = deque([tail])
+        while came_from[current] is not None:
+            path.appendleft(current)
+            current = came_from[current]
+        return path
@@ -0,0 +1,90 @@
+import time
+
+from datetime import datetime
+from typing import Optional
+
+
+class Deadline:
+    """Monotonic time budget for a step, or for a part of it."""
+
+    def __init__(self, budget_ms: float, start: Optional[float] = None):
+        self._start = time.monotonic() if start is None else start
+        self._end = self._start + budget_ms / 1000
+
+    def __repr__(self):
+        return f"Deadline(budget={self.budget_ms:.1f}ms, remaining={self.remaining_ms():.1f}ms)"
+
+    @property
+    def budget_ms(self) -> float:
+        return (self._end - self._start) * 1000
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self._start) * 1000
+
+    def remaining_ms(self) -> float:
+        return max(0.0, (self._end - time.monotonic()) * 1000)
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self._end
+
+    def split(self, fraction: float) -> "Deadline":
+        """Return a deadline holding `fraction` of the remaining time, never ending after this one."""
+        now = time.monotonic()
+        return Deadline(max(0.0, self._end - now) * 1000 * fraction, now)
+
+
+class StepScheduler:
+    """
+    Hands out the per-step deadline from the server's observed tick period.
+
+    The period starts at 1 / fps and follows the `ts` stamps of the states (exponential moving average).
+    Each step gets `budget_ratio` of the period, the rest is left for decoding, sending and network jitter.
+    Planners then get a share of the remaining time in the order they are tried, see `budget_for`.
+    """
+
+    def __init__(self, fps: int = 10, budget_ratio: float = 0.85, smoothing: float = 0.2):
+        self._period_ms = 1000 / fps
+        self._budget_ratio = budget_ratio
+        self._smoothing = smoothing
+        self._prev_ts: Optional[datetime] = None
+        self._step_deadline: Optional[Deadline] = None
+
+        # Share of the remaining step time given to each planner
+        self.shares = {
+            "eating": 0.6,
+            "exploration": 0.8,
+            "survival": 1.0,
+            "rollout": 1.0,
+        }
+
+    @property
+    def period_ms(self) -> float:
+        return self._period_ms
+
+    @property
+    def deadline(self) -> Optional[Deadline]:
+        return self._step_deadline
+
+    def start_step(self, ts: Optional[str] = None) -> Deadline:
+        """Start a step when a state is received, `ts` is the server timestamp of the state."""
+        start = time.monotonic()
+        if ts is not None:
+            self.observe(ts)
+        self._step_deadline = Deadline(self._period_ms * self._budget_ratio, start)
+        return self._step_deadline
+
+    def budget_for(self, planner: str, deadline: Optional[Deadline] = None) -> Deadline:
+        """Return the deadline of a planner, a share of what is left of the step (of `deadline` if given)."""
+        return (deadline or self._step_deadline).split(self.shares.get(planner, 1.0))
+
+    def observe(self, ts: str):
+        """Update the tick period with the `ts` stamp of a state (also call it for skipped states)."""
+        try:
+            current_ts = datetime.fromisoformat(ts)
+        except ValueError:
+            return
+        if self._prev_ts is not None:
+            period_ms = (current_ts - self._prev_ts).total_seconds() * 1000
+            if 0 < period_ms < 10 * self._period_ms: # Ignore pauses between games
+                self._period_ms += self._smoothing * (period_ms - self._period_ms)
+        self._prev_ts = current_ts
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import threading
+
+from collections import deque
+from contextlib import nullcontext
+from typing import Optional
+
+
+class _Phase:
+    __slots__ = ("_profiler", "_name", "_args", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str, args: dict):
+        self._profiler = profiler
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self._profiler._record("X", self._name, self._start, end - self._start, self._args)
+        return False
+
+
+_DISABLED_PHASE = nullcontext()
+
+
+class Profiler:
+    """
+    Phase timers and counters of the agent, kept in a ring buffer of trace events.
+
+        with profiler.phase("eating"):
+            ...
+        profiler.count("eating.nodes", expanded)
+        profiler.flush_counters(step=step) # One counter event per frame, counters restart from zero
+
+    Disabled (the default) `phase` returns a shared no-op context manager and `count` returns right away,
+    so the hooks can stay in the hot paths, as long as their names are constants and their arguments are
+    only built when `enabled`. Counters are meant to be summed locally and reported once per call.
+    The buffer is dumped as JSON lines or as a Chrome trace (chrome://tracing, Perfetto, speedscope).
+    """
+
+    def __init__(self, enabled: bool = False, capacity: int = 50000):
+        self._enabled = enabled
+        self._events: deque[dict] = deque(maxlen=capacity)
+        self._counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def __repr__(self):
+        return f"Profiler(enabled={self._enabled}, events={len(self._events)})"
+
+    def __len__(self):
+        return len(self._events)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self):
+        self._enabled = True
+
+    def disable(self):
+        self._enabled = False
+
+    def phase(self, name: str, **args):
+        """Context manager timing a phase (nested phases show as a stack in the trace)."""
+        if not self._enabled:
+            return _DISABLED_PHASE
+        return _Phase(self, name, args)
+
+    def count(self, name: str, amount: float = 1):
+        if not self._enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def take_counters(self) -> dict[str, float]:
+        """Return the counters since the last flush and reset them, without recording an event."""
+        with self._lock:
+            counters, self._counters = self._counters, {}
+        return counters
+
+    def flush_counters(self, **args):
+        """Record the counters since the last flush as one event and reset them."""
+        if not self._enabled:
+            return
+        self._record("C", "counters", time.perf_counter_ns(), 0, {**args, **self.take_counters()})
+
+    def clear(self):
+        self._events.clear()
+        with self._lock:
+            self._counters = {}
+
+    def _record(self, kind: str, name: str, start: int, duration: int, args: dict):
+        self._events.append({
+            "ph": kind,
+            "name": name,
+            "ts": (start - self._origin) / 1000, # Microseconds
+            "dur": duration / 1000,
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Calls, total and maximum milliseconds of every phase in the buffer."""
+        summary: dict[str, dict[str, float]] = {}
+        for event in list(self._events):
+            if event["ph"] != "X":
+                continue
+            stats = summary.setdefault(event["name"], {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            duration_ms = event["dur"] / 1000
+            stats["calls"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        return summary
+
+    def dump(self, path: str):
+        """Write the buffer, as a Chrome trace if `path` ends with .json, as JSON lines otherwise."""
+        if path.endswith(".json"):
+            self.dump_chrome_trace(path)
+        else:
+            self.dump_jsonl(path)
+
+    def dump_jsonl(self, path: str):
+        with open(path, "w") as file:
+            for event in list(self._events):
+                file.write(json.dumps(event) + "\n")
+
+    def dump_chrome_trace(self, path: str):
+        events = []
+        for event in list(self._events):
+            trace_event = {**event, "pid": os.getpid()}
+            if event["ph"] == "C":
+                del trace_event["dur"]
+                trace_event["args"] = {key: value for key, value in event["args"].items() if isinstance(value, (int, float))}
+            events.append(trace_event)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+# Shared profiler of the agent, enabled by setting PROFILE to the dump path (.json for a Chrome trace, JSON lines otherwise)
+PROFILE_PATH: Optional[str] = os.environ.get("PROFILE") or None
+profiler = Profiler(enabled=PROFILE_PATH is not None)
@@ -0,0 +1,88 @@
+import json
+import statistics
+
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+
+class FrameTelemetry:
+    """
+    Bounded record of the client's latency, one entry per answered frame.
+
+    - skipped: older frames drained from the socket together with this one (step lag)
+    - lag_ms: receipt time minus the server's `ts` (meaningful when both run on the same clock)
+    - decode_ms: time spent decoding the frames of the batch
+    - plan_ms: planner time of the frame, None when the fallback key was sent
+    - budget_ms, mode, score, length: step budget, planner mode and snake state, for `agent.data.analytics`
+    """
+
+    def __init__(self, size: int = 3000):
+        self._records: deque[dict] = deque(maxlen=size)
+        self._skipped_total = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def records(self) -> list[dict]:
+        return list(self._records)
+
+    def record(
+        self,
+        step: int,
+        skipped: int,
+        lag_ms: Optional[float],
+        decode_ms: float,
+        plan_ms: Optional[float],
+        budget_ms: Optional[float] = None,
+        mode: Optional[str] = None,
+        score: Optional[int] = None,
+        length: Optional[int] = None,
+    ):
+        self._skipped_total += skipped
+        self._records.append({
+            "step": step,
+            "skipped": skipped,
+            "lag_ms": lag_ms,
+            "decode_ms": decode_ms,
+            "plan_ms": plan_ms,
+            "budget_ms": budget_ms,
+            "mode": mode,
+            "score": score,
+            "length": length,
+        })
+
+    def summary(self) -> dict:
+        """Median, 95th percentile and maximum of every timing, plus the frames skipped and late."""
+        summary = {
+            "frames": len(self._records),
+            "skipped": self._skipped_total,
+            "late": sum(1 for record in self._records if record["plan_ms"] is None),
+        }
+        for field in ("lag_ms", "decode_ms", "plan_ms"):
+            values = sorted(record[field] for record in self._records if record[field] is not None)
+            if not values:
+                continue
+            summary[field] = {
+                "p50": statistics.median(values),
+                "p95": values[min(len(values) - 1, int(0.95 * len(values)))],
+                "max": values[-1],
+            }
+        return summary
+
+    def dump(self, path: str):
+        """Write the records as JSON lines."""
+        with open(path, "w") as file:
+            for record in self._records:
+                file.write(json.dumps(record) + "\n")
+
+
+def frame_lag_ms(ts: Optional[str], received: datetime) -> Optional[float]:
+    """Milliseconds between the server's `ts` stamp and `received`, None if the stamp is missing or invalid."""
+    if ts is None:
+        return None
+    try:
+        return (received - datetime.fromisoformat(ts)).total_seconds() * 1000
+    except ValueError:
+        return None
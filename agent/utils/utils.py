@@ -1,13 +1,5 @@
-import time
 from ..consts import Direction, Tiles
 
-def set_start_time():
-    global start_time
-    start_time = time.time()
-
-def get_start_time():
-    return start_time
-
 def determine_direction(
         current_pos: tuple[int, int], next_pos: tuple[int, int], grid_size: tuple[int, int]
         ) -> Direction:
@@ -107,7 +99,3 @@ def compute_position_from_vector(pos: tuple[int, int], vector: tuple[int, int],
         )
     
     return (new_x, new_y)
-
-def compute_body(next_pos: tuple[int, int], body: list[tuple[int, int]]) -> list[tuple[int, int]]:
-    new_body = [next_pos] + body[:-1]  # Add new head and remove the last element (tail)
-    return new_body
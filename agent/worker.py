@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+from typing import Any, Callable, Optional
+
+
+class LatestValueSlot:
+    """
+    Thread-safe hand-off of values from the event loop to a worker thread.
+
+    `take` returns every value put since the last call, oldest first: the worker acts on the newest one
+    and may still use the ones it skipped (e.g. to keep its grid in sync).
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending: list = []
+        self._closed = False
+
+    def put(self, value: Any):
+        with self._condition:
+            self._pending.append(value)
+            self._condition.notify()
+
+    def take(self, timeout: Optional[float] = None) -> Optional[list]:
+        """Wait for new values, returns None once closed (or on timeout)."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed, timeout)
+            if self._closed or not self._pending:
+                return None
+            values, self._pending = self._pending, []
+            return values
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class PlanningWorker(threading.Thread):
+    """
+    Runs `plan` on a dedicated thread so the event loop keeps reading the websocket while the agent searches.
+
+    `plan` receives the list of items submitted since its last run (oldest first) and returns the result for
+    the newest one. Each `submit` returns a future resolved with that result, or with None when the item
+    was skipped because a newer one arrived before the worker got to it.
+
+    `after_plan`, if given, runs once the result is handed back: work that can wait until the key is sent.
+    """
+
+    def __init__(self, plan: Callable[[list], Any], loop: asyncio.AbstractEventLoop, after_plan: Optional[Callable[[], None]] = None):
+        super().__init__(name="planning-worker", daemon=True)
+        self._plan = plan
+        self._after_plan = after_plan
+        self._loop = loop
+        self._slot = LatestValueSlot()
+        self._futures: dict[int, asyncio.Future] = {}
+        self._next_id = 0
+
+    def submit(self, item: Any) -> asyncio.Future:
+        """Queue an item for planning, must be called from the event loop."""
+        future = self._loop.create_future()
+        item_id = self._next_id
+        self._next_id += 1
+        self._futures[item_id] = future
+        self._slot.put((item_id, item))
+        return future
+
+    def stop(self):
+        self._slot.close()
+
+    def run(self):
+        while True:
+            entries = self._slot.take()
+            if entries is None:
+                return
+            result = self._plan([item for _, item in entries])
+            self._loop.call_soon_threadsafe(self._resolve, [item_id for item_id, _ in entries], result)
+            if self._after_plan is not None:
+                self._after_plan()
+
+    def _resolve(self, item_ids: list[int], result: Any):
+        for item_id in item_ids:
+            future = self._futures.pop(item_id, None)
+            if future is not None and not future.done():
+                future.set_result(result if item_id == item_ids[-1] else None)
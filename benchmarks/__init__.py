@@ -0,0 +1,9 @@
+"""
+Micro-benchmarks of the agent's planners over a corpus of recorded game situations, and a load test of the server.
+
+    $ python3 -m benchmarks.corpus synthetic -o corpus.jsonl
+    $ python3 -m benchmarks.corpus capture game.jsonl -o corpus.jsonl    # Log written by `CAPTURE=game.jsonl python3 student.py`
+    $ python3 -m benchmarks.planners corpus.jsonl --save baseline.json
+    $ python3 -m benchmarks.planners corpus.jsonl --baseline baseline.json
+    $ python3 -m benchmarks.load --players 1 4 16 --viewers 0 50 200
+"""
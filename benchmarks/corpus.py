@@ -0,0 +1,185 @@
+"""
+A situation is one JSON line: the game info the agent receives on join (size and map) and the last states
+it received (oldest first), enough to rebuild its Snake and Grid by replaying them.
+
+    {"name": str, "info": {"size": [w, h], "map": [[tile, ...], ...]}, "states": [state, ...]}
+"""
+import sys
+import json
+import random
+import asyncio
+import argparse
+
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from agent.snake import Snake
+from agent.grid import Grid
+from agent.utils.utils import determine_direction, convert_sight
+
+from consts import Direction, Tiles
+from game import Game
+
+KEYS = {Direction.NORTH: "w", Direction.WEST: "a", Direction.SOUTH: "s", Direction.EAST: "d"}
+
+
+def load_corpus(path: str) -> list[dict]:
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def save_corpus(path: str, situations: list[dict]):
+    with open(path, "w") as file:
+        for situation in situations:
+            file.write(json.dumps(situation) + "\n")
+
+
+def restore(situation: dict) -> tuple[Snake, Grid]:
+    """Rebuild the agent's Snake and Grid by replaying the situation's states, like the agent loop does."""
+    info = situation["info"]
+    snake, grid = Snake(), Grid(info["size"], info["map"], 5, 5)
+    for state in situation["states"]:
+        body = state["body"]
+        direction = determine_direction(tuple(body[1]), tuple(body[0]), grid.size)
+        snake.update(tuple(body[0]), direction, body, convert_sight(state["sight"]), state["range"])
+        grid.update(snake, state["traverse"], state["step"])
+    snake.eat_super_food = bool(grid.super_food)
+    return snake, grid
+
+
+def capture(log_path: str, every: int = 25, history: int = 120) -> list[dict]:
+    """
+    Cut a game log into situations, one every `every` steps with up to `history` states each.
+    The log holds the join info then every state received, one JSON object per line (`CAPTURE` in student.py).
+    """
+    with open(log_path) as file:
+        info, *states = [json.loads(line) for line in file if line.strip()]
+    states = [state for state in states if len(state.get("body", [])) >= 2]
+
+    situations = []
+    for index in range(every - 1, len(states), every):
+        situations.append({
+            "name": f"captured-step{states[index]['step']}",
+            "info": {"size": info["size"], "map": info["map"]},
+            "states": states[max(0, index - history + 1):index + 1],
+        })
+    return situations
+
+
+def generate(
+        count: int,
+        seed: int = 0,
+        lengths: tuple[int, ...] = (3, 10, 25, 50),
+        walls: tuple[int, ...] = (0, 10, 30),
+        food: int = 12,
+        history: int = 120,
+    ) -> list[dict]:
+    """
+    Generate situations on synthetic maps: the server's game with `walls` extra stone walls and `food` foods,
+    where a snake grown to each of `lengths` walks randomly. Traverse alternates between rounds of every combination.
+    """
+    random.seed(seed) # The server's map and game draw from the random module
+    situations = []
+    for index in range(count):
+        length = lengths[index % len(lengths)]
+        wall_count = walls[(index // len(lengths)) % len(walls)]
+        traverse = (index // (len(lengths) * len(walls))) % 2 == 0
+        for _ in range(20): # The random walk may die, retry on a new map
+            states = asyncio.run(_play(length, wall_count, food, traverse, history))
+            if states:
+                break
+        else:
+            continue
+
+        situations.append({
+            "name": f"synthetic-{index}-len{length}-walls{wall_count}-{'traverse' if traverse else 'walls'}",
+            "info": states[0],
+            "states": states[1:],
+        })
+    return situations
+
+
+async def _play(length: int, wall_count: int, food: int, traverse: bool, history: int) -> Optional[list[dict]]:
+    """Walk a snake until it reaches `length`, return the game info and its last `history` states (None if it died)."""
+    game = Game(timeout=100000, game_speed=100000)
+    _add_walls(game.map, wall_count)
+    name = "benchmark"
+    game.start([name])
+    snake = game.snakes[name]
+    snake.to_grow = length - 1
+    snake._traverse = traverse
+    for _ in range(food - 4): # The game spawns 4
+        game.map.spawn_food()
+    info = json.loads(json.dumps({"size": game.map.size, "map": game.map.map}))
+
+    states = deque(maxlen=history)
+    for step in range(length * 3 + history + 50):
+        if len(snake.body) >= length and step >= history:
+            return [info, *states]
+        game.keypress(name, _random_key(game, snake))
+        state = await game.next_frame()
+        player = next((player for player in state["snakes"] if player["name"] == name), None)
+        if player is None:
+            return None
+        message = {"players": state["players"], "step": state["step"], "timeout": state["timeout"], "ts": datetime.now().isoformat(), **player}
+        states.append(json.loads(json.dumps(message))) # Exactly what the agent would decode
+    return None
+
+
+def _random_key(game: Game, snake) -> str:
+    """Random safe move, keeping the current direction most of the time."""
+    safe = []
+    for direction in Direction:
+        pos = game.map.calc_pos(snake.head, direction, traverse=snake._traverse)
+        if pos != snake.head and pos not in snake.body:
+            safe.append(direction)
+    if not safe:
+        return ""
+    if snake.direction in safe and random.random() < 0.7:
+        return KEYS[snake.direction]
+    return KEYS[random.choice(safe)]
+
+
+def _add_walls(mapa, count: int):
+    """Add `count` L shaped stone walls, like the server's map generation."""
+    wall_length = 5
+    for _ in range(count):
+        x, y = random.randint(0, mapa.hor_tiles - 1), random.randint(0, mapa.ver_tiles - 1)
+        cells = [(x, (y + offset * random.choice([-1, 1])) % mapa.ver_tiles) for offset in range(wall_length)]
+        cells += [((x + offset * random.choice([-1, 1])) % mapa.hor_tiles, y) for offset in range(wall_length)]
+        for cell in cells:
+            mapa.map[cell[0]][cell[1]] = Tiles.STONE
+            mapa._stones.append(cell)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Build a corpus of game situations for the planner benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    synthetic = commands.add_parser("synthetic", help="Generate situations on synthetic maps")
+    synthetic.add_argument("-o", "--output", required=True)
+    synthetic.add_argument("--count", type=int, default=48)
+    synthetic.add_argument("--seed", type=int, default=0)
+    synthetic.add_argument("--lengths", type=int, nargs="+", default=[3, 10, 25, 50])
+    synthetic.add_argument("--walls", type=int, nargs="+", default=[0, 10, 30], help="Extra stone walls on top of the map's 10")
+    synthetic.add_argument("--food", type=int, default=12)
+    synthetic.add_argument("--history", type=int, default=120)
+
+    captured = commands.add_parser("capture", help="Cut a game log written with CAPTURE=<path> python3 student.py")
+    captured.add_argument("log")
+    captured.add_argument("-o", "--output", required=True)
+    captured.add_argument("--every", type=int, default=25)
+    captured.add_argument("--history", type=int, default=120)
+
+    args = parser.parse_args(argv)
+    if args.command == "synthetic":
+        situations = generate(args.count, args.seed, tuple(args.lengths), tuple(args.walls), args.food, args.history)
+    else:
+        situations = capture(args.log, args.every, args.history)
+    save_corpus(args.output, situations)
+    print(f"{len(situations)} situations written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
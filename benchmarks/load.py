@@ -0,0 +1,283 @@
+"""
+Load test of server.py on localhost: random walk players and passive viewers, many per configuration.
+
+Every configuration starts its own server (`--grading-server ''`, nothing leaves the machine), connects the
+viewers then the players, and measures for `duration` seconds from the first frame:
+
+- tick period: time between the first arrivals of two consecutive steps at any client
+- send latency: player receipt time minus the server's `ts` stamp, set just before the send
+- frame lag: arrival of a step at a client minus its first arrival at any client (fan-out delay)
+- CPU: of the server process (/proc) and of the load generator itself
+
+A configuration is saturated when the 95th percentile tick period exceeds the game's period by more than
+`tolerance`. The generator runs every client in one process: when its own CPU nears 100% the figures
+measure the generator, not the server.
+
+    $ python3 -m benchmarks.load --players 1 4 16 --viewers 0 50 200 --duration 15
+"""
+import os
+import re
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import resource
+import itertools
+import tempfile
+import subprocess
+
+from datetime import datetime
+from typing import Optional
+
+import websockets
+
+from agent.utils.telemetry import frame_lag_ms
+from tournament.agents import RandomAgent
+
+from .planners import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEP = re.compile(r'"step": (\d+)') # Viewers only read the step, decoding every frame would load the generator
+
+
+class Probe:
+    """Arrival times of the frames at every client, analyzed once the run is over."""
+
+    def __init__(self):
+        self.arrivals: list[tuple[str, tuple[int, int], float]] = [] # (client, (game, step), monotonic time)
+        self.latencies: list[float] = []
+        self.fps: Optional[float] = None
+        self.games = 0
+        self.disconnects = 0
+        self.started = asyncio.Event() # First frame received
+        self.recording = True
+
+    def frame(self, client: str, game: int, step: int):
+        if not self.recording:
+            return
+        self.arrivals.append((client, (game, step), time.monotonic()))
+        self.started.set()
+
+    def latency(self, ts: Optional[str]):
+        lag = frame_lag_ms(ts, datetime.now())
+        if self.recording and lag is not None:
+            self.latencies.append(lag)
+
+    def analyze(self) -> dict:
+        first: dict[tuple[int, int], float] = {}
+        for _, key, arrival in self.arrivals:
+            if key not in first or arrival < first[key]:
+                first[key] = arrival
+
+        ticks = sorted(
+            (first[(game, step)] - first[(game, step - 1)]) * 1000
+            for game, step in first
+            if (game, step - 1) in first
+        )
+        lags: dict[str, list[float]] = {}
+        for client, key, arrival in self.arrivals:
+            lags.setdefault(client, []).append((arrival - first[key]) * 1000)
+        all_lags = sorted(lag for values in lags.values() for lag in values)
+        client_p95 = [percentile(sorted(values), 0.95) for values in lags.values()]
+        latencies = sorted(self.latencies)
+
+        return {
+            "steps": len(first),
+            "games": self.games,
+            "disconnects": self.disconnects,
+            "tick_ms": _percentiles(ticks),
+            "send_latency_ms": _percentiles(latencies),
+            "frame_lag_ms": {**_percentiles(all_lags), "worst_client_p95": max(client_p95, default=None)},
+        }
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    return {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "max": values[-1]}
+
+
+async def player(url: str, name: str, probe: Probe, seed: int):
+    """Random walk player, joining again whenever a game ends (the server disconnects the players)."""
+    game = 0
+    while True:
+        try:
+            async with websockets.connect(f"{url}/player", max_size=None) as websocket:
+                await websocket.send(json.dumps({"cmd": "join", "name": name}))
+                agent = None
+                async for message in websocket:
+                    state = json.loads(message)
+                    if "map" in state:
+                        game += 1
+                        probe.games = max(probe.games, game)
+                        probe.fps = state.get("fps", probe.fps)
+                        agent = RandomAgent(state, seed=seed + game)
+                        continue
+                    if "step" not in state:
+                        continue # Highscores
+                    probe.frame(name, game, state["step"])
+                    probe.latency(state.get("ts"))
+                    key = agent.act(state) if agent is not None and "body" in state else ""
+                    await websocket.send(json.dumps({"cmd": "key", "key": key}))
+        except (OSError, websockets.exceptions.ConnectionClosed):
+            probe.disconnects += 1
+        await asyncio.sleep(0.05)
+
+
+async def viewer(url: str, name: str, probe: Probe):
+    """Passive viewer, reads the step of every frame."""
+    game = 0
+    async with websockets.connect(f"{url}/viewer", max_size=None) as websocket:
+        await websocket.send(json.dumps({"cmd": "join"}))
+        async for message in websocket:
+            if '"map"' in message:
+                game += 1
+                continue
+            step = STEP.search(message)
+            if step:
+                probe.frame(name, game, int(step.group(1)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cpu_seconds(pid: int) -> float:
+    """User and system CPU time of a process, from /proc."""
+    with open(f"/proc/{pid}/stat") as file:
+        fields = file.read().rsplit(")", 1)[1].split() # The command name may hold spaces
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK") # utime and stime
+
+
+def own_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def wait_listening(port: int, server: subprocess.Popen, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"server not listening on port {port} after {timeout}s")
+
+
+async def run(players: int, viewers: int, duration: float, connect_timeout: float = 30) -> dict:
+    """Measure one configuration against a server of its own."""
+    port = free_port()
+    workdir = tempfile.TemporaryDirectory() # The server writes highscores.json to its working directory
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "server.py"), "--bind", "127.0.0.1", "--port", str(port), "--players", str(players), "--grading-server", ""],
+        cwd=workdir.name,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, # The game logs at debug level
+    )
+    probe = Probe()
+    url = f"ws://127.0.0.1:{port}"
+    tasks = []
+    try:
+        await wait_listening(port, server)
+        for index in range(viewers):
+            tasks.append(asyncio.create_task(viewer(url, f"viewer{index}", probe)))
+        for index in range(players):
+            tasks.append(asyncio.create_task(player(url, f"load{index}", probe, seed=index * 1000)))
+
+        await asyncio.wait_for(probe.started.wait(), connect_timeout)
+        server_cpu, own_cpu, start = cpu_seconds(server.pid), own_cpu_seconds(), time.monotonic()
+        await asyncio.sleep(duration)
+        probe.recording = False
+        elapsed = time.monotonic() - start
+        server_cpu = (cpu_seconds(server.pid) - server_cpu) / elapsed
+        own_cpu = (own_cpu_seconds() - own_cpu) / elapsed
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        server.terminate()
+        try:
+            server.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        workdir.cleanup()
+
+    return {
+        "players": players,
+        "viewers": viewers,
+        "duration": elapsed,
+        "period_ms": 1000 / probe.fps if probe.fps else None,
+        "server_cpu": server_cpu,
+        "generator_cpu": own_cpu,
+        **probe.analyze(),
+    }
+
+
+def saturated(result: dict, tolerance: float) -> bool:
+    tick = result["tick_ms"]["p95"]
+    return result["period_ms"] is not None and tick is not None and tick > result["period_ms"] * (1 + tolerance)
+
+
+def report(results: list[dict], tolerance: float) -> str:
+    lines = [
+        f"{'players':>7} {'viewers':>7} {'steps':>6} {'tick p50':>8} {'tick p95':>8} {'send p95':>8} {'lag p95':>8} "
+        f"{'lag worst':>9} {'server':>7} {'loadgen':>7}"
+    ]
+    for result in results:
+        status = "  SATURATED" if saturated(result, tolerance) else ""
+        if result["generator_cpu"] > 0.9:
+            status += "  (generator bound)"
+        lines.append(
+            f"{result['players']:>7} {result['viewers']:>7} {result['steps']:>6} {_ms(result['tick_ms']['p50']):>8} "
+            f"{_ms(result['tick_ms']['p95']):>8} {_ms(result['send_latency_ms']['p95']):>8} {_ms(result['frame_lag_ms']['p95']):>8} "
+            f"{_ms(result['frame_lag_ms']['worst_client_p95']):>9} {result['server_cpu']:>7.0%} {result['generator_cpu']:>7.0%}{status}"
+        )
+
+    lines.append("")
+    for viewers in sorted({result["viewers"] for result in results}):
+        runs = sorted((result for result in results if result["viewers"] == viewers), key=lambda result: result["players"])
+        sustained = [result["players"] for result in itertools.takewhile(lambda result: not saturated(result, tolerance), runs)]
+        first_saturated = next((result["players"] for result in runs if saturated(result, tolerance)), None)
+        if first_saturated is None:
+            lines.append(f"{viewers} viewers: no saturation up to {runs[-1]['players']} players")
+        else:
+            lines.append(f"{viewers} viewers: saturated at {first_saturated} players (sustained {max(sustained, default=0)})")
+    return "\n".join(lines)
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test server.py on localhost with synthetic players and viewers.")
+    parser.add_argument("--players", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--viewers", type=int, nargs="+", default=[0, 50, 200])
+    parser.add_argument("--duration", type=float, default=15, help="Seconds measured per configuration")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Tick slip over the game's period counted as saturation")
+    parser.add_argument("--save", help="Save the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for viewers, players in itertools.product(sorted(args.viewers), sorted(args.players)):
+        print(f"{players} players, {viewers} viewers...", file=sys.stderr, flush=True)
+        results.append(asyncio.run(run(players, viewers, args.duration)))
+
+    print(report(results, args.tolerance))
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"tolerance": args.tolerance, "results": results}, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
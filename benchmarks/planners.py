@@ -0,0 +1,188 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+
+from typing import Callable, Optional
+
+from agent.snake import Snake
+from agent.grid import Grid
+from agent.safety import Safety
+from agent.search.eating import Eating
+from agent.search.exploration_dijkstra import Exploration
+from agent.search.death_circle import Survival
+from agent.utils.deadline import Deadline
+from agent.utils.profiling import profiler
+
+from .corpus import load_corpus, restore
+
+# A planner run returns True if it found a path, False if not, None if the situation doesn't apply (no food to eat)
+PlannerRun = Callable[[Snake, Grid, Deadline], Optional[bool]]
+
+
+def planners() -> dict[str, tuple[PlannerRun, str]]:
+    """Planner runs of the benchmark and the profiler counter holding their expanded nodes."""
+    eating, exploration, survival, safety = Eating(), Exploration(), Survival(), Safety()
+
+    def run_eating(snake: Snake, grid: Grid, deadline: Deadline) -> Optional[bool]:
+        if not grid.food and not (snake.eat_super_food and grid.super_food):
+            return None
+        return bool(eating.get_path(snake, grid, deadline))
+
+    def run_exploration(snake: Snake, grid: Grid, deadline: Deadline) -> Optional[bool]:
+        return bool(exploration.get_path(snake, grid, True, deadline=deadline))
+
+    def run_survival(snake: Snake, grid: Grid, deadline: Deadline) -> Optional[bool]:
+        return bool(survival.get_path(snake, grid, 2, deadline))
+
+    def run_flood_fill(snake: Snake, grid: Grid, deadline: Deadline) -> Optional[bool]:
+        reachable = safety.flood_fill(grid, snake.position, snake.direction, grid.hor_tiles * grid.ver_tiles)
+        return reachable >= snake.size # Room for the whole body
+
+    return {
+        "eating": (run_eating, "eating.nodes"),
+        "exploration": (run_exploration, "exploration.nodes"),
+        "survival": (run_survival, "survival.nodes"),
+        "flood_fill": (run_flood_fill, "flood_fill.cells"),
+    }
+
+
+def run(situations: list[dict], repeat: int = 5, budget_ms: float = 1000, only: Optional[list[str]] = None) -> dict[str, dict]:
+    """
+    Run every planner `repeat` times on every situation and summarize each planner.
+
+    Every run gets the situation replayed on a fresh Grid, so no cache (distances, free space index, age
+    density) carries over from the previous run, and a `budget_ms` deadline, large by default so that the
+    latency of the full search is measured rather than the agent's time budget.
+    """
+    runs = {name: planner for name, planner in planners().items() if not only or name in only}
+    samples = {name: {"ms": [], "nodes": [], "found": 0, "skipped": 0, "errors": 0} for name in runs}
+
+    enabled = profiler.enabled
+    profiler.enable() # Nodes are read from the profiler counters
+    try:
+        for situation in situations:
+            for name, (planner_run, counter) in runs.items():
+                sample = samples[name]
+                for _ in range(repeat):
+                    snake, grid = restore(situation)
+                    profiler.take_counters()
+                    start = time.perf_counter()
+                    try:
+                        found = planner_run(snake, grid, Deadline(budget_ms))
+                    except Exception:
+                        found = False
+                        sample["errors"] += 1
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    if found is None:
+                        sample["skipped"] += 1
+                        continue
+                    sample["ms"].append(elapsed_ms)
+                    sample["nodes"].append(profiler.take_counters().get(counter, 0))
+                    sample["found"] += found
+    finally:
+        if not enabled:
+            profiler.disable()
+        profiler.clear()
+
+    return {name: summarize(sample) for name, sample in samples.items()}
+
+
+def summarize(sample: dict) -> dict:
+    values = sorted(sample["ms"])
+    summary = {"runs": len(values), "skipped": sample["skipped"], "errors": sample["errors"]}
+    if not values:
+        return summary
+    summary.update({
+        "p50_ms": statistics.median(values),
+        "p90_ms": percentile(values, 0.90),
+        "p99_ms": percentile(values, 0.99),
+        "max_ms": values[-1],
+        "nodes": statistics.mean(sample["nodes"]),
+        "success_rate": sample["found"] / len(values),
+    })
+    return summary
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest rank percentile of sorted values."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float = 0.2) -> list[str]:
+    """
+    Regressions against the baseline: a latency percentile or the mean expanded nodes more than `tolerance`
+    above it, a lower success rate (more than one run in a hundred) or new errors.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference or "p50_ms" not in result or "p50_ms" not in reference:
+            continue
+        for field in ("p50_ms", "p90_ms", "p99_ms", "nodes"):
+            if result[field] > reference[field] * (1 + tolerance) and result[field] - reference[field] > 0.01:
+                regressions.append(f"{name}.{field}: {reference[field]:.2f} -> {result[field]:.2f}")
+        if result["success_rate"] < reference["success_rate"] - 0.01:
+            regressions.append(f"{name}.success_rate: {reference['success_rate']:.1%} -> {result['success_rate']:.1%}")
+        if result["errors"] > reference["errors"]:
+            regressions.append(f"{name}.errors: {reference['errors']} -> {result['errors']}")
+    return regressions
+
+
+def report(results: dict[str, dict], baseline: Optional[dict[str, dict]] = None) -> str:
+    header = f"{'planner':<12} {'runs':>5} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'nodes':>8} {'success':>8}"
+    lines = [header, "-" * len(header)]
+    for name, result in results.items():
+        if "p50_ms" not in result:
+            lines.append(f"{name:<12} {result['runs']:>5}   (no applicable situation)")
+            continue
+        lines.append(
+            f"{name:<12} {result['runs']:>5} {result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{result['max_ms']:>8.2f} {result['nodes']:>8.0f} {result['success_rate']:>8.1%}"
+        )
+        reference = (baseline or {}).get(name)
+        if reference and "p50_ms" in reference:
+            lines.append(
+                f"{'  baseline':<12} {reference['runs']:>5} {reference['p50_ms']:>8.2f} {reference['p90_ms']:>8.2f} {reference['p99_ms']:>8.2f} "
+                f"{reference['max_ms']:>8.2f} {reference['nodes']:>8.0f} {reference['success_rate']:>8.1%}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the planners on a corpus of game situations.")
+    parser.add_argument("corpus", help="Corpus written by benchmarks.corpus")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Deadline of each planner run")
+    parser.add_argument("--planners", nargs="+", help="Only run these planners")
+    parser.add_argument("--baseline", help="Compare with the results saved in this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown allowed before a regression is reported")
+    parser.add_argument("--save", help="Save the results to this file, to be used as a baseline")
+    args = parser.parse_args(argv)
+
+    situations = load_corpus(args.corpus)
+    results = run(situations, args.repeat, args.budget_ms, args.planners)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+
+    print(f"{len(situations)} situations, {args.repeat} runs each")
+    print(report(results, baseline))
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"corpus": args.corpus, "repeat": args.repeat, "budget_ms": args.budget_ms, "results": results}, file, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
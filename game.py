@@ -24,6 +24,8 @@ class Snake:
         self._score = 0
         self._traverse = True  # if True, the snake can traverse stones
         self._alive = True
+        self.death_cause = None  # "wall", "self" or "snake" once dead
+        self.killer = None  # name of the snake run into
         self.lastkey = ""
         self.to_grow = 1
         self.range = 3
@@ -60,8 +62,10 @@ class Snake:
     def alive(self):
         return self._alive
 
-    def kill(self):
+    def kill(self, cause=None, killer=None):
         self._alive = False
+        self.death_cause = cause
+        self.killer = killer
 
     @property
     def name(self):
@@ -110,7 +114,7 @@ class Snake:
                 new_pos,
                 direction,
             )
-            self.kill()
+            self.kill("wall" if new_pos == self.head else "self")
             return
 
         self._body.append(new_pos)
@@ -168,6 +172,7 @@ class Game:
         self._step = 0
         self._state = {}
         self._snakes = {}
+        self._eaten = []  # foods eaten on the current step
         self.map = Map(size=size)
 
     @property
@@ -229,9 +234,9 @@ class Game:
 
         return True
 
-    def kill_snake(self, name):
-        logger.info("[step=%s] Snake <%s> has died", self._step, name)
-        self._snakes[name].kill()
+    def kill_snake(self, name, cause=None, killer=None):
+        logger.info("[step=%s] Snake <%s> has died (%s)", self._step, name, cause)
+        self._snakes[name].kill(cause, killer)
 
         if all([not snake.alive for snake in self._snakes.values()]):
             # if all snakes are dead, we stop the game
@@ -251,7 +256,7 @@ class Game:
                 if not snake2.alive:
                     continue
                 if name1 != name2 and snake2.collision(snake1.head):
-                    self.kill_snake(name1)
+                    self.kill_snake(name1, "snake", name2)
                     snake2.score += KILL_SNAKE_POINTS
 
             # check collisions with the map
@@ -261,13 +266,14 @@ class Game:
                     name1,
                     snake1.head,
                 )
-                self.kill_snake(name1)
+                self.kill_snake(name1, "wall")
 
             # check collisions with the food
             if self.map.get_tile(snake1.head) in [Tiles.FOOD, Tiles.SUPER]:
                 what_i_ate = self.map.eat_food(snake1.head)
                 if what_i_ate == Tiles.FOOD:
                     logger.debug("Snake <%s> ate food", name1)
+                    self._eaten.append({"name": name1, "food": "food"})
                     snake1.score += 1
                     snake1.grow()
                     self.map.spawn_food()
@@ -281,6 +287,7 @@ class Game:
                         ]
                     )
                     logger.debug("Snake <%s> ate <%s> at position (%s)", name1, kind.name, snake1.head)
+                    self._eaten.append({"name": name1, "food": "super", "kind": kind.name})
 
                     if kind == SuperFood.POINTS:
                         points = random.randint(-5, 10)
@@ -300,7 +307,10 @@ class Game:
 
     async def next_frame(self):
         await asyncio.sleep(1.0 / self._game_speed)
+        return self.step()
 
+    def step(self):
+        """Advance the game one step with the keys pressed so far, without waiting (headless matches)."""
         if not self._running:
             logger.info("Waiting for player 1")
             return
@@ -315,11 +325,13 @@ class Game:
             for name, snake in self._snakes.items():
                 logger.debug(f"[{self._step}] SCORE {name}: {snake.score}")
 
+        alive = [name for name, snake in self._snakes.items() if snake.alive]
         for name, snake in self._snakes.items():
             if not snake.alive:
                 continue
             self.update_snake(name)
 
+        self._eaten = []
         self.collision()
 
         self._state = {
@@ -339,6 +351,12 @@ class Game:
                 for name, snake in self._snakes.items()
                 if snake.alive
             ],
+            "deaths": [  # snakes that died on this step
+                {"name": name, "cause": snake.death_cause, "killer": snake.killer}
+                for name in alive
+                if not (snake := self._snakes[name]).alive
+            ],
+            "eaten": self._eaten,  # foods eaten on this step
         }
 
         if all([not snake.alive for snake in self._snakes.values()]):
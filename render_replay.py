@@ -0,0 +1,117 @@
+"""Render a recorded game (server.py --record) to PNG frames, and optionally a video, without a display."""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # No window, before pygame is imported
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import json
+import math
+import time
+import shutil
+import argparse
+import subprocess
+
+from bisect import bisect_left
+from multiprocessing import Pool
+
+import pygame
+
+from viewer.recording import Recording
+from viewer.renderer import Renderer
+from viewer.scene import Scene
+
+FRAME_NAME = "frame_%06d.png"
+
+
+def init_worker():
+    pygame.init()
+    pygame.font.init()
+
+
+def render_chunk(task) -> int:
+    """Render consecutive frames of the recording, given by their byte offsets, to numbered PNG files."""
+    path, info, offsets, first_index, output, SCALE = task
+    WIDTH, HEIGHT = info["size"]
+
+    display = pygame.display.set_mode((int(SCALE * WIDTH), int(SCALE * HEIGHT)))
+    renderer = Renderer(display, WIDTH, HEIGHT, SCALE, info["map"])
+    scene = Scene(WIDTH, HEIGHT, SCALE)
+
+    with open(path, "rb") as file:
+        for index, offset in enumerate(offsets, start=first_index):
+            file.seek(offset)
+            scene.apply(json.loads(file.readline()))
+            scene.draw(renderer) # Only the cells that changed since the chunk's previous frame are drawn
+            pygame.image.save(display, os.path.join(output, FRAME_NAME % index))
+    return len(offsets)
+
+
+def render(recording: Recording, output: str, SCALE: float, workers: int, start: int = 0, end: int = None, every: int = 1) -> int:
+    """Render the frames of steps [start, end) (one every `every`) on a pool of `workers` processes."""
+    first = recording.index_of(start)
+    last = len(recording) if end is None else bisect_left(recording.steps, end) # Not index_of, which stops at the last frame
+    offsets = recording.offsets[first:last:every]
+
+    os.makedirs(output, exist_ok=True)
+    chunk_size = max(1, math.ceil(len(offsets) / (workers * 4))) # Several chunks per worker to balance the load
+    tasks = [
+        (recording.path, recording.info, offsets[index:index + chunk_size], index, output, SCALE)
+        for index in range(0, len(offsets), chunk_size)
+    ]
+
+    rendered = 0
+    pool = Pool(workers, initializer=init_worker)
+    try:
+        for count in pool.imap_unordered(render_chunk, tasks):
+            rendered += count
+            print(f"\r{rendered}/{len(offsets)} frames", end="", flush=True)
+        pool.close() # Workers exit on their own, SDL catches the SIGTERM of Pool.terminate
+        pool.join()
+    except BaseException:
+        pool.terminate()
+        raise
+    print()
+    return rendered
+
+
+def encode_video(output: str, video: str, fps: float) -> bool:
+    """Encode the rendered frames with ffmpeg (H.264), False if ffmpeg isn't installed."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        print("ffmpeg not found, frames were kept but no video was encoded")
+        return False
+    subprocess.run(
+        [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-framerate", str(fps),
+            "-i", os.path.join(output, FRAME_NAME),
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", # H.264 needs even dimensions
+            "-c:v", "libx264", "-pix_fmt", "yuv420p",
+            video,
+        ],
+        check=True,
+    )
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", help="game recorded with server.py --record")
+    parser.add_argument("-o", "--output", help="directory of the PNG frames", default="frames")
+    parser.add_argument("--cell", help="pixels per map cell", type=int, default=16)
+    parser.add_argument("--workers", help="rendering processes", type=int, default=os.cpu_count())
+    parser.add_argument("--start", help="first step", type=int, default=0)
+    parser.add_argument("--end", help="last step (excluded)", type=int, default=None)
+    parser.add_argument("--every", help="render one step out of every N", type=int, default=1)
+    parser.add_argument("--video", help="encode the frames to this video file with ffmpeg", default=None)
+    parser.add_argument("--fps", help="video frame rate (the game's by default)", type=float, default=None)
+    args = parser.parse_args()
+
+    with Recording(args.recording) as recording:
+        start_time = time.perf_counter()
+        rendered = render(recording, args.output, args.cell, args.workers, args.start, args.end, args.every)
+        elapsed = time.perf_counter() - start_time
+        print(f"{rendered} frames rendered in {elapsed:.1f}s ({rendered / max(elapsed, 1e-9):.0f} frames/s)")
+
+        if args.video and encode_video(args.output, args.video, args.fps or recording.info.get("fps", 10)):
+            print(f"Video written to {args.video}")
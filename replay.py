@@ -0,0 +1,121 @@
+"""Play a recorded game (server.py --record) without a server: variable speed, pause, frame stepping and seeking."""
+import os
+import argparse
+
+import pygame
+
+from viewer.recording import Recording
+from viewer.renderer import Renderer
+from viewer.scene import Scene
+from viewer.playback import Playback, PlaybackSprite, ProgressBarSprite
+
+DISPLAY_FPS = 60
+SEEK_FRAMES = 100 # Page up / page down
+
+
+class Replay:
+    """Scene of a recording kept at the frame shown, seeking decodes only the frames drawn."""
+
+    def __init__(self, recording: Recording, renderer: Renderer, WIDTH, HEIGHT, SCALE):
+        self.recording = recording
+        self.renderer = renderer
+        self.WIDTH = WIDTH
+        self.HEIGHT = HEIGHT
+        self.SCALE = SCALE
+        self.scene: Scene = None
+        self.shown: int = None
+        self.scoreboard = False
+
+    def show(self, index: int):
+        if index == self.shown:
+            return
+        if self.shown is None or index < self.shown:
+            # Going back: start from an empty scene, the frame holds the whole state
+            self.scene = Scene(self.WIDTH, self.HEIGHT, self.SCALE)
+            self.renderer.redraw()
+            self.scoreboard = False
+        if index > 0 and index - 1 != self.shown:
+            self.scene.apply(self.recording.frame(index - 1)) # Previous frame, for the moves towards this one
+        self.scene.apply(self.recording.frame(index))
+        self.shown = index
+
+    def show_scoreboard(self):
+        if self.scoreboard or self.recording.highscores is None:
+            return
+        self.scene.apply({"highscores": self.recording.highscores})
+        self.scoreboard = True
+
+
+def main(path: str, SCALE: float, speed: float, start: int, paused: bool):
+    pygame.init()
+    pygame.font.init()
+
+    with Recording(path) as recording:
+        if not len(recording):
+            raise SystemExit(f"{path} has no game frames")
+        WIDTH, HEIGHT = recording.info["size"]
+
+        display = pygame.display.set_mode((int(SCALE * WIDTH), int(SCALE * HEIGHT)))
+        pygame.display.set_caption(f"Replay {os.path.basename(path)}")
+        renderer = Renderer(display, WIDTH, HEIGHT, SCALE, recording.info["map"])
+        replay = Replay(recording, renderer, WIDTH, HEIGHT, SCALE)
+
+        playback = Playback(recording.steps, recording.info.get("fps", 10), speed)
+        playback.seek(recording.index_of(start))
+        playback.playing = not paused
+        overlays = [ProgressBarSprite(playback, WIDTH, HEIGHT, SCALE), PlaybackSprite(playback, HEIGHT, SCALE)]
+        bar = overlays[0]
+
+        clock = pygame.time.Clock()
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    pygame.quit()
+                    return
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        playback.toggle()
+                    elif event.key in (pygame.K_UP, pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                        playback.faster()
+                    elif event.key in (pygame.K_DOWN, pygame.K_MINUS, pygame.K_KP_MINUS):
+                        playback.slower()
+                    elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                        playback.playing = False
+                        playback.seek(playback.index + (1 if event.key == pygame.K_RIGHT else -1))
+                    elif event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                        playback.seek(playback.index + (SEEK_FRAMES if event.key == pygame.K_PAGEDOWN else -SEEK_FRAMES))
+                    elif event.key == pygame.K_HOME:
+                        playback.seek(0)
+                    elif event.key == pygame.K_END:
+                        playback.seek(playback.last)
+                if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION) and pygame.mouse.get_pressed()[0]:
+                    if event.pos[1] >= (HEIGHT - 1) * SCALE: # Bottom row, along the progress bar
+                        playback.seek(bar.index_at(event.pos[0]))
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    renderer.redraw()
+
+            playback.advance(clock.tick(DISPLAY_FPS) / 1000)
+            index, progress = playback.target()
+            replay.show(index)
+            if playback.ended and not playback.playing:
+                replay.show_scoreboard()
+            for overlay in overlays:
+                overlay.update()
+            replay.scene.draw(renderer, overlays, progress)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Keys: space play/pause, up/down speed, left/right one frame, page up/down 100 frames, "
+        "home/end, click the bottom row to seek, escape quits."
+    )
+    parser.add_argument("recording", help="game recorded with server.py --record")
+    parser.add_argument(
+        "--scale", help="reduce size of window by x times", type=int, default=1
+    )
+    parser.add_argument("--speed", help="playback speed, 0.25 to 64", type=float, default=1)
+    parser.add_argument("--start", help="step to start from", type=int, default=0)
+    parser.add_argument("--paused", help="start paused", action="store_true")
+    args = parser.parse_args()
+
+    main(args.recording, 32 * (1 / args.scale), args.speed, args.start, args.paused)
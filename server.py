@@ -44,9 +44,12 @@ class GameServer:
         players=1,
         grading: str = None,
         dbg: bool = False,
+        record: str = None,
     ):
         """Initialize Gameserver."""
         self.dbg = dbg
+        self.record = record  # directory where games are recorded
+        self.recording = None
         self.seed = seed
         self.game = Game(timeout=timeout)
         self.players: asyncio.Queue[Player] = asyncio.Queue()
@@ -83,6 +86,24 @@ class GameServer:
 
         return self._highscores
 
+    def start_recording(self):
+        """Open the recording of a new game: every message sent to the viewers, one JSON per line."""
+        if not self.record:
+            return
+        os.makedirs(self.record, exist_ok=True)
+        path = os.path.join(self.record, f"game-{datetime.now():%Y%m%d-%H%M%S-%f}.jsonl")
+        logger.info("Recording game to %s", path)
+        self.recording = open(path, "w")
+
+    def record_message(self, info):
+        if self.recording:
+            self.recording.write(json.dumps(info) + "\n")
+
+    def stop_recording(self):
+        if self.recording:
+            self.recording.close()
+            self.recording = None
+
     async def send_clients(self, group, info):
         to_remove = []
 
@@ -158,15 +179,18 @@ class GameServer:
 
                 self.game = Game(timeout=self._timeout)
                 self.game.start([p.name for p in game_players])
+                self.start_recording()
 
                 while self.game.running:
                     if self.game._step == 0:  # Starting a level ? Let's send the info
                         game_info = self.game.info()
 
+                        self.record_message(game_info)
                         await self.send_clients(self.viewers, game_info)
                         await self.send_clients(self.game_player, game_info)
 
                     if state := await self.game.next_frame():
+                        self.record_message(state)
                         await self.send_clients(self.viewers, state)
 
                         snakes = state["snakes"]
@@ -176,6 +200,8 @@ class GameServer:
                         del state[
                             "food"
                         ]  # remove food from state as we only send our snake sight
+                        del state["deaths"]  # for the viewers and recordings only
+                        del state["eaten"]
 
                         for player in game_players:
                             state["ts"] = datetime.now().isoformat()
@@ -192,6 +218,7 @@ class GameServer:
                                 game_players.remove(player)
 
                 game_over = {"highscores": self.save_highscores()}
+                self.record_message(game_over)
                 await self.send_clients(self.viewers, game_over)
                 await self.send_clients(self.game_player, game_over)
 
@@ -204,6 +231,7 @@ class GameServer:
                     self.game_player.pop(ws_closed)
                 logger.error("Player disconnected: %s", ws_closed)
             finally:
+                self.stop_recording()
                 try:
                     if self.grading:
                         for player in game_players:
@@ -232,6 +260,9 @@ if __name__ == "__main__":
         "--debug", help="Open Bitmap with map on gameover", action="store_true"
     )
     parser.add_argument("--players", help="Number of players", type=int, default=1)
+    parser.add_argument(
+        "--record", help="Record every game to a JSON lines file in this directory", default=None
+    )
     parser.add_argument(
         "--grading-server",
         help="url of grading server",
@@ -241,7 +272,7 @@ if __name__ == "__main__":
 
     async def main():
         """Start server tasks."""
-        g = GameServer(0, TIMEOUT, args.seed, args.players, args.grading_server, args.debug)
+        g = GameServer(0, TIMEOUT, args.seed, args.players, args.grading_server, args.debug, args.record)
 
         game_loop_task = asyncio.ensure_future(g.mainloop())
 
@@ -6,147 +6,102 @@ import websockets
 import asyncio
 import getpass
 
-from collections import deque
+from datetime import datetime
 
-from agent.snake import Snake
-from agent.grid import Grid
+from agent.agent import Agent
+from agent.utils.telemetry import FrameTelemetry, frame_lag_ms
+from agent.utils.profiling import profiler, PROFILE_PATH
+from agent.worker import PlanningWorker
 
-from agent.search.exploration_dijkstra import Exploration
-from agent.search.eating import Eating
-from agent.search.death_circle import Survival
-
-from agent.utils.utils import determine_direction, convert_sight, set_start_time, get_start_time
-
-from agent.consts import Mode, Tiles
+DRAIN_TIMEOUT = 0.001 # Seconds to wait for a frame already queued behind the received one
 
 async def agent_loop(server_address="localhost:8000", agent_name="student"):
     async with websockets.connect(f"ws://{server_address}/player") as websocket:
         await websocket.send(json.dumps({"cmd": "join", "name": agent_name}))
 
-        state = json.loads(await websocket.recv()) 
-        size = state["size"]
-        grid = state["map"]
-        
-        snake = Snake()
-        grid = Grid(size, grid, 5, 5)
-        
-        exploration = Exploration()
-        eating = Eating()
-        survival = Survival()
-
-        path = deque()
-
-        prev_food_positions = None
-        prev_super_food_positions = None
-
-        path_counter = 0
-        path_clear_threshold = 2 # Path clear if path counter is bigger or equal to path_clear_threshold
-        
-        while True:
-            try:
-                state = json.loads(await websocket.recv()) 
-                set_start_time()
-
-                # Previous Assignments
-                prev_mode = snake.mode
-                prev_food_positions = grid.food.copy() # Shallow copy, elements inside are tuples (immutable)
-                prev_super_food_positions = grid.super_food.copy() # Shallow copy, elements inside are tuples (immutable)
-
-                update_snake_grid(state, snake, grid)
-
-                # Path Clearence Conditions
-                # TODO --> Make this a function in the future if it gets bigger (it will)
-                if path:
-                    if prev_mode != snake.mode:
-                        path.clear() # Clear path if mode switches
-                    elif prev_food_positions != grid.food:
-                        path.clear() # Clear path if new food is found. Allows for path recalculation for closer foods
-                    elif prev_super_food_positions != grid.super_food and snake.eat_super_food:
-                        path.clear() # Clear path if new super food is found and eat super food is True. Allows for path recalculation for closer super foods
-                    elif path_counter >= path_clear_threshold:
-                        path.clear()
-                    else:
-                        if grid.enemies_exist: # Enemies are present
-                            path.clear()
-
-                # Path Calculation
-                if not path: # List if empty
-                    if snake.mode == Mode.EXPLORATION: 
-                        path = exploration.get_path(snake, grid, True) # Request a new path to follow
-                    elif snake.mode == Mode.EATING:
-                        path = eating.get_path(snake, grid) # Request a new path to follow
-                        if not path:
-                            snake.mode = Mode.EXPLORATION # Default mode
-                            path = exploration.get_path(snake, grid, True) # Request a new path to follow
-                    if not path: 
-                        snake.mode = Mode.SURVIVAL # Fallback mode
-                        path = survival.get_path(snake, grid, 2)
-                        
-                    path_counter = 0 # Path counter reset
-
-                
-                if path:
-                    direction = determine_direction(snake.position, path.popleft(), grid.size)
-                    key = snake.move(direction)
-                
-                path_counter = path_counter + 1
+        message = await websocket.recv()
+        state = json.loads(message) 
+        agent = Agent(state) # Game info: size, map and fps
+        scheduler, planner = agent.scheduler, agent.planner
+
+        # Planning runs on its own thread, the event loop keeps reading frames and always answers in time
+        worker = PlanningWorker(planner.plan, asyncio.get_running_loop(), planner.prepare_fallbacks)
+        worker.start()
+        last_key = ""
+
+        telemetry = FrameTelemetry()
+        telemetry_path = os.environ.get("TELEMETRY") # Dump the per-frame latency records (JSON lines) on exit
+
+        capture = open(os.environ["CAPTURE"], "w") if os.environ.get("CAPTURE") else None # Log of every message received, for the benchmark corpus
+        if capture:
+            capture.write(message + "\n")
+
+        try:
+            while True:
+                messages = await receive_frames(websocket)
+                received = datetime.now()
+                if capture:
+                    capture.writelines(message + "\n" for message in messages)
+                decode_start = time.perf_counter()
+                phase = profiler.phase("decode", frames=len(messages)) if profiler.enabled else profiler.phase("decode")
+                with phase:
+                    states = [json.loads(message) for message in messages]
+                decode_ms = (time.perf_counter() - decode_start) * 1000
+
+                # Only the newest frame is answered, the older ones just keep the grid in sync
+                state = states[-1]
+                for skipped in states[:-1]:
+                    if skipped.get("ts") is not None:
+                        scheduler.observe(skipped["ts"])
+                deadline = scheduler.start_step(state.get("ts"))
+                step = state.get("step")
+
+                try:
+                    key = await asyncio.wait_for(worker.submit((states, deadline)), deadline.remaining_ms() / 1000)
+                except asyncio.TimeoutError:
+                    key = None
+                plan_ms = planner.plan_ms if key is not None else None
+                if key is None:
+                    key = planner.fallback_key(step, last_key) # Planner is late, use the move precomputed on the previous step
+                last_key = key
 
                 await websocket.send(json.dumps({"cmd": "key", "key": key}))  
+                mode = agent.mode
+                telemetry.record(
+                    step, len(states) - 1, frame_lag_ms(state.get("ts"), received), decode_ms, plan_ms,
+                    deadline.budget_ms, mode.name if mode is not None else None, state.get("score"), len(state.get("body", [])),
+                )
                 
-            except websockets.exceptions.ConnectionClosedOK:
-                print("Server has cleanly disconnected us")
-                return
-            except ValueError:
-                if path:   
-                   path.clear()
-            except Exception:
-                if path:
-                   path.clear()
-            except Exception:
-                pass
-                
-
-def update_snake_grid(state: dict, snake: Snake, grid: Grid):
-    """Update the snake and grid objects based on the new game state."""
-    body = state["body"]
-    pos = tuple(body[0])
-    direction = determine_direction(body[1], body[0], grid.size)
-    sight = state["sight"]
-    sight = convert_sight(sight) 
-    range = state["range"]
-    traverse = state["traverse"]
-
-    step = state["step"]
-    
-    # Always update snake first
-    snake.update(pos, direction, body, sight, range)
-    grid.update(snake, traverse, step)
-    snake_mode(snake, grid.food, grid.super_food, traverse, range, step)
-
-
-def snake_mode(snake: Snake, grid_food: set[tuple[int, int]], grid_super_food: set[tuple[int, int]], traverse: bool, range: int, step: int):
-    # Super food consumption strategy based on sight and traverse
-    if step >= 2800:
-        snake.eat_super_food = bool(grid_super_food)
-    elif range >= 5 and traverse: 
-        snake.eat_super_food = False  
-    elif range == 3 and traverse or range >= 4:
-        snake.eat_super_food = len(grid_super_food) >= 4 # Eat super food if enough food have been accumulated
-    elif range < 3 or not traverse:
-        snake.eat_super_food = bool(grid_super_food)
-
-    if grid_food:
-        snake.mode = Mode.EATING  # Prioritize normal food if available
-    elif snake.eat_super_food:
-        snake.mode = Mode.EATING
-    else:
-        snake.mode = Mode.EXPLORATION  # Default to exploration mode
-
-# DO NOT CHANGE THE LINES BELLOW
-# You can change the default values using the command line, example:
-# $ NAME='arrumador' python3 client.py
-loop = asyncio.get_event_loop()
-SERVER = os.environ.get("SERVER", "localhost")
-PORT = os.environ.get("PORT", "8000")
-NAME = os.environ.get("NAME", getpass.getuser())
-loop.run_until_complete(agent_loop(f"{SERVER}:{PORT}", NAME))
\ No newline at end of file
+        except websockets.exceptions.ConnectionClosedOK:
+            print("Server has cleanly disconnected us")
+            return
+        finally:
+            worker.stop()
+            agent.close()
+            if telemetry_path:
+                telemetry.dump(telemetry_path)
+            if PROFILE_PATH:
+                profiler.dump(PROFILE_PATH)
+            if capture:
+                capture.close()
+
+
+async def receive_frames(websocket) -> list[str]:
+    """Wait for a frame, then drain the frames already queued behind it (oldest first)."""
+    messages = [await websocket.recv()]
+    while True:
+        try:
+            messages.append(await asyncio.wait_for(websocket.recv(), DRAIN_TIMEOUT)) # Cancelling recv doesn't lose messages
+        except asyncio.TimeoutError:
+            return messages
+
+
+if __name__ == "__main__": # ROLLOUT_WORKERS processes are spawned, they import this module again as __mp_main__
+    # DO NOT CHANGE THE LINES BELLOW
+    # You can change the default values using the command line, example:
+    # $ NAME='arrumador' python3 client.py
+    loop = asyncio.get_event_loop()
+    SERVER = os.environ.get("SERVER", "localhost")
+    PORT = os.environ.get("PORT", "8000")
+    NAME = os.environ.get("NAME", getpass.getuser())
+    loop.run_until_complete(agent_loop(f"{SERVER}:{PORT}", NAME))
\ No newline at end of file
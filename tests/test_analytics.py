@@ -0,0 +1,40 @@
+import json
+
+from consts import KILL_SNAKE_POINTS
+from agent.data.analytics import analyze_file
+
+
+def write_recording(path, steps: list[tuple[int, list[dict], list[dict]]]):
+    """A recording of one snake: its score, the foods eaten and the deaths of every step."""
+    with open(path, "w") as file:
+        file.write(json.dumps({"size": [4, 4], "map": [], "fps": 10}) + "\n")
+        for step, (score, eaten, deaths) in enumerate(steps, start=1):
+            message = {"step": step, "snakes": [{"name": "a", "body": [[0, 0]], "score": score}], "deaths": deaths}
+            if eaten is not None:
+                message["eaten"] = eaten
+            file.write(json.dumps(message) + "\n")
+
+
+def test_foods_are_the_eat_events(tmp_path):
+    path = tmp_path / "game.jsonl"
+    write_recording(path, [
+        (0, [], []),
+        (1, [{"name": "a", "food": "super", "kind": "POINTS"}], []), # +1 super food, not a food
+        (1, [], []),
+        (2 + KILL_SNAKE_POINTS, [{"name": "a", "food": "food"}], [{"name": "b", "cause": "snake", "killer": "a"}]),
+    ])
+
+    analytics = analyze_file(str(path), cache=False)
+
+    assert analytics.games["foods"] == [1]
+    assert analytics.steps_per_food.counts == {4: 1}
+
+
+def test_old_recordings_count_the_score_changes(tmp_path):
+    path = tmp_path / "game.jsonl"
+    write_recording(path, [(0, None, []), (0, None, []), (1, None, [])])
+
+    analytics = analyze_file(str(path), cache=False)
+
+    assert analytics.games["foods"] == [1]
+    assert analytics.steps_per_food.counts == {3: 1}
@@ -0,0 +1,23 @@
+import random
+
+from agent.agent import Agent
+from agent.search.eating import Eating
+from agent.utils.deadline import Deadline
+from game import Game
+from tournament.match import player_state
+
+
+def test_expired_deadline_still_gives_a_path():
+    """The greedy pass runs to the end: an answer even when there is no time left."""
+    random.seed(5)
+    game = Game(timeout=50)
+    game.start(["student"])
+    agent = Agent(game.info())
+    state = game.step()
+    agent.act(player_state(state, state["snakes"][0], None))
+    snake, grid = agent.planner.snake, agent.planner.grid
+
+    assert grid.food
+    path = Eating().get_path(snake, grid, Deadline(0))
+    assert path and path[-1] in grid.food | grid.super_food
+    agent.close()
@@ -0,0 +1,54 @@
+from agent.consts import Direction, Tiles
+from agent.enemies import EnemyTracker
+from agent.grid import ENEMY_DANGER_COST, Grid
+
+SIZE = (12, 8)
+
+
+def make_grid(traverse: bool) -> Grid:
+    grid = Grid(SIZE, [[Tiles.PASSAGE] * SIZE[1] for _ in range(SIZE[0])], 5, 5)
+    grid.traverse = traverse
+    return grid
+
+
+def sight_of(cells) -> dict:
+    sight: dict = {}
+    for x, y in cells:
+        sight.setdefault(x, {})[y] = Tiles.SNAKE
+    return sight
+
+
+def test_danger_wraps_only_with_traverse():
+    enemy = {(0, 3), (1, 3), (2, 3)} # Against the west border
+    for traverse in (False, True):
+        grid = make_grid(traverse)
+        tracker = EnemyTracker()
+        tracker.update(grid, enemy)
+        wrapped = [cell for cell in tracker.danger if cell[0] >= SIZE[0] - 2]
+        assert bool(wrapped) == traverse
+
+
+def test_enemy_marks_follow_the_enemy():
+    grid = make_grid(False)
+    first = [(3, 3), (4, 3), (5, 3)]
+    grid._update_enemy_snake_body((9, 6), Direction.EAST, [(9, 6), (8, 6)], sight_of(first))
+    assert all(grid.get_tile(cell) == Tiles.ENEMY for cell in first)
+    marked = set(grid.prev_enemy_body)
+
+    second = [(4, 3), (5, 3), (6, 3)] # Moved one cell east
+    grid._update_enemy_snake_body((9, 6), Direction.EAST, [(9, 6), (8, 6)], sight_of(second))
+    assert grid.get_tile((3, 3)) != Tiles.ENEMY
+    assert all(grid.get_tile(cell) == Tiles.ENEMY for cell in second)
+    for cell in marked - set(grid.prev_enemy_body):
+        assert grid.get_tile(cell) not in (Tiles.ENEMY, Tiles.ENEMY_SUPPOSITION)
+    for cell in grid.prev_enemy_body - set(second):
+        assert grid.get_tile(cell) == Tiles.ENEMY_SUPPOSITION
+
+
+def test_danger_cost_depends_on_arrival_time():
+    grid = make_grid(False)
+    grid._update_enemy_snake_body((11, 7), Direction.EAST, [(11, 7), (10, 7)], sight_of([(3, 3), (4, 3), (5, 3)]))
+    cell, time = next((cell, time) for cell, time in grid.enemies.danger.items() if time == 2)
+    assert grid.danger_cost(cell, 1) == 0 # The snake gets there before any head
+    assert grid.danger_cost(cell, 2) == ENEMY_DANGER_COST // 2
+    assert grid.danger_cost(cell, 5) == ENEMY_DANGER_COST // 2
@@ -0,0 +1,24 @@
+from agent.agent import Agent
+from tournament.agents import RandomAgent
+from tournament.match import play_match
+
+
+class PeriodProbe(Agent):
+    """The student's agent, recording the step period its scheduler estimates."""
+
+    periods: list[float] = []
+
+    def act(self, state: dict) -> str:
+        key = super().act(state)
+        PeriodProbe.periods.append(self.scheduler.period_ms)
+        return key
+
+
+def test_headless_match_keeps_the_game_period():
+    PeriodProbe.periods = []
+    result = play_match({"student": PeriodProbe, "random": RandomAgent}, seed=1, timeout=100)
+
+    assert result["steps"] > 0
+    assert len(PeriodProbe.periods) > 10
+    for period in PeriodProbe.periods:
+        assert abs(period - 100) < 1 # 1000 / fps, whatever the time the steps really took
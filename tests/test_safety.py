@@ -0,0 +1,64 @@
+import copy
+import random
+
+from collections import deque
+
+from agent.consts import Tiles
+from agent.grid import Grid
+from agent.safety import Safety
+from agent.utils.utils import determine_direction
+
+SIZE = (16, 12)
+MOVES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def walk(rng: random.Random, start: tuple[int, int], length: int, blocked: set) -> list[tuple[int, int]]:
+    """Self avoiding random walk from `start` (excluded) of up to `length` cells, without wrapping."""
+    cells, current = [], start
+    for _ in range(length):
+        options = [
+            (current[0] + dx, current[1] + dy) for dx, dy in MOVES
+            if 0 <= current[0] + dx < SIZE[0] and 0 <= current[1] + dy < SIZE[1]
+            and (current[0] + dx, current[1] + dy) not in blocked and (current[0] + dx, current[1] + dy) not in cells
+        ]
+        if not options:
+            break
+        current = rng.choice(options)
+        cells.append(current)
+    return cells
+
+
+def test_free_space_check_agrees_with_flood_fill():
+    """Whenever the index answers, the flood fill on the grid after following the path gives the same answer."""
+    safety = Safety()
+    answered = 0
+    for seed in range(300):
+        rng = random.Random(seed)
+        stones = {(x, y) for x in range(SIZE[0]) for y in range(SIZE[1]) if rng.random() < 0.3}
+        mapa = [[Tiles.STONE if (x, y) in stones else Tiles.PASSAGE for y in range(SIZE[1])] for x in range(SIZE[0])]
+        grid = Grid(SIZE, mapa, 5, 5)
+        grid.traverse = False
+
+        free = [(x, y) for x in range(SIZE[0]) for y in range(SIZE[1]) if (x, y) not in stones]
+        tail = rng.choice(free)
+        body = list(reversed([tail] + walk(rng, tail, rng.randint(2, 8), stones)))
+        path = walk(rng, body[0], rng.randint(1, 12), stones | set(body))
+        if len(body) < 3 or not path:
+            continue
+        grid.update_snake_body(set(), body)
+
+        threshold = rng.randint(5, 60)
+        answer = safety.free_space_check(grid, deque(path), body, threshold)
+        if answer is None:
+            continue
+        answered += 1
+
+        moved = (list(reversed(path)) + body)[:len(body)]
+        hypothetical = copy.deepcopy(grid)
+        hypothetical.update_snake_body(set(body), moved)
+        previous = path[-2] if len(path) > 1 else body[0]
+        direction = determine_direction(previous, path[-1], SIZE)
+        reachable = safety.flood_fill(hypothetical, path[-1], direction, threshold)
+        assert answer == (reachable >= threshold), (seed, answer, reachable, threshold)
+
+    assert answered > 50
@@ -0,0 +1,7 @@
+"""
+Head-to-head evaluation of agents: matches on the headless game engine with in-process agents, round-robin
+or Swiss pairings on a process pool, and Elo ratings with bootstrap confidence intervals.
+
+    $ python3 -m tournament.runner --agent student=agent.agent:Agent --agent random=tournament.agents:RandomAgent --agent steady=tournament.agents:RandomAgent:'{"keep": 0.95}' --rounds 50
+    $ python3 -m tournament.ratings results.jsonl
+"""
@@ -0,0 +1,80 @@
+import json
+import random
+import importlib
+
+from typing import Callable, Optional, Protocol
+
+from consts import Tiles
+
+KEYS = {"w": (0, -1), "a": (-1, 0), "s": (0, 1), "d": (1, 0)}
+
+
+class Agent(Protocol):
+    """In-process player: built with the game info (size, map, fps, timeout), answers every state with a key."""
+
+    def act(self, state: dict) -> str:
+        ...
+
+
+AgentFactory = Callable[[dict], Agent]
+
+
+def load_agent(path: str) -> AgentFactory:
+    """
+    Factory of an agent from `module:attribute`, optionally followed by `:` and JSON keyword arguments
+    (parameter sets of the same agent): `tournament.agents:RandomAgent:{"keep": 0.9}`.
+    """
+    module_name, _, rest = path.partition(":")
+    attribute, _, params = rest.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"agent path {path!r} is not module:attribute[:json]")
+    factory = getattr(importlib.import_module(module_name), attribute)
+    kwargs = json.loads(params) if params else {}
+    return lambda info: factory(info, **kwargs)
+
+
+class RandomAgent:
+    """Random walk avoiding the cells it sees blocked, keeping its direction with probability `keep`."""
+
+    def __init__(self, info: dict, keep: float = 0.7, seed: Optional[int] = None):
+        self.width, self.height = info["size"]
+        self.map = info["map"]
+        self.keep = keep
+        self.random = random.Random(seed)
+
+    def act(self, state: dict) -> str:
+        body = [tuple(part) for part in state["body"]]
+        head = body[0]
+        traverse = state.get("traverse", True)
+        occupied = set(body[:-1]) # The tail moves away
+        for x, column in state.get("sight", {}).items():
+            for y, tile in column.items():
+                if tile == Tiles.SNAKE:
+                    occupied.add((int(x), int(y)))
+
+        safe = []
+        for key, (dx, dy) in KEYS.items():
+            x, y = head[0] + dx, head[1] + dy
+            if traverse:
+                x, y = x % self.width, y % self.height
+            elif not (0 <= x < self.width and 0 <= y < self.height) or self.map[x][y] == Tiles.STONE:
+                continue
+            if (x, y) not in occupied:
+                safe.append(key)
+        if not safe:
+            return ""
+
+        current = next((key for key in safe if len(body) > 1 and self._heading(body) == KEYS[key]), None)
+        if current is not None and self.random.random() < self.keep:
+            return current
+        return self.random.choice(safe)
+
+    def _heading(self, body: list[tuple]) -> tuple[int, int]:
+        (x, y), (nx, ny) = body[0], body[1]
+        dx, dy = x - nx, y - ny
+        # Wrapped around the map: one cell the other way
+        if abs(dx) > 1:
+            dx = -1 if dx > 0 else 1
+        if abs(dy) > 1:
+            dy = -1 if dy > 0 else 1
+        return dx, dy
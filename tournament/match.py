@@ -0,0 +1,99 @@
+import json
+import time
+import random
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from consts import TIMEOUT
+from game import Game
+
+from .agents import AgentFactory
+
+
+def player_state(state: dict, snake: dict, ts: str) -> dict:
+    """State the server sends to a player: the game state without the snakes and food, plus its own snake."""
+    message = {key: value for key, value in state.items() if key not in ("snakes", "food", "deaths", "eaten")}
+    message["ts"] = ts
+    return {**message, **snake}
+
+
+def play_match(players: dict[str, AgentFactory], seed: int, timeout: int = TIMEOUT) -> dict:
+    """
+    Play one game between in-process agents, stepping the game as soon as every player answered.
+
+    Players get what the server would send them, on the same schedule: the game info, then one state
+    per step, the key answered to a state being applied on the next step. States are handed over as
+    the engine builds them, without the JSON round trip: positions are tuples and sight keys are ints.
+    The game draws its map and foods from the `random` module, seeded with `seed`.
+
+    Steps run back to back, but the `ts` stamps are spaced by the game's period (`step / fps`) as on a real
+    server: agents pacing themselves on them (`StepScheduler`) get the same time budget as in a live game.
+    """
+    random.seed(seed)
+    game = Game(timeout=timeout)
+    game.start(list(players))
+    info = json.loads(json.dumps(game.info())) # A copy, agents may keep the map
+    agents = {name: factory(info) for name, factory in players.items()}
+    think = {name: 0.0 for name in players}
+    steps = {name: 0 for name in players}
+    errors: dict[str, str] = {}
+    started = datetime.now()
+
+    while game.running:
+        state = game.step()
+        if not state:
+            break
+        ts = (started + timedelta(seconds=state["step"] / info["fps"])).isoformat()
+        for snake in state["snakes"]:
+            name = snake["name"]
+            steps[name] = state["step"]
+            if name in errors:
+                continue
+            message = player_state(state, snake, ts)
+            start = time.perf_counter()
+            try:
+                key = agents[name].act(message)
+            except Exception as error:
+                errors[name] = repr(error) # Keeps its direction until the end, like a crashed client
+                key = ""
+            think[name] += time.perf_counter() - start
+            game.keypress(name, key)
+
+    for agent in agents.values():
+        if hasattr(agent, "close"):
+            agent.close()
+
+    return {
+        "seed": seed,
+        "steps": game._step,
+        "players": [
+            {
+                "name": name,
+                "score": snake.score,
+                "steps": steps[name],
+                "alive": snake.alive,
+                "cause": snake.death_cause,
+                "killer": snake.killer,
+                "length": len(snake.body),
+                "think_ms": think[name] * 1000 / max(1, steps[name]),
+                "error": errors.get(name),
+            }
+            for name, snake in game.snakes.items()
+        ],
+    }
+
+
+def ranking(result: dict) -> list[list[str]]:
+    """Players of a match from first to last: higher score, then longer survival. Tied players share a rank."""
+    order = sorted(result["players"], key=lambda player: (-player["score"], -player["steps"]))
+    ranks: list[list[str]] = []
+    previous: Optional[tuple] = None
+    for player in order:
+        key = (player["score"], player["steps"])
+        if key == previous:
+            ranks[-1].append(player["name"])
+        else:
+            ranks.append([player["name"]])
+        previous = key
+    return ranks
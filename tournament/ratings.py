@@ -0,0 +1,122 @@
+import sys
+import json
+import random
+import argparse
+import itertools
+
+from typing import Optional
+
+from .match import ranking
+
+INITIAL_RATING = 1500
+K_FACTOR = 16
+
+
+def elo(results: list[dict], k: float = K_FACTOR) -> dict[str, float]:
+    """
+    Elo ratings after the matches in order. A match of n players counts as every pair of them playing
+    (win, draw or loss by their ranks), each pair with a factor k / (n - 1).
+    """
+    ratings: dict[str, float] = {}
+    for result in results:
+        ranks = ranking(result)
+        placed = [(name, rank) for rank, names in enumerate(ranks) for name in names]
+        for name, _ in placed:
+            ratings.setdefault(name, INITIAL_RATING)
+        if len(placed) < 2:
+            continue
+        factor = k / (len(placed) - 1)
+        changes = {name: 0.0 for name, _ in placed}
+        for (first, first_rank), (second, second_rank) in itertools.combinations(placed, 2):
+            expected = 1 / (1 + 10 ** ((ratings[second] - ratings[first]) / 400))
+            actual = 1.0 if first_rank < second_rank else 0.5 if first_rank == second_rank else 0.0
+            changes[first] += factor * (actual - expected)
+            changes[second] -= factor * (actual - expected)
+        for name, change in changes.items():
+            ratings[name] += change
+    return ratings
+
+
+def bootstrap(results: list[dict], samples: int = 200, confidence: float = 0.95, seed: int = 0) -> dict[str, dict]:
+    """
+    Elo ratings with confidence intervals: the matches are resampled with replacement and shuffled
+    (Elo depends on their order) `samples` times, the interval is taken from the ratings' percentiles.
+    """
+    rng = random.Random(seed)
+    ratings: dict[str, list[float]] = {}
+    for _ in range(samples):
+        sample = [rng.choice(results) for _ in results]
+        for name, rating in elo(sample).items():
+            ratings.setdefault(name, []).append(rating)
+
+    tail = (1 - confidence) / 2
+    summary = {}
+    for name, values in ratings.items():
+        values.sort()
+        summary[name] = {
+            "rating": values[len(values) // 2],
+            "low": values[int(tail * (len(values) - 1))],
+            "high": values[int((1 - tail) * (len(values) - 1))],
+            "samples": len(values),
+        }
+    return summary
+
+
+def standings(results: list[dict]) -> dict[str, dict]:
+    """Matches, wins (first place, shared on ties), mean score, mean survival and think time of every agent."""
+    table: dict[str, dict] = {}
+    for result in results:
+        ranks = ranking(result)
+        for player in result["players"]:
+            entry = table.setdefault(player["name"], {"matches": 0, "wins": 0.0, "score": 0, "steps": 0, "think_ms": 0.0, "errors": 0})
+            entry["matches"] += 1
+            if player["name"] in ranks[0]:
+                entry["wins"] += 1 / len(ranks[0])
+            entry["score"] += player["score"]
+            entry["steps"] += player["steps"]
+            entry["think_ms"] += player["think_ms"]
+            entry["errors"] += player["error"] is not None
+    return {
+        name: {
+            "matches": entry["matches"],
+            "win_rate": entry["wins"] / entry["matches"],
+            "mean_score": entry["score"] / entry["matches"],
+            "mean_steps": entry["steps"] / entry["matches"],
+            "think_ms": entry["think_ms"] / entry["matches"],
+            "errors": entry["errors"],
+        }
+        for name, entry in table.items()
+    }
+
+
+def load_results(path: str) -> list[dict]:
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def report(results: list[dict], samples: int = 200) -> str:
+    ratings = bootstrap(results, samples)
+    table = standings(results)
+    lines = [f"{len(results)} matches, Elo with {samples} bootstrap samples (95% interval)"]
+    lines.append(f"{'agent':<20} {'elo':>6} {'interval':>13} {'matches':>8} {'win':>7} {'score':>8} {'steps':>8} {'think ms':>9}")
+    for name in sorted(ratings, key=lambda name: -ratings[name]["rating"]):
+        rating, entry = ratings[name], table[name]
+        errors = f"  {entry['errors']} errors" if entry["errors"] else ""
+        lines.append(
+            f"{name:<20} {rating['rating']:>6.0f} {rating['low']:>6.0f}-{rating['high']:<6.0f} {entry['matches']:>8} "
+            f"{entry['win_rate']:>7.1%} {entry['mean_score']:>8.1f} {entry['mean_steps']:>8.0f} {entry['think_ms']:>9.2f}{errors}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ratings of the agents from tournament results.")
+    parser.add_argument("results", help="Results written by tournament.runner")
+    parser.add_argument("--samples", type=int, default=200, help="Bootstrap samples")
+    args = parser.parse_args(argv)
+    print(report(load_results(args.results), args.samples))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
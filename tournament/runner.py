@@ -0,0 +1,190 @@
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+
+from collections import Counter
+from multiprocessing import Pool
+from typing import Iterator, Optional
+
+from consts import TIMEOUT
+
+from .agents import AgentFactory, load_agent
+from .match import play_match, ranking
+from .ratings import report
+
+_factories: dict[str, AgentFactory] = {} # Agents loaded by this worker process
+
+
+def run_match(task: dict) -> dict:
+    """Play a match on a worker, `task` holds the players' agent paths (see `load_agent`)."""
+    players = {}
+    for name, path in task["players"].items():
+        if path not in _factories:
+            _factories[path] = load_agent(path)
+        players[name] = _factories[path]
+    result = play_match(players, task["seed"], task["timeout"])
+    return {"match": task["match"], "round": task["round"], **result}
+
+
+def round_robin(names: list[str], size: int, rounds: int) -> Iterator[list[str]]:
+    """Every group of `size` agents, `rounds` times."""
+    for _ in range(rounds):
+        yield from (list(group) for group in itertools.combinations(names, size))
+
+
+def swiss_pairings(names: list[str], points: dict[str, float], met: Counter, size: int, rng: random.Random) -> tuple[list[list[str]], list[str]]:
+    """
+    Groups of a Swiss round: agents in order of points (random among equals), each group filled with the
+    next agents it met the least. Agents left over get a bye.
+    """
+    order = sorted(names, key=lambda name: (-points[name], rng.random()))
+    groups = []
+    while len(order) >= size:
+        group = [order.pop(0)]
+        while len(group) < size:
+            candidate = min(order, key=lambda name: (sum(met[frozenset((name, other))] for other in group), order.index(name)))
+            order.remove(candidate)
+            group.append(candidate)
+        groups.append(group)
+    return groups, order
+
+
+def match_points(result: dict) -> dict[str, float]:
+    """Share of the opponents beaten in a match, ties counting half."""
+    ranks = ranking(result)
+    opponents = max(1, sum(len(names) for names in ranks) - 1)
+    points = {}
+    beaten = sum(len(names) for names in ranks)
+    for names in ranks:
+        beaten -= len(names)
+        for name in names:
+            points[name] = (beaten + (len(names) - 1) / 2) / opponents
+    return points
+
+
+class Tournament:
+    """Matches between the agents on a pool of worker processes, results appended to `output` as they arrive."""
+
+    def __init__(self, agents: dict[str, str], size: int = 2, timeout: int = TIMEOUT, workers: int = 1, seed: int = 0, output: Optional[str] = None):
+        self.agents = agents
+        self.size = size
+        self.timeout = timeout
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.output = output
+        self.results: list[dict] = []
+        self._matches = 0
+        self._start = time.perf_counter()
+        self._pool = Pool(workers) if workers > 1 else None # Kept across rounds, agents stay loaded in the workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def play(self, groups: list[list[str]], round_: int = 0) -> list[dict]:
+        tasks = []
+        for group in groups:
+            tasks.append({
+                "match": self._matches,
+                "round": round_,
+                "players": {name: self.agents[name] for name in group},
+                "seed": self.rng.randrange(2 ** 32),
+                "timeout": self.timeout,
+            })
+            self._matches += 1
+
+        played = []
+        file = open(self.output, "a") if self.output else None
+        try:
+            if self._pool is not None:
+                for result in self._pool.imap_unordered(run_match, tasks):
+                    played.append(self._record(result, file))
+            else:
+                for task in tasks:
+                    played.append(self._record(run_match(task), file))
+        finally:
+            if file:
+                file.close()
+        return played
+
+    def _record(self, result: dict, file) -> dict:
+        self.results.append(result)
+        if file:
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+        elapsed = time.perf_counter() - self._start
+        print(f"\r{len(self.results)} matches, {len(self.results) / elapsed * 3600:.0f} per hour", end="", file=sys.stderr, flush=True)
+        return result
+
+    def round_robin(self, rounds: int) -> list[dict]:
+        return self.play(list(round_robin(list(self.agents), self.size, rounds)))
+
+    def swiss(self, rounds: int) -> list[dict]:
+        points = dict.fromkeys(self.agents, 0.0)
+        met: Counter = Counter()
+        for round_ in range(rounds):
+            groups, byes = swiss_pairings(list(self.agents), points, met, self.size, self.rng)
+            for name in byes:
+                points[name] += 1
+            for result in self.play(groups, round_):
+                for name, earned in match_points(result).items():
+                    points[name] += earned
+                names = [player["name"] for player in result["players"]]
+                met.update(frozenset(pair) for pair in itertools.combinations(names, 2))
+        return self.results
+
+
+def parse_agents(specs: list[str]) -> dict[str, str]:
+    """`name=module:attribute[:json]` specs, the name defaulting to the attribute."""
+    agents = {}
+    for spec in specs:
+        if "=" in spec.split(":", 1)[0]:
+            name, path = spec.split("=", 1)
+        else:
+            name, path = spec.split(":")[1], spec
+        if name in agents:
+            raise ValueError(f"agent name {name!r} given twice")
+        load_agent(path) # Fail before the first match
+        agents[name] = path
+    return agents
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Play a tournament between in-process agents on the headless game.")
+    parser.add_argument("--agent", action="append", required=True, help="name=module:attribute[:json kwargs], repeated")
+    parser.add_argument("--format", choices=("round-robin", "swiss"), default="round-robin")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--size", type=int, default=2, help="Players per match")
+    parser.add_argument("--timeout", type=int, default=TIMEOUT, help="Steps per match")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Append the match results (JSON lines) to this file")
+    parser.add_argument("--samples", type=int, default=200, help="Bootstrap samples of the ratings")
+    args = parser.parse_args(argv)
+
+    agents = parse_agents(args.agent)
+    if len(agents) < args.size:
+        parser.error(f"{args.size} players per match need at least {args.size} agents")
+
+    with Tournament(agents, args.size, args.timeout, args.workers, args.seed, args.output) as tournament:
+        if args.format == "swiss":
+            results = tournament.swiss(args.rounds)
+        else:
+            results = tournament.round_robin(args.rounds)
+    print(file=sys.stderr)
+    print(report(results, args.samples))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import sys
+import json
+import time
+import queue
+import threading
+
+from typing import Optional
+
+import pygame
+
+
+class DebugConsole:
+    """
+    Rate limited debug channel of the viewer, off by default and toggled at runtime.
+
+    `log` keeps a short summary of the newest state (step, snakes, foods, frame backlog) for the on-screen
+    overlay, and at most once every `interval` seconds hands it to a background thread writing JSON lines
+    to `path` (stderr by default). The render loop never waits on I/O: when the writer falls behind, entries are dropped.
+    """
+
+    def __init__(self, enabled: bool = False, path: Optional[str] = None, interval: float = 1.0, maxsize: int = 100):
+        self._enabled = enabled
+        self.path = path
+        self.interval = interval
+        self.summary: dict = {}
+        self.dropped = 0
+
+        self._last_log = 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None # Started with the first entry
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def toggle(self):
+        self._enabled = not self._enabled
+
+    def log(self, state: dict, **extra):
+        """Summarize a state for the overlay and, rate limited, for the log."""
+        if not self._enabled:
+            return
+        self.summary = {**summarize(state), **extra}
+
+        now = time.monotonic()
+        if now - self._last_log < self.interval:
+            return
+        self._last_log = now
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="viewer-debug", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(self.summary)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=1)
+
+    def _writer(self):
+        stream = open(self.path, "a") if self.path else sys.stderr
+        try:
+            while (entry := self._queue.get()) is not None:
+                stream.write(json.dumps(entry) + "\n")
+                stream.flush()
+        finally:
+            if stream is not sys.stderr:
+                stream.close()
+
+
+def summarize(state: dict) -> dict:
+    """Selected fields of a viewer message: no sight dicts, one short entry per snake."""
+    if "snakes" not in state:
+        return {key: value for key, value in state.items() if key != "map"}
+    return {
+        "step": state.get("step"),
+        "foods": len(state.get("food", [])),
+        "snakes": {
+            snake["name"]: {
+                "score": snake["score"],
+                "length": len(snake["body"]),
+                "head": snake["body"][0],
+                "range": snake.get("range"),
+                "traverse": snake.get("traverse"),
+            }
+            for snake in state["snakes"]
+        },
+    }
+
+
+class DebugSprite(pygame.sprite.Sprite):
+    """Overlay of the debug console's summary, bottom left of the window."""
+
+    def __init__(self, console: DebugConsole, WIDTH, HEIGHT, SCALE):
+        self.font = pygame.font.Font(None, int(SCALE * 0.75))
+        super().__init__()
+
+        self.console = console
+        self.HEIGHT = HEIGHT
+        self.SCALE = SCALE
+        self._summary = None
+        self.update()
+
+    def lines(self) -> list[str]:
+        summary = self.console.summary
+        lines = [f"step {summary.get('step')}  foods {summary.get('foods')}  backlog {summary.get('backlog')}  dropped {summary.get('dropped')}"]
+        for name, snake in summary.get("snakes", {}).items():
+            lines.append(
+                f"{name}: score {snake['score']}  length {snake['length']}  head {tuple(snake['head'])}  "
+                f"range {snake['range']}{'  [T]' if snake['traverse'] else ''}"
+            )
+        return lines
+
+    def update(self):
+        if self.console.summary is self._summary:
+            return
+        self._summary = self.console.summary
+
+        lines = [self.font.render(line, True, "blue", "white") for line in self.lines()]
+        width = max(line.get_width() for line in lines)
+        height = sum(line.get_height() for line in lines)
+        self.image = pygame.Surface((width, height))
+        self.image.fill("white")
+        self.image.set_colorkey("white")
+        top = 0
+        for line in lines:
+            self.image.blit(line, (0, top))
+            top += line.get_height()
+        self.rect = self.image.get_rect(bottomleft=(0, self.HEIGHT * self.SCALE))
@@ -0,0 +1,62 @@
+import json
+import asyncio
+
+from collections import deque
+
+
+class FrameBuffer:
+    """
+    Coalescing buffer between the server connection and the render loop.
+
+    Game frames (messages with snakes and food) replace the frame still waiting behind the last kept
+    message, so a slow viewer always draws the newest state. Keyframes (game info, with the map) and
+    highscores are never dropped and keep their order; a keyframe also drops the frames of the previous
+    game still waiting before it. At most one frame waits between two kept messages, so memory stays bounded.
+    """
+
+    def __init__(self):
+        self._entries: deque[tuple[str, dict]] = deque() # (kind, message)
+        self._ready = asyncio.Event()
+        self.received = 0
+        self.dropped = 0
+
+    def qsize(self) -> int:
+        return len(self._entries)
+
+    def put_nowait(self, message: str):
+        state = json.loads(message)
+        kind = kind_of(state)
+        self.received += 1
+
+        if kind == "frame" and self._entries and self._entries[-1][0] == "frame":
+            self._entries[-1] = (kind, state) # Merge with the frame not drawn yet
+            self.dropped += 1
+        elif kind == "keyframe":
+            kept = deque(entry for entry in self._entries if entry[0] != "frame") # Frames of the previous game are obsolete
+            self.dropped += len(self._entries) - len(kept)
+            self._entries = kept
+            self._entries.append((kind, state))
+        else:
+            self._entries.append((kind, state))
+        self._ready.set()
+
+    def get_nowait(self) -> dict:
+        if not self._entries:
+            raise asyncio.QueueEmpty
+        _, state = self._entries.popleft()
+        if not self._entries:
+            self._ready.clear()
+        return state
+
+    async def get(self) -> dict:
+        while not self._entries:
+            await self._ready.wait()
+        return self.get_nowait()
+
+
+def kind_of(state: dict) -> str:
+    if "snakes" in state and "food" in state:
+        return "frame"
+    if "map" in state:
+        return "keyframe"
+    return "info" # Highscores and other messages
@@ -0,0 +1,110 @@
+import pygame
+
+from .sprites import TextSprite
+
+SPEEDS = [0.25, 0.5, 1, 2, 4, 8, 16, 32, 64]
+MAX_INTERPOLATED_RATE = 20 # Frames per second, slower playbacks slide the snakes between cells
+
+
+class Playback:
+    """
+    Position of a replay in its frames, advanced with the wall clock at a chosen speed.
+
+    `position` is counted in frames: its integer part is the frame reached, its fraction the progress
+    towards the next one, used to interpolate the moves when the playback is slow enough.
+    """
+
+    def __init__(self, steps: list[int], fps: float, speed: float = 1.0):
+        self.steps = steps
+        self.fps = fps
+        self.speed = speed
+        self.position = 0.0
+        self.playing = True
+
+    @property
+    def index(self) -> int:
+        return int(self.position)
+
+    @property
+    def last(self) -> int:
+        return len(self.steps) - 1
+
+    @property
+    def step(self) -> int:
+        """Step of the frame drawn."""
+        return self.steps[self.target()[0]]
+
+    @property
+    def ended(self) -> bool:
+        return self.index >= self.last
+
+    @property
+    def interpolating(self) -> bool:
+        return self.fps * self.speed <= MAX_INTERPOLATED_RATE
+
+    def advance(self, seconds: float):
+        if not self.playing:
+            return
+        self.position = min(self.position + seconds * self.fps * self.speed, self.last)
+        if self.ended:
+            self.playing = False
+
+    def seek(self, index: int):
+        self.position = float(max(0, min(index, self.last)))
+
+    def toggle(self):
+        if not self.playing and self.ended:
+            self.seek(0) # Play again from the start
+        self.playing = not self.playing
+
+    def faster(self):
+        self.speed = next((speed for speed in SPEEDS if speed > self.speed), self.speed)
+
+    def slower(self):
+        self.speed = next((speed for speed in reversed(SPEEDS) if speed < self.speed), self.speed)
+
+    def target(self) -> tuple[int, float]:
+        """Frame to draw and the progress of the moves leading to it (1 when not interpolating)."""
+        index = self.index
+        progress = self.position - index
+        if self.interpolating and progress > 0 and index < self.last:
+            return index + 1, progress
+        return index, 1.0
+
+
+class PlaybackSprite(TextSprite):
+    """Speed and step of a replay, bottom left of the window."""
+
+    def __init__(self, playback: Playback, HEIGHT, SCALE):
+        self.playback = playback
+        super().__init__(0, HEIGHT - 1, SCALE)
+
+    def text(self) -> str:
+        state = "play" if self.playback.playing else "pause"
+        return f"{state} x{self.playback.speed:g}  step {self.playback.step}/{self.playback.steps[-1]}"
+
+
+class ProgressBarSprite(pygame.sprite.Sprite):
+    """Position of a replay as a bar along the bottom edge of the window, clicking it seeks."""
+
+    def __init__(self, playback: Playback, WIDTH, HEIGHT, SCALE):
+        super().__init__()
+        self.playback = playback
+        self.width = int(WIDTH * SCALE)
+        self.height = max(2, int(SCALE / 6))
+        self.image = pygame.Surface((self.width, self.height))
+        self.image.set_colorkey("white")
+        self.rect = self.image.get_rect(bottomleft=(0, int(HEIGHT * SCALE)))
+        self._filled = None
+        self.update()
+
+    def index_at(self, x: int) -> int:
+        return round(x / max(1, self.width - 1) * self.playback.last)
+
+    def update(self):
+        filled = int(self.width * self.playback.position / max(1, self.playback.last))
+        if filled == self._filled:
+            return
+        self._filled = filled
+        self.image.fill("white")
+        self.image.fill("purple", (0, 0, filled, self.height))
@@ -0,0 +1,128 @@
+import os
+import json
+
+from bisect import bisect_left
+from typing import Iterator, Optional
+
+
+class Recording:
+    """
+    Game recorded by `server.py --record`: the messages sent to the viewers, one JSON per line.
+
+    Every game frame holds the whole state, so each one is a keyframe and any step can be drawn on its own.
+    Opening the recording builds an index of the byte offset and step of every frame, reading a frame is then
+    a seek and a single line decode. The index is saved next to the recording (`<path>.idx`) and reused while
+    the recording is unchanged.
+    """
+
+    def __init__(self, path: str, cache: bool = True):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._file = open(path, "rb")
+        self.info: dict = None # Game info (size, map, fps) of the first game
+        self.highscores: Optional[list] = None
+        self._info_offset: Optional[int] = None
+        self._highscores_offset: Optional[int] = None
+        self._offsets: list[int] = []
+        self._steps: list[int] = []
+
+        if not (cache and self._load_index()):
+            self._build_index()
+            if cache:
+                self._save_index()
+        if self._info_offset is None:
+            raise ValueError(f"{self.path} has no game info, not a recording")
+        self.info = self._read(self._info_offset)
+        if self._highscores_offset is not None:
+            self.highscores = self._read(self._highscores_offset)["highscores"]
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def steps(self) -> list[int]:
+        return self._steps
+
+    @property
+    def offsets(self) -> list[int]:
+        """Byte offset of every frame in the file."""
+        return self._offsets
+
+    def close(self):
+        self._file.close()
+
+    def frame(self, index: int) -> dict:
+        """Decode the frame at `index` (0 based, not the step)."""
+        return self._read(self._offsets[index])
+
+    def frames(self, start: int = 0, end: Optional[int] = None) -> Iterator[dict]:
+        """Decode the frames from `start` to `end` (excluded), reading the file sequentially."""
+        end = len(self) if end is None else min(end, len(self))
+        if start >= end:
+            return
+        self._file.seek(self._offsets[start])
+        for _ in range(start, end):
+            yield json.loads(self._file.readline())
+
+    def index_of(self, step: int) -> int:
+        """Index of the first frame at or after `step` (the last frame if the game ended before)."""
+        return min(bisect_left(self._steps, step), len(self) - 1)
+
+    def _read(self, offset: int) -> dict:
+        self._file.seek(offset)
+        return json.loads(self._file.readline())
+
+    def _build_index(self):
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            message = json.loads(line) if line.strip() else {}
+            if "snakes" in message and "food" in message:
+                self._offsets.append(offset)
+                self._steps.append(message["step"])
+            elif "highscores" in message:
+                self._highscores_offset = offset
+            elif "map" in message and self._info_offset is None:
+                self._info_offset = offset
+            offset += len(line)
+
+    def _signature(self) -> list[int]:
+        stat = os.stat(self.path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _load_index(self) -> bool:
+        """Read the saved index, False when it's missing or was built for another version of the recording."""
+        try:
+            with open(self.index_path) as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if index.get("signature") != self._signature():
+            return False
+        self._info_offset = index["info"]
+        self._highscores_offset = index["highscores"]
+        self._offsets = index["offsets"]
+        self._steps = index["steps"]
+        return True
+
+    def _save_index(self):
+        if self._info_offset is None:
+            return
+        index = {
+            "signature": self._signature(),
+            "info": self._info_offset,
+            "highscores": self._highscores_offset,
+            "offsets": self._offsets,
+            "steps": self._steps,
+        }
+        try:
+            with open(self.index_path, "w") as file:
+                json.dump(index, file)
+        except OSError:
+            pass # Read only directory, the index is built again next time
@@ -0,0 +1,86 @@
+import pygame
+
+from consts import Tiles
+
+from .common import Stone
+from .sprites import StoneSprite
+
+
+class Renderer:
+    """
+    Cell based renderer updating only what changed on the display.
+
+    Stones are drawn once on a background layer. Every frame the tiles of the food and snake sprites are
+    compared, cell by cell, to the ones drawn on the previous frame: a changed cell is restored from the
+    background and its new tiles are drawn over it. Overlays (texts, scoreboard) are redrawn every frame
+    over the cells they cover. Only the rectangles touched are sent to `pygame.display.update`.
+    """
+
+    def __init__(self, display: pygame.Surface, WIDTH, HEIGHT, SCALE, MAP):
+        self.display = display
+        self.WIDTH = WIDTH
+        self.HEIGHT = HEIGHT
+        self.SCALE = SCALE
+
+        self.background = pygame.Surface(display.get_size()).convert()
+        self.background.fill("white")
+        for x, col in enumerate(MAP):
+            for y, tile in enumerate(col):
+                if tile == Tiles.STONE:
+                    for cell, image in StoneSprite(Stone(pos=(x, y)), WIDTH, HEIGHT, SCALE).tiles():
+                        self.background.blit(image, self.cell_rect(cell))
+
+        self._tiles: dict[tuple[int, int], tuple[pygame.Surface, ...]] = {} # Tiles drawn on each cell
+        self._overlay_rects: list[pygame.Rect] = []
+        self.redraw()
+
+    def cell_rect(self, cell: tuple[int, int]) -> pygame.Rect:
+        x, y = cell
+        left, top = int(x * self.SCALE), int(y * self.SCALE)
+        return pygame.Rect(left, top, int((x + 1) * self.SCALE) - left, int((y + 1) * self.SCALE) - top)
+
+    def cells_in(self, rect: pygame.Rect) -> list[tuple[int, int]]:
+        """Cells overlapped by a display rectangle."""
+        rect = rect.clip(self.display.get_rect())
+        if not rect.width or not rect.height:
+            return []
+        left, top = int(rect.left // self.SCALE), int(rect.top // self.SCALE)
+        right, bottom = int((rect.right - 1) // self.SCALE), int((rect.bottom - 1) // self.SCALE)
+        return [(x, y) for x in range(left, min(right, self.WIDTH - 1) + 1) for y in range(top, min(bottom, self.HEIGHT - 1) + 1)]
+
+    def redraw(self):
+        """Draw the whole window on the next `draw`, after a new game or an expose event."""
+        self.display.blit(self.background, (0, 0))
+        self._tiles = {}
+        self._overlay_rects = [self.display.get_rect()]
+
+    def draw(self, layers, overlays=()):
+        """Draw the tiles of the sprites in `layers` (bottom first) and the `overlays`, updating only the dirty rectangles."""
+        tiles: dict[tuple[int, int], list[pygame.Surface]] = {}
+        for layer in layers:
+            for sprite in layer:
+                for cell, image in sprite.tiles():
+                    tiles.setdefault(cell, []).append(image)
+        tiles = {cell: tuple(images) for cell, images in tiles.items()}
+
+        dirty = {cell for cell in self._tiles.keys() | tiles.keys() if self._tiles.get(cell) != tiles.get(cell)}
+        overlay_rects = [overlay.rect.copy() for overlay in overlays]
+        for rect in self._overlay_rects + overlay_rects:
+            dirty.update(self.cells_in(rect)) # Cells under the previous and the new overlays
+
+        rects = []
+        for cell in dirty:
+            rect = self.cell_rect(cell)
+            self.display.blit(self.background, rect, rect)
+            for image in tiles.get(cell, ()):
+                self.display.blit(image, rect)
+            rects.append(rect)
+        for overlay in overlays:
+            self.display.blit(overlay.image, overlay.rect)
+        rects.extend(self._overlay_rects)
+        rects.extend(overlay_rects)
+
+        self._tiles = tiles
+        self._overlay_rects = overlay_rects
+        if rects:
+            pygame.display.update(rects)
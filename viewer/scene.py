@@ -0,0 +1,121 @@
+import pygame
+
+from .common import Directions, Food, Snake, ScoreBoard, get_direction
+from .sprites import (
+    Info,
+    GameStateSprite,
+    GameInfoSprite,
+    SnakeSprite,
+    FoodSprite,
+    ScoreBoardSprite,
+)
+
+
+class Scene:
+    """Sprites of a game, updated from the server's viewer messages (live viewer, replays and headless renders alike)."""
+
+    def __init__(self, WIDTH, HEIGHT, SCALE):
+        self.WIDTH = WIDTH
+        self.HEIGHT = HEIGHT
+        self.SCALE = SCALE
+
+        self.all_sprites = pygame.sprite.Group() # Overlays: texts and scoreboard
+        self.snake_sprites = pygame.sprite.Group()
+        self.food_sprites = pygame.sprite.Group()
+        self.snakes: dict[str, Snake] = {}
+        self.step_info = Info(text="0")
+        self.step = 0
+        self.new_game = True
+        self._prev_foods = None
+
+    def apply(self, state: dict):
+        """Update the sprites with a viewer message: a game frame, the highscores or a new game's info."""
+        if "snakes" in state and "food" in state:
+            self.step = state["step"]
+            self.step_info.text = f"Step: {state['step']}"
+            self.update_foods(state["food"])
+            self.update_snakes(state["snakes"])
+            self.new_game = False
+        elif "highscores" in state:
+            self.all_sprites.add(
+                ScoreBoardSprite(
+                    ScoreBoard(highscores=[(p[0], p[1]) for p in state["highscores"]]),
+                    self.WIDTH,
+                    self.HEIGHT,
+                    self.SCALE,
+                )
+            )
+        else:
+            self.new_game = True
+
+    def update_foods(self, foods_update: list):
+        if not self.new_game and self._prev_foods == foods_update:
+            return
+        self.food_sprites.empty()
+
+        foods = {
+            f"{food}": Food(pos=(food[0], food[1]), is_super=food[2] == "SUPER")
+            for food in foods_update
+        }
+        self.food_sprites.add(
+            [FoodSprite(food, self.WIDTH, self.HEIGHT, self.SCALE) for food in foods.values()]
+        )
+        self._prev_foods = foods_update
+
+    def update_snakes(self, snakes_update: list):
+        if self.new_game or not all(snake["name"] in self.snakes for snake in snakes_update):
+            self.all_sprites.empty()
+            self.snake_sprites.empty()
+
+            self.snakes = {
+                snake["name"]: Snake(
+                    body=snake["body"],
+                    direction=Directions.RIGHT,
+                    score=snake["score"],
+                    name=snake["name"],
+                    traverse=snake["traverse"],
+                )
+                for snake in snakes_update
+            }
+
+            self.all_sprites.add(GameInfoSprite(self.step_info, self.WIDTH - len(self.step_info.text), 0, self.WIDTH, self.SCALE))
+            self.all_sprites.add(
+                [
+                    GameStateSprite(snake, i, self.WIDTH, self.HEIGHT, self.SCALE)
+                    for i, snake in enumerate(self.snakes.values())
+                ]
+            )
+            self.snake_sprites.add(
+                [SnakeSprite(snake, self.WIDTH, self.HEIGHT, self.SCALE) for snake in self.snakes.values()]
+            )
+            return
+
+        previous = {name: snake.body for name, snake in self.snakes.items()}
+        for snake in snakes_update:
+            self.snakes[snake["name"]].body = snake["body"]
+            head = snake["body"][0]
+            neck = snake["body"][1]
+            self.snakes[snake["name"]].direction = get_direction(
+                head[0], head[1], neck[0], neck[1], HEIGHT=self.HEIGHT, WIDTH=self.WIDTH
+            )
+            self.snakes[snake["name"]].score = snake["score"]
+            self.snakes[snake["name"]].traverse = snake["traverse"]
+
+        # Remove dead snakes
+        alive = {snake["name"] for snake in snakes_update}
+        self.snake_sprites.remove([sprite for sprite in self.snake_sprites if sprite.snake.name not in alive])
+        for sprite in self.snake_sprites:
+            sprite.previous_body = previous.get(sprite.snake.name)
+
+    def draw(self, renderer, overlays=(), progress: float = 1.0):
+        """
+        Draw the scene with `renderer`, `overlays` on top of the scene's own.
+
+        Below 1, `progress` draws the snakes part of the way from the previous frame to the current one (replays slowed down).
+        """
+        moving = []
+        for sprite in self.snake_sprites:
+            sprite.progress = progress
+            moving.extend(sprite.moving_tiles())
+        self.all_sprites.update()
+        renderer.draw([self.food_sprites, self.snake_sprites], moving + self.all_sprites.sprites() + list(overlays))
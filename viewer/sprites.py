@@ -1,7 +1,10 @@
 import pygame
+from abc import ABC, abstractmethod
 from collections import deque
+from functools import lru_cache
+from typing import Optional
 
-from .spritesheet import SpriteSheet, CELL_SIZE
+from .spritesheet import cell_image
 from .common import Directions, Snake, Food, Stone, ScoreBoard, get_direction
 
 from dataclasses import dataclass
@@ -10,61 +13,58 @@ from dataclasses import dataclass
 class Info:
     text: str
 
-class GameInfoSprite(pygame.sprite.Sprite):
-    def __init__(self, info: Info, column: int, line: int, WIDTH, SCALE):
+@lru_cache(maxsize=None)
+def stone_image(SCALE) -> pygame.Surface:
+    image = pygame.Surface((SCALE, SCALE))
+    image.fill("black")
+    return image
+
+
+class TextSprite(pygame.sprite.Sprite, ABC):
+    """Line of text at a cell position, rendered again only when the text changes."""
+
+    def __init__(self, column: int, line: int, SCALE):
         self.font = pygame.font.Font(None, int(SCALE))
         super().__init__()
 
-        self.info = info
-        self.line = line
         self.column = column
-        self.image = pygame.Surface([WIDTH * SCALE, (self.line + 1) * SCALE])
-        print(self.image.get_size())
-        self.image.set_colorkey("white")
-        self.rect = self.image.get_rect()
+        self.line = line
         self.SCALE = SCALE
+        self._text = None
+        self.update()
+
+    @abstractmethod
+    def text(self) -> str:
+        """Text to show, read on every update."""
 
     def update(self):
-        self.image.fill("white")
+        text = self.text()
+        if text == self._text:
+            return
+        self._text = text
+        self.image = self.font.render(text, True, "purple", "white")
         self.image.set_colorkey("white")
+        self.rect = self.image.get_rect(topleft=(self.column * self.SCALE, self.line * self.SCALE))
 
-        self.image.blit(
-            self.font.render(
-                self.info.text,
-                True,
-                "purple",
-                "white",
-            ),
-            (self.column * self.SCALE, self.line * self.SCALE),
-        )
 
-class GameStateSprite(pygame.sprite.Sprite):
-    def __init__(self, player: Snake, pos: int, WIDTH, HEIGHT, SCALE):
-        self.font = pygame.font.Font(None, int(SCALE))
-        super().__init__()
+class GameInfoSprite(TextSprite):
+    def __init__(self, info: Info, column: int, line: int, WIDTH, SCALE):
+        self.info = info
+        super().__init__(column, line, SCALE)
+
+    def text(self) -> str:
+        return self.info.text
 
+
+class GameStateSprite(TextSprite):
+    def __init__(self, player: Snake, pos: int, WIDTH, HEIGHT, SCALE):
         self.player = player
         self.pos = pos
-        self.image = pygame.Surface([WIDTH * SCALE, (self.pos + 1) * SCALE])
-        self.image.set_colorkey("white")
-        self.rect = self.image.get_rect()
-        self.SCALE = SCALE
-
-    def update(self):
-        self.image.fill("white")
-        self.image.set_colorkey("white")
+        super().__init__(0, pos, SCALE)
 
+    def text(self) -> str:
         traverse = "[T]" if self.player.traverse else ""
-
-        self.image.blit(
-            self.font.render(
-                f"{self.player.name} {traverse}: {self.player.score}",
-                True,
-                "purple",
-                "white",
-            ),
-            (0, self.pos * self.SCALE),
-        )
+        return f"{self.player.name} {traverse}: {self.player.score}"
 
 
 class ScoreBoardSprite(pygame.sprite.Sprite):
@@ -151,68 +151,47 @@ class StoneSprite(pygame.sprite.Sprite):
 
         self.stone = stone
         self.SCALE = SCALE
+        self.stone_image = stone_image(SCALE)
 
-        rect = pygame.Rect((0, 3 * SCALE, SCALE, SCALE))
-        self.stone_image = pygame.Surface(rect.size)
-
-        self.stone_image.fill("black")
-
-        self.image = pygame.Surface([WIDTH * SCALE, HEIGHT * SCALE])
-        self.rect = self.image.get_rect()
-        self.update()
-
-    def update(self):
-        self.image.fill("white")
-        self.image.set_colorkey("white")
-
-        # Render Stone
-        self.image.blit(
-            self.stone_image,
-            (self.SCALE * self.stone.pos[0], self.SCALE * self.stone.pos[1]),
-        )
+    def tiles(self) -> list[tuple[tuple, pygame.Surface]]:
+        """(cell, image) pairs to draw, see `viewer.renderer.Renderer`."""
+        return [(tuple(self.stone.pos), self.stone_image)]
 
 
 class FoodSprite(pygame.sprite.Sprite):
     def __init__(self, food: Food, WIDTH, HEIGHT, SCALE):
         super().__init__()
 
-        if food.is_super:
-            FOOD_SPRITESHEET = SpriteSheet("data/snake-graphics-bw.png")
-        else:
-            FOOD_SPRITESHEET = SpriteSheet("data/snake-graphics.png")
+        food_spritesheet = "data/snake-graphics-bw.png" if food.is_super else "data/snake-graphics.png"
 
         self.food = food
         self.SCALE = SCALE
 
-        food_image_rect = (0, 3 * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-        self.food_image = FOOD_SPRITESHEET.image_at(food_image_rect, -1)
-        self.food_image = pygame.transform.scale(self.food_image, (SCALE, SCALE))
+        self.food_image = cell_image(food_spritesheet, (0, 3), SCALE)
 
-        self.image = pygame.Surface([WIDTH * SCALE, HEIGHT * SCALE])
-        self.rect = self.image.get_rect()
-        self.update()
+    def tiles(self) -> list[tuple[tuple, pygame.Surface]]:
+        return [(tuple(self.food.pos), self.food_image)]
 
-    def update(self):
-        self.image.fill("white")
-        self.image.set_colorkey("white")
 
-        # Render Food
-        self.image.blit(
-            self.food_image,
-            (self.SCALE * self.food.pos[0], self.SCALE * self.food.pos[1]),
-        )
+class MovingTileSprite(pygame.sprite.Sprite):
+    """Tile drawn between two cells, `pos` in cells (fractional)."""
+
+    def __init__(self, pos: tuple[float, float], image: pygame.Surface, SCALE):
+        super().__init__()
+        self.image = image
+        self.rect = image.get_rect(topleft=(round(pos[0] * SCALE), round(pos[1] * SCALE)))
 
 
 class SnakeSprite(pygame.sprite.Sprite):
     def __init__(self, snake: Snake, WIDTH, HEIGHT, SCALE):
         super().__init__()
 
-        SNAKE_SPRITESHEET = SpriteSheet("data/snake-graphics.png")
-
         self.snake = snake
         self.HEIGHT = HEIGHT
         self.WIDTH = WIDTH
         self.SCALE = SCALE
+        self.previous_body: Optional[list] = None # Body on the previous frame, to interpolate the moves
+        self.progress = 1.0 # Part of the move from previous_body to body shown, below 1 head and tail slide between cells
 
         snake_map = {
             ("head", Directions.UP): (3, 0),
@@ -237,24 +216,43 @@ class SnakeSprite(pygame.sprite.Sprite):
             ("tail", Directions.LEFT): (4, 2),
         }
 
-        # Load and resize images to SCALE
+        # Images resized to SCALE, shared with every snake sprite
         self.snake_images = {
-            name: pygame.transform.scale(
-                SNAKE_SPRITESHEET.image_at(
-                    (a * CELL_SIZE, b * CELL_SIZE, CELL_SIZE, CELL_SIZE), -1
-                ),
-                (SCALE, SCALE),
-            )
-            for (name, (a, b)) in snake_map.items()
+            name: cell_image("data/snake-graphics.png", cell, SCALE)
+            for (name, cell) in snake_map.items()
         }
 
-        self.image = pygame.Surface([WIDTH * SCALE, HEIGHT * SCALE])
-        self.update()
-        self.rect = self.image.get_rect()
+    def sliding(self, previous: tuple, current: tuple) -> bool:
+        """True when a body part moved to a neighbour cell (not wrapped around the map) and the move is in progress."""
+        return (
+            self.progress < 1
+            and self.previous_body is not None
+            and abs(current[0] - previous[0]) + abs(current[1] - previous[1]) == 1
+        )
 
-    def update(self):
-        self.image.fill("white")
-        self.image.set_colorkey("white")
+    def moving_tiles(self) -> list[MovingTileSprite]:
+        """Head and tail drawn between their previous and current cells, see `progress`."""
+        if self.previous_body is None or self.progress >= 1:
+            return []
+        moving = []
+        pairs = [(self.previous_body[0], self.snake.body[0], ("head", self.snake.direction))]
+        if len(self.snake.body) > 1:
+            tail_x, tail_y = self.snake.body[-1]
+            before_x, before_y = self.snake.body[-2]
+            tail_dir = get_direction(tail_x, tail_y, before_x, before_y, self.HEIGHT, self.WIDTH)
+            pairs.append((self.previous_body[-1], self.snake.body[-1], ("tail", tail_dir)))
+        for previous, current, image in pairs:
+            if self.sliding(previous, current) and image in self.snake_images:
+                pos = (
+                    previous[0] + (current[0] - previous[0]) * self.progress,
+                    previous[1] + (current[1] - previous[1]) * self.progress,
+                )
+                moving.append(MovingTileSprite(pos, self.snake_images[image], self.SCALE))
+        return moving
+
+    def tiles(self) -> list[tuple[tuple, pygame.Surface]]:
+        """(cell, image) pairs of the snake's current body, head first (without the head and tail while they slide)."""
+        tiles = []
 
         # Get Head
         prev_x, prev_y = self.snake.body[0]
@@ -268,17 +266,20 @@ class SnakeSprite(pygame.sprite.Sprite):
             else:
                 image = (prev_dir, dir)
 
-            # blit previous body part now that we now directions taken
+            # previous body part now that we now directions taken
             if image in self.snake_images:  # TODO remove this check
-                self.image.blit(
-                    self.snake_images[image], (self.SCALE * prev_x, self.SCALE * prev_y)
-                )
+                tiles.append(((prev_x, prev_y), self.snake_images[image]))
 
             prev_x, prev_y = x, y
             prev_dir = dir
 
-        # Finally blit tail
-        self.image.blit(
-            self.snake_images[("tail", prev_dir)],
-            (self.SCALE * prev_x, self.SCALE * prev_y),
-        )
+        # Finally the tail, unless it is one of the moving tiles
+        tail = tuple(self.snake.body[-1])
+        tail_sliding = len(self.snake.body) > 1 and self.previous_body is not None and self.sliding(self.previous_body[-1], tail)
+        if ("tail", prev_dir) in self.snake_images and not tail_sliding:
+            tiles.append(((prev_x, prev_y), self.snake_images[("tail", prev_dir)]))
+
+        head = tuple(self.snake.body[0])
+        if tiles and tiles[0][0] == head and self.previous_body is not None and self.sliding(self.previous_body[0], head):
+            return tiles[1:] # The head is one of the moving tiles
+        return tiles
@@ -12,6 +12,8 @@
 
 import pygame
 
+from functools import lru_cache
+
 CELL_SIZE = 64
 
 class SpriteSheet:
@@ -46,3 +48,20 @@ class SpriteSheet:
             for x in range(image_count)
         ]
         return self.images_at(tups, colorkey)
+
+
+@lru_cache(maxsize=None)
+def load_sheet(filename) -> SpriteSheet:
+    """Sheet decoded once per process, shared by every sprite."""
+    return SpriteSheet(filename)
+
+
+@lru_cache(maxsize=None)
+def cell_image(filename, cell, scale, colorkey=-1) -> pygame.Surface:
+    """
+    Image of the (column, line) `cell` of a sheet scaled to `scale` pixels, cached per (sheet, cell, scale).
+    The surface is shared: blit it, don't draw on it.
+    """
+    column, line = cell
+    image = load_sheet(filename).image_at((column * CELL_SIZE, line * CELL_SIZE, CELL_SIZE, CELL_SIZE), colorkey)
+    return pygame.transform.scale(image, (scale, scale))